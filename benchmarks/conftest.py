@@ -0,0 +1,46 @@
+import asyncio
+import os
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from fastapi_crudrouter_mongodb import __version__
+
+pytest.importorskip("pytest_benchmark")
+
+# Benchmarks run against mongomock by default, set this variable to measure a real
+# mongod instead, e.g. BENCHMARK_MONGODB_URL=mongodb://localhost:27017
+MONGODB_URL = os.environ.get("BENCHMARK_MONGODB_URL")
+
+# Results are compared between releases with the pytest-benchmark storage, e.g.
+#   pytest benchmarks --benchmark-autosave
+#   pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:10%
+# or exported with --benchmark-json=results.json
+
+
+def pytest_benchmark_update_machine_info(config, machine_info):
+    machine_info["fastapi_crudrouter_mongodb"] = __version__
+    machine_info["backend"] = "mongod" if MONGODB_URL else "mongomock"
+
+
+@pytest.fixture(scope="session")
+def event_loop_runner():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def bench_db(event_loop_runner):
+    if MONGODB_URL is None:
+        yield AsyncMongoMockClient()["benchdb"]
+        return
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(MONGODB_URL)
+    event_loop_runner(client.drop_database("crudrouter_benchmarks"))
+    yield client["crudrouter_benchmarks"]
+    event_loop_runner(client.drop_database("crudrouter_benchmarks"))
+    client.close()
@@ -0,0 +1,340 @@
+"""
+End-to-end load test of a CRUDRouter app, by route type.
+
+The app is configured like the test fixtures, with a lookup, an embed and a
+populate, and driven in process through ``httpx.ASGITransport``. It runs on
+mongomock, or on a real mongod given with ``--mongodb-url`` or the
+``BENCHMARK_MONGODB_URL`` variable, e.g.
+
+    python -m benchmarks.load --concurrency 32 --requests 2000 --size 1000
+    python -m benchmarks.load --routes get list --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from bson import ObjectId
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from fastapi_crudrouter_mongodb import CRUDEmbed, CRUDLookup, CRUDPopulate, CRUDRouter
+from tests.conftest import (
+    Article,
+    Artist,
+    ArtistPopulateOut,
+    ChildRef,
+    ParentWithLookup,
+    ParentWithLookupOut,
+    Tag,
+    TestItem,
+    Track,
+    TrackOut,
+)
+
+# upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, math.inf]
+PAGE_SIZE = 25
+
+
+def build_app(db) -> FastAPI:
+    """Build the app under test, with one router by feature."""
+    app = FastAPI()
+    app.include_router(
+        CRUDRouter(model=TestItem, db=db, collection_name="items", prefix="/items")
+    )
+    app.include_router(
+        CRUDRouter(
+            model=ParentWithLookup,
+            db=db,
+            collection_name="parents",
+            prefix="/parents",
+            lookups=[
+                CRUDLookup(
+                    model=ChildRef,
+                    model_out=ParentWithLookupOut,
+                    collection_name="children",
+                    prefix="children",
+                    local_field="childIds",
+                    foreign_field="_id",
+                )
+            ],
+        )
+    )
+    app.include_router(
+        CRUDRouter(
+            model=Article,
+            db=db,
+            collection_name="articles",
+            prefix="/articles",
+            embeds=[CRUDEmbed(model=Tag, embed_name="tags")],
+        )
+    )
+    app.include_router(
+        CRUDRouter(
+            model=Track,
+            db=db,
+            collection_name="tracks",
+            prefix="/tracks",
+            model_out=TrackOut,
+            populates=[
+                CRUDPopulate(
+                    field="artist_ids",
+                    collection="artists",
+                    model=Artist,
+                    model_out=ArtistPopulateOut,
+                )
+            ],
+        )
+    )
+    return app
+
+
+@dataclass
+class Dataset:
+    item_ids: list[str]
+    deletable_ids: list[str]
+    parent_ids: list[str]
+    article_ids: list[str]
+    track_ids: list[str]
+
+
+async def seed(db, size: int, requests: int) -> Dataset:
+    """
+    Insert ``size`` documents by collection, and the documents deleted by the run.
+
+    Parents reference 5 children, articles embed 5 tags and tracks populate 5
+    artists, out of ``size`` of each.
+    """
+    for name in ("items", "parents", "children", "articles", "tracks", "artists"):
+        await db[name].delete_many({})
+
+    items = [
+        {"_id": ObjectId(), "name": f"Item {i}", "status": "active", "value": i}
+        for i in range(size + requests)
+    ]
+    children = [{"_id": ObjectId(), "name": f"Child {i}"} for i in range(size)]
+    artists = [{"_id": ObjectId(), "name": f"Artist {i}"} for i in range(size)]
+
+    def references(documents: list[dict], i: int) -> list[ObjectId]:
+        return [documents[(i + j) % size]["_id"] for j in range(5)]
+
+    parents = [
+        {"_id": ObjectId(), "name": f"Parent {i}", "childIds": references(children, i)}
+        for i in range(size)
+    ]
+    articles = [
+        {
+            "_id": ObjectId(),
+            "title": f"Article {i}",
+            "tags": [{"_id": ObjectId(), "name": f"tag-{j}"} for j in range(5)],
+        }
+        for i in range(size)
+    ]
+    tracks = [
+        {"_id": ObjectId(), "title": f"Track {i}", "artistIds": references(artists, i)}
+        for i in range(size)
+    ]
+    for name, documents in (
+        ("items", items),
+        ("children", children),
+        ("artists", artists),
+        ("parents", parents),
+        ("articles", articles),
+        ("tracks", tracks),
+    ):
+        await db[name].insert_many(documents)
+
+    def ids(documents: list[dict]) -> list[str]:
+        return [str(document["_id"]) for document in documents]
+
+    return Dataset(
+        item_ids=ids(items[:size]),
+        deletable_ids=ids(items[size:]),
+        parent_ids=ids(parents),
+        article_ids=ids(articles),
+        track_ids=ids(tracks),
+    )
+
+
+Scenario = Callable[[AsyncClient, Dataset, int], Awaitable[Any]]
+
+SCENARIOS: dict[str, Scenario] = {
+    "list": lambda client, data, i: client.get(
+        "/items", params={"skip": i % len(data.item_ids), "limit": PAGE_SIZE}
+    ),
+    "get": lambda client, data, i: client.get(
+        f"/items/{data.item_ids[i % len(data.item_ids)]}"
+    ),
+    "create": lambda client, data, i: client.post(
+        "/items", json={"name": f"Created {i}", "value": i}
+    ),
+    "patch": lambda client, data, i: client.patch(
+        f"/items/{data.item_ids[i % len(data.item_ids)]}", json={"value": i}
+    ),
+    "delete": lambda client, data, i: client.delete(f"/items/{data.deletable_ids[i]}"),
+    "lookup": lambda client, data, i: client.get(
+        f"/parents/{data.parent_ids[i % len(data.parent_ids)]}/children"
+    ),
+    "embed": lambda client, data, i: client.get(
+        f"/articles/{data.article_ids[i % len(data.article_ids)]}/tags"
+    ),
+    "populate": lambda client, data, i: client.get(
+        f"/tracks/{data.track_ids[i % len(data.track_ids)]}"
+    ),
+}
+
+
+@dataclass
+class RouteReport:
+    route: str
+    requests: int
+    errors: int
+    duration_s: float
+    latencies_ms: list[float] = field(repr=False)
+
+    def percentile(self, percent: float) -> float:
+        ordered = sorted(self.latencies_ms)
+        index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+        return ordered[index]
+
+    def histogram(self) -> dict[str, int]:
+        counts = {str(bound): 0 for bound in BUCKETS_MS}
+        for latency in self.latencies_ms:
+            for bound in BUCKETS_MS:
+                if latency <= bound:
+                    counts[str(bound)] += 1
+                    break
+        return counts
+
+    def to_dict(self) -> dict:
+        return {
+            "route": self.route,
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput_rps": self.requests / self.duration_s,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": max(self.latencies_ms),
+            "histogram_ms": self.histogram(),
+        }
+
+
+async def run_route(
+    client: AsyncClient, data: Dataset, route: str, requests: int, concurrency: int
+) -> RouteReport:
+    """Send ``requests`` requests of a route type, ``concurrency`` at a time."""
+    scenario = SCENARIOS[route]
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            response = await scenario(client, data, i)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return RouteReport(
+        route, requests, errors, time.perf_counter() - started, latencies
+    )
+
+
+async def run(
+    db,
+    routes: list[str],
+    requests: int = 1000,
+    concurrency: int = 16,
+    size: int = 1000,
+) -> list[dict]:
+    """
+    Seed the database and load each route type in turn.
+
+    :return: The report of each route type.
+    :rtype: list[dict]
+    """
+    data = await seed(db, size, requests)
+    async with AsyncClient(
+        transport=ASGITransport(app=build_app(db)), base_url="http://load"
+    ) as client:
+        reports = []
+        for route in routes:
+            report = await run_route(client, data, route, requests, concurrency)
+            reports.append(report.to_dict())
+    return reports
+
+
+def format_reports(reports: list[dict]) -> str:
+    lines = [
+        f"{'route':<10}{'requests':>10}{'errors':>8}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    ]
+    for report in reports:
+        lines.append(
+            f"{report['route']:<10}{report['requests']:>10}{report['errors']:>8}"
+            f"{report['throughput_rps']:>10.1f}{report['p50_ms']:>10.2f}"
+            f"{report['p90_ms']:>10.2f}{report['p99_ms']:>10.2f}"
+            f"{report['max_ms']:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def _database(mongodb_url: str | None):
+    if mongodb_url is None:
+        from mongomock_motor import AsyncMongoMockClient
+
+        return AsyncMongoMockClient()["crudrouter_load"]
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    return AsyncIOMotorClient(mongodb_url)["crudrouter_load"]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--routes", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=1000, help="by route type")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--size", type=int, default=1000, help="documents seeded")
+    parser.add_argument(
+        "--mongodb-url", default=os.environ.get("BENCHMARK_MONGODB_URL")
+    )
+    parser.add_argument("--json", help="write the reports to this file")
+    args = parser.parse_args(argv)
+
+    db = _database(args.mongodb_url)
+    reports = asyncio.run(
+        run(db, list(args.routes), args.requests, args.concurrency, args.size)
+    )
+    if args.mongodb_url is not None:
+        asyncio.run(db.client.drop_database(db.name))
+    print(format_reports(reports))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(
+                {
+                    "backend": "mongod" if args.mongodb_url else "mongomock",
+                    "concurrency": args.concurrency,
+                    "size": args.size,
+                    "reports": reports,
+                },
+                file,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
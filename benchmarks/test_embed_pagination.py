@@ -0,0 +1,76 @@
+import pytest
+from bson import ObjectId
+
+from benchmarks.conftest import MONGODB_URL
+from fastapi_crudrouter_mongodb.core.factories import CRUDEmbedRouterRepository
+from tests.conftest import Tag
+
+# mongomock unwinds in pure Python, keep its arrays small
+EMBED_SIZE = 10_000 if MONGODB_URL else 100
+PAGE_SIZE = 25
+ROUNDS = 5
+
+
+@pytest.fixture(scope="module")
+def large_article(bench_db, event_loop_runner):
+    article_id = ObjectId()
+    tags = [
+        {"_id": ObjectId(), "name": f"tag-{i % 2}", "rank": i}
+        for i in range(EMBED_SIZE)
+    ]
+    event_loop_runner(
+        bench_db["articles"].insert_one(
+            {"_id": article_id, "title": "Big", "tags": tags}
+        )
+    )
+    return str(article_id)
+
+
+@pytest.mark.parametrize(
+    "strategy, slice_threshold",
+    [("unwind", None), ("slice", 0), ("slice-above-threshold", EMBED_SIZE // 2)],
+)
+def test_benchmark_embed_page(
+    benchmark, bench_db, event_loop_runner, large_article, strategy, slice_threshold
+):
+    def page():
+        return event_loop_runner(
+            CRUDEmbedRouterRepository.get_all(
+                bench_db,
+                large_article,
+                "articles",
+                "tags",
+                Tag,
+                skip=EMBED_SIZE - 2 * PAGE_SIZE,
+                limit=PAGE_SIZE,
+                slice_threshold=slice_threshold,
+            )
+        )
+
+    result = benchmark.pedantic(page, rounds=ROUNDS, iterations=1)
+    assert len(result) == PAGE_SIZE
+
+
+@pytest.mark.parametrize(
+    "strategy, slice_threshold", [("unwind", None), ("filter-slice", 0)]
+)
+def test_benchmark_embed_filtered_page(
+    benchmark, bench_db, event_loop_runner, large_article, strategy, slice_threshold
+):
+    def page():
+        return event_loop_runner(
+            CRUDEmbedRouterRepository.get_all(
+                bench_db,
+                large_article,
+                "articles",
+                "tags",
+                Tag,
+                limit=PAGE_SIZE,
+                filters={"name": "tag-1"},
+                slice_threshold=slice_threshold,
+            )
+        )
+
+    result = benchmark.pedantic(page, rounds=ROUNDS, iterations=1)
+    assert len(result) == PAGE_SIZE
+    assert all(tag.name == "tag-1" for tag in result)
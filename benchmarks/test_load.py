@@ -0,0 +1,14 @@
+from benchmarks.load import SCENARIOS, format_reports, run
+
+
+def test_load_harness_reports_every_route(bench_db, event_loop_runner):
+    reports = event_loop_runner(
+        run(bench_db, list(SCENARIOS), requests=20, concurrency=4, size=10)
+    )
+
+    assert [report["route"] for report in reports] == list(SCENARIOS)
+    for report in reports:
+        assert report["errors"] == 0
+        assert sum(report["histogram_ms"].values()) == 20
+        assert report["p50_ms"] <= report["p99_ms"] <= report["max_ms"]
+    assert "populate" in format_reports(reports)
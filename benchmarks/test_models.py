@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+
+import bson
+import pytest
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from fastapi_crudrouter_mongodb import CamelModel, MongoModel, MongoObjectId
+from fastapi_crudrouter_mongodb.core.models.mongo_object_id_model import ObjectIdType
+from fastapi_crudrouter_mongodb.core.utils.raw_json import transcode
+
+DEPTHS = [1, 3, 5]
+FANOUT = 3
+
+
+class Node(MongoModel):
+    id: ObjectIdType | None = None
+    name: str
+    rank: int = 0
+    owner_id: ObjectIdType | None = None
+    children: list[Node] = []
+
+
+class NodeOut(CamelModel):
+    id: str | None = None
+    name: str
+    rank: int = 0
+    owner_id: str | None = None
+    children: list[NodeOut] = []
+
+
+def _tree(depth: int) -> Node:
+    return Node(
+        id=ObjectId(),
+        name=f"node-{depth}",
+        rank=depth,
+        owner_id=ObjectId(),
+        children=[_tree(depth - 1) for _ in range(FANOUT)] if depth > 1 else [],
+    )
+
+
+@pytest.mark.parametrize("depth", DEPTHS)
+def test_benchmark_to_mongo(benchmark, depth):
+    node = _tree(depth)
+    document = benchmark(node.to_mongo)
+    assert document["_id"] == node.id
+
+
+@pytest.mark.parametrize("depth", DEPTHS)
+def test_benchmark_from_mongo(benchmark, depth):
+    document = _tree(depth).to_mongo()
+    # from_mongo pops _id, give each round its own copy
+    node = benchmark(lambda: Node.from_mongo(dict(document)))
+    assert node.id == document["_id"]
+
+
+@pytest.mark.parametrize("depth", DEPTHS)
+def test_benchmark_convert_to(benchmark, depth):
+    node = _tree(depth)
+    converted = benchmark(node.convert_to, model=NodeOut)
+    assert converted.id == str(node.id)
+
+
+@pytest.mark.parametrize(
+    "value", [ObjectId(), str(ObjectId())], ids=["object_id", "string"]
+)
+def test_benchmark_validate_object_id(benchmark, value):
+    adapter = TypeAdapter(ObjectIdType)
+    assert isinstance(benchmark(adapter.validate_python, value), ObjectId)
+
+
+def test_benchmark_validate_object_id_direct(benchmark):
+    value = str(ObjectId())
+    result = benchmark(MongoObjectId.validate_object_id, value, str)
+    assert result == ObjectId(value)
+
+
+@pytest.mark.parametrize("depth", DEPTHS)
+def test_benchmark_transcode(benchmark, depth):
+    raw = bson.encode(_tree(depth).to_mongo())
+    document = json.loads(benchmark(transcode, raw))
+    assert document["name"] == f"node-{depth}"
@@ -0,0 +1,108 @@
+import pytest
+from bson import ObjectId
+
+from benchmarks.conftest import MONGODB_URL
+from fastapi_crudrouter_mongodb import CRUDPopulate, CRUDRepository, CRUDService
+from tests.conftest import (
+    Artist,
+    ArtistPopulateOut,
+    TestItem,
+    TestItemOut,
+    Track,
+    TrackOut,
+)
+
+# mongomock filters and sorts in pure Python, keep its collections small
+SIZES = [10, 100, 1_000, 10_000] if MONGODB_URL else [10, 100, 1_000]
+ROUNDS = 5
+
+
+def _populate() -> CRUDPopulate:
+    return CRUDPopulate(
+        field="artist_ids",
+        collection="bench_artists",
+        model=Artist,
+        model_out=ArtistPopulateOut,
+    )
+
+
+@pytest.fixture(scope="module")
+def seeded_items(bench_db, event_loop_runner):
+    def seed(size: int) -> str:
+        collection_name = f"bench_items_{size}"
+        collection = bench_db[collection_name]
+        event_loop_runner(collection.delete_many({}))
+        event_loop_runner(
+            collection.insert_many(
+                [
+                    {"name": f"Item {i}", "status": "active", "value": i}
+                    for i in range(size)
+                ]
+            )
+        )
+        return collection_name
+
+    return {size: seed(size) for size in SIZES}
+
+
+@pytest.fixture(scope="module")
+def artist_ids(bench_db, event_loop_runner):
+    ids = [ObjectId() for _ in range(max(SIZES))]
+    collection = bench_db["bench_artists"]
+    event_loop_runner(collection.delete_many({}))
+    event_loop_runner(
+        collection.insert_many(
+            [{"_id": id, "name": f"Artist {i}"} for i, id in enumerate(ids)]
+        )
+    )
+    return ids
+
+
+@pytest.mark.parametrize("model_out", [None, TestItemOut], ids=["model", "model_out"])
+@pytest.mark.parametrize("size", SIZES)
+def test_benchmark_find_all(
+    benchmark, bench_db, event_loop_runner, seeded_items, size, model_out
+):
+    repository = CRUDRepository(
+        model=TestItem,
+        db=bench_db,
+        collection_name=seeded_items[size],
+        model_out=model_out,
+    )
+
+    result = benchmark.pedantic(
+        lambda: event_loop_runner(repository.find_all()), rounds=ROUNDS, iterations=1
+    )
+    assert len(result) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_benchmark_resolve_populate(
+    benchmark, bench_db, event_loop_runner, artist_ids, size
+):
+    repository = CRUDRepository(model=Track, db=bench_db, collection_name="tracks")
+    populates = [_populate()]
+
+    def resolve():
+        # resolve_populate replaces the ids of the tracks, give each round new ones
+        tracks = [Track(title="Track", artist_ids=artist_ids[:size])]
+        return event_loop_runner(repository.resolve_populate(tracks, populates))
+
+    result = benchmark.pedantic(resolve, rounds=ROUNDS, iterations=1)
+    assert len(result) == 1
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_benchmark_serialize_populated_document(benchmark, bench_db, size):
+    service = CRUDService(
+        model=Track, db=bench_db, collection_name="tracks", model_out=TrackOut
+    )
+    populates = [_populate()]
+    track = TrackOut(
+        id=str(ObjectId()),
+        title="Track",
+        artist_ids=[{"name": f"Artist {i}"} for i in range(size)],
+    )
+
+    serialized = benchmark(service._serialize_populated_document, track, populates)
+    assert len(serialized["artistIds"]) == size
@@ -9,6 +9,15 @@ from .core import (
     CRUDLookup,
     CRUDEmbed,
     CRUDPopulate,
+    EventSource,
+    ChangeStreamEventSource,
+    DocumentCache,
+    InvalidationTransport,
+    InMemoryInvalidationTransport,
+    ChangeStreamInvalidationTransport,
+    MetricsRegistry,
+    CommandMonitor,
+    IndexAdvisor,
 )
 from bson import ObjectId
 
@@ -24,6 +33,15 @@ __all__ = [
     "CRUDLookup",
     "CRUDEmbed",
     "CRUDPopulate",
+    "EventSource",
+    "ChangeStreamEventSource",
+    "DocumentCache",
+    "InvalidationTransport",
+    "InMemoryInvalidationTransport",
+    "ChangeStreamInvalidationTransport",
+    "MetricsRegistry",
+    "CommandMonitor",
+    "IndexAdvisor",
 ]
 
 __version__ = "1.0.1"
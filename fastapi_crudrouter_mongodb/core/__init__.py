@@ -1,6 +1,14 @@
 from .routers import CRUDRouter
 from .services import CRUDService
 from .repositories import CRUDRepository
+from .events import EventSource, ChangeStreamEventSource
+from .metrics import CommandMonitor, IndexAdvisor, MetricsRegistry
+from .cache import (
+    DocumentCache,
+    InvalidationTransport,
+    InMemoryInvalidationTransport,
+    ChangeStreamInvalidationTransport,
+)
 from .models import (
     MongoObjectId,
     ObjectIdType,
@@ -22,4 +30,13 @@ __all__ = [
     "CRUDLookup",
     "CRUDEmbed",
     "CRUDPopulate",
+    "EventSource",
+    "ChangeStreamEventSource",
+    "DocumentCache",
+    "InvalidationTransport",
+    "InMemoryInvalidationTransport",
+    "ChangeStreamInvalidationTransport",
+    "MetricsRegistry",
+    "CommandMonitor",
+    "IndexAdvisor",
 ]
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from typing import Any
+from .InvalidationTransport import InvalidationCallback, InvalidationTransport
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeStreamInvalidationTransport(InvalidationTransport):
+    """
+    ChangeStreamInvalidationTransport follows the writes of a database with a change stream.
+
+    Every write, made by any worker or any other client, is delivered as an
+    invalidation, so ``publish`` has nothing to send. When the change stream fails,
+    everything is invalidated, since the writes made until it is reopened are missed.
+    The stream is opened in the background: the transport is ``ready``, and the cache
+    keeps documents, only once it is open. Change streams require a replica set or a
+    sharded cluster.
+
+    :param db: The database to watch.
+    :type db: AsyncIOMotorDatabase
+    """
+
+    def __init__(self, db) -> None:
+        self.db = db
+        self._task: asyncio.Task | None = None
+        self._opened = asyncio.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._opened.is_set()
+
+    async def publish(self, collection: str, id: Any) -> None:
+        return None
+
+    def start(self, callback: InvalidationCallback) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._watch(callback))
+
+    async def wait_ready(self) -> None:
+        """
+        Wait until the change stream is open.
+
+        :raises RuntimeError: If the change stream closes before it is open.
+        """
+        task = self._task
+        if task is None or self._opened.is_set():
+            return
+        opened = asyncio.ensure_future(self._opened.wait())
+        try:
+            await asyncio.wait({opened, task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            opened.cancel()
+        if not self._opened.is_set():
+            raise RuntimeError("The cache invalidation change stream did not open")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._opened.clear()
+
+    async def _watch(self, callback: InvalidationCallback) -> None:
+        try:
+            async with self.db.watch() as stream:
+                self._opened.set()
+                async for change in stream:
+                    operation_type = change["operationType"]
+                    if operation_type in ("update", "replace", "delete"):
+                        callback(change["ns"]["coll"], change["documentKey"]["_id"])
+                    elif operation_type in ("drop", "rename"):
+                        callback(change["ns"]["coll"], None)
+                    elif operation_type in ("dropDatabase", "invalidate"):
+                        break
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Cache invalidation change stream failed")
+        # the stream is closed, it is reopened on the next cache use
+        self._opened.clear()
+        self._task = None
+        callback(None, None)
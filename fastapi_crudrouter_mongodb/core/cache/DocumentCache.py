@@ -0,0 +1,142 @@
+import time
+from collections import OrderedDict
+from typing import Any
+from .InvalidationTransport import InMemoryInvalidationTransport, InvalidationTransport
+
+
+class DocumentCache:
+    """
+    DocumentCache keeps the documents read by ``find_one`` in memory, per worker.
+
+    Writes made through a CRUDRouter evict their document locally and publish the
+    invalidation on the transport, which evicts it from the cache of every other
+    worker. Share one cache between the routers of a worker, and ``await start()``
+    it on the application startup: no document is cached until its transport
+    delivers the invalidations.
+
+    :param transport: The transport carrying the invalidations between workers.
+        Defaults to an in-memory transport, which only reaches this worker.
+    :type transport: InvalidationTransport | None
+    :param max_size: The maximum number of documents kept, the least recently used
+        ones are evicted first.
+    :type max_size: int
+    :param ttl: (Optional) The maximum time, in seconds, a document is kept.
+    :type ttl: float | None
+    """
+
+    def __init__(
+        self,
+        transport: InvalidationTransport | None = None,
+        max_size: int = 1024,
+        ttl: float | None = None,
+    ) -> None:
+        self.transport = (
+            transport if transport is not None else InMemoryInvalidationTransport()
+        )
+        self.max_size = max_size
+        self.ttl = ttl
+        self._documents: OrderedDict[tuple[str, Any], tuple[float, dict]] = (
+            OrderedDict()
+        )
+        self._generation = 0
+        self._started = False
+
+    @property
+    def generation(self) -> int:
+        """
+        The number of invalidations received so far.
+
+        Read it before fetching a document and give it to ``set``, so a document
+        invalidated while it was fetched is not cached.
+        """
+        self._ensure_started()
+        return self._generation
+
+    async def start(self) -> None:
+        """
+        Start the invalidation transport, and wait until it delivers the invalidations.
+
+        :raises RuntimeError: If the transport fails to start.
+        """
+        self._ensure_started()
+        await self.transport.wait_ready()
+
+    def get(self, collection: str, id: Any) -> dict | None:
+        """
+        Return a copy of a cached document.
+
+        :param collection: The collection of the document.
+        :type collection: str
+        :param id: The ``_id`` of the document.
+        :type id: Any
+        :return: The document, or None if it is not cached.
+        :rtype: dict | None
+        """
+        self._ensure_started()
+        entry = self._documents.get((collection, id))
+        if entry is None:
+            return None
+        stored_at, document = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self._documents[(collection, id)]
+            return None
+        self._documents.move_to_end((collection, id))
+        return dict(document)
+
+    def set(self, collection: str, id: Any, document: dict, generation: int) -> None:
+        """
+        Cache a copy of a document, unless an invalidation arrived since ``generation``
+        or the transport does not deliver the invalidations yet.
+
+        :param collection: The collection of the document.
+        :type collection: str
+        :param id: The ``_id`` of the document.
+        :type id: Any
+        :param document: The document, as stored in MongoDB.
+        :type document: dict
+        :param generation: The ``generation`` read before fetching the document.
+        :type generation: int
+        """
+        if generation != self._generation or not self.transport.ready:
+            return
+        self._documents[(collection, id)] = (time.monotonic(), dict(document))
+        self._documents.move_to_end((collection, id))
+        while len(self._documents) > self.max_size:
+            self._documents.popitem(last=False)
+
+    async def invalidate(self, collection: str, id: Any) -> None:
+        """
+        Evict a document from this cache and from the caches of every other worker.
+
+        :param collection: The collection of the written document.
+        :type collection: str
+        :param id: The ``_id`` of the written document.
+        :type id: Any
+        """
+        self.evict(collection, id)
+        await self.transport.publish(collection, id)
+
+    def evict(self, collection: str | None, id: Any = None) -> None:
+        """
+        Evict a document from this cache only.
+
+        :param collection: The collection of the document, None to evict everything.
+        :type collection: str | None
+        :param id: The ``_id`` of the document, None to evict the whole collection.
+        :type id: Any
+        """
+        self._generation += 1
+        if collection is None:
+            self._documents.clear()
+            # the transport stopped, it is started again on the next use
+            self._started = False
+        elif id is None:
+            for key in [key for key in self._documents if key[0] == collection]:
+                del self._documents[key]
+        else:
+            self._documents.pop((collection, id), None)
+
+    def _ensure_started(self) -> None:
+        if not self._started:
+            self._started = True
+            self.transport.start(self.evict)
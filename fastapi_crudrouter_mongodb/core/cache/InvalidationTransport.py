@@ -0,0 +1,58 @@
+from typing import Any, Callable
+
+InvalidationCallback = Callable[[str, Any], None]
+
+
+class InvalidationTransport:
+    """
+    InvalidationTransport carries ``(collection, id)`` invalidations between workers.
+
+    ``publish`` sends the invalidation of a write made by this worker, ``start``
+    delivers the invalidations of every worker to ``callback``. A None id invalidates
+    the whole collection, and a None collection invalidates everything.
+
+    ``ready`` tells whether the invalidations are delivered yet; until then, the
+    cache does not keep any document, since their invalidations could be missed.
+    """
+
+    @property
+    def ready(self) -> bool:
+        return True
+
+    async def publish(self, collection: str, id: Any) -> None:
+        raise NotImplementedError
+
+    def start(self, callback: InvalidationCallback) -> None:
+        raise NotImplementedError
+
+    async def wait_ready(self) -> None:
+        """
+        Wait until the invalidations are delivered, after ``start``.
+        """
+        return None
+
+    def stop(self) -> None:
+        raise NotImplementedError
+
+
+class InMemoryInvalidationTransport(InvalidationTransport):
+    """
+    InMemoryInvalidationTransport delivers invalidations within the process.
+
+    Every cache started on the same transport receives the invalidations published
+    by the others, which stands in for several workers in tests.
+    """
+
+    def __init__(self) -> None:
+        self._callbacks: list[InvalidationCallback] = []
+
+    async def publish(self, collection: str, id: Any) -> None:
+        for callback in list(self._callbacks):
+            callback(collection, id)
+
+    def start(self, callback: InvalidationCallback) -> None:
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+
+    def stop(self) -> None:
+        self._callbacks.clear()
@@ -0,0 +1,10 @@
+from .InvalidationTransport import InvalidationTransport, InMemoryInvalidationTransport
+from .ChangeStreamInvalidationTransport import ChangeStreamInvalidationTransport
+from .DocumentCache import DocumentCache
+
+__all__ = [
+    "InvalidationTransport",
+    "InMemoryInvalidationTransport",
+    "ChangeStreamInvalidationTransport",
+    "DocumentCache",
+]
@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from .EventSource import EventSource
+
+logger = logging.getLogger(__name__)
+
+OPERATION_TYPES = {"insert", "update", "replace", "delete"}
+
+
+class ChangeStreamEventSource(EventSource):
+    """
+    ChangeStreamEventSource follows a collection with a single change stream.
+
+    The change stream is opened when the first subscriber arrives and closed when
+    the last one leaves, so any number of subscribers share one cursor. Change
+    streams require a replica set or a sharded cluster.
+
+    :param collection: The collection to watch.
+    :type collection: AsyncIOMotorCollection
+    :param max_queue_size: The number of events a subscriber can lag behind
+        before it is disconnected.
+    :type max_queue_size: int
+    """
+
+    # the change stream already reports the writes made through the router
+    feeds_from_writes = False
+
+    def __init__(self, collection, max_queue_size: int = 1000) -> None:
+        super().__init__(max_queue_size=max_queue_size)
+        self.collection = collection
+        self._task: asyncio.Task | None = None
+
+    def _start(self) -> None:
+        self._task = asyncio.ensure_future(self._watch())
+
+    def _stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _watch(self) -> None:
+        try:
+            async with self.collection.watch(full_document="updateLookup") as stream:
+                async for change in stream:
+                    if change["operationType"] not in OPERATION_TYPES:
+                        continue
+                    self.publish(
+                        {
+                            "operationType": change["operationType"],
+                            "documentKey": change["documentKey"],
+                            "fullDocument": change.get("fullDocument"),
+                        }
+                    )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Change stream on %s failed", self.collection.name)
+        # the stream ended, let the subscribers reconnect
+        self._task = None
+        self.close()
@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any, AsyncIterator
+
+_CLOSED = object()
+
+
+class EventSource:
+    """
+    EventSource fans out the write events of a collection to many subscribers.
+
+    Events have the shape of change stream events, limited to ``operationType``
+    (``insert``, ``update``, ``replace`` or ``delete``), ``documentKey`` and
+    ``fullDocument``, which is None when the document is not known, e.g. for deletes.
+
+    This base source is fed by the writes of the CRUDRouter it is given to, so it
+    only sees the writes made through that router, in this process. Use
+    ``ChangeStreamEventSource`` to follow every write made to the collection.
+
+    :param max_queue_size: The number of events a subscriber can lag behind
+        before it is disconnected.
+    :type max_queue_size: int
+    """
+
+    feeds_from_writes = True
+
+    def __init__(self, max_queue_size: int = 1000) -> None:
+        self.max_queue_size = max_queue_size
+        self._subscribers: set[asyncio.Queue] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: dict[str, Any]) -> None:
+        """
+        Push an event to every subscriber.
+
+        A subscriber whose queue is full is disconnected, instead of slowing
+        down the writes or the other subscribers.
+
+        :param event: The change event.
+        :type event: dict[str, Any]
+        """
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._close(queue)
+
+    def close(self) -> None:
+        """End the streams of every subscriber."""
+        for queue in list(self._subscribers):
+            self._close(queue)
+
+    async def subscribe(self) -> AsyncIterator[dict[str, Any]]:
+        """
+        Iterate over the events published from now on.
+
+        :return: The change events.
+        :rtype: AsyncIterator[dict[str, Any]]
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers.add(queue)
+        if len(self._subscribers) == 1:
+            self._start()
+        try:
+            while True:
+                event = await queue.get()
+                if event is _CLOSED:
+                    return
+                yield event
+        finally:
+            if queue in self._subscribers:
+                self._subscribers.discard(queue)
+                if not self._subscribers:
+                    self._stop()
+
+    def _close(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(_CLOSED)
+        if not self._subscribers:
+            self._stop()
+
+    def _start(self) -> None:
+        """Called when the first subscriber arrives."""
+
+    def _stop(self) -> None:
+        """Called when the last subscriber leaves."""
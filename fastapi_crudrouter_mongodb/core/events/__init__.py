@@ -0,0 +1,4 @@
+from .EventSource import EventSource
+from .ChangeStreamEventSource import ChangeStreamEventSource
+
+__all__ = ["EventSource", "ChangeStreamEventSource"]
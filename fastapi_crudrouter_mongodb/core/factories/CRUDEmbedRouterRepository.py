@@ -1,8 +1,18 @@
+from types import UnionType
+from typing import Annotated, Any, Union, get_args, get_origin
 from bson import ObjectId
 from bson.errors import InvalidId
 from fastapi import Response
+from pymongo import ReturnDocument
+from pymongo.errors import ExecutionTimeout
 from ..models import DeletedModelOut
 from ..models.mongo_model import MongoModel
+from ..utils.partial import set_paths
+from ..utils.time_budget import (
+    closing_cursor,
+    cursor_max_time_kwargs,
+    max_time_kwargs,
+)
 
 
 def _parent_filter(id: str, parent_identifier_field: str) -> dict:
@@ -15,14 +25,185 @@ def _parent_filter(id: str, parent_identifier_field: str) -> dict:
     return {parent_identifier_field: id}
 
 
-def _embed_filter(embed_id: str, embed_identifier_field: str) -> dict:
-    """Build a match filter for an embedded sub-document using its identifier field."""
+def _embed_identifier_value(embed_id: str, embed_identifier_field: str) -> Any:
+    """Convert an embedded sub-document identifier to its stored value."""
     if embed_identifier_field == "_id":
         try:
-            return {"_id": ObjectId(embed_id)}
+            return ObjectId(embed_id)
         except (InvalidId, TypeError):
             pass
-    return {embed_identifier_field: embed_id}
+    return embed_id
+
+
+def _embed_filter(embed_id: str, embed_identifier_field: str) -> dict:
+    """Build a match filter for an embedded sub-document using its identifier field."""
+    return {
+        embed_identifier_field: _embed_identifier_value(
+            embed_id, embed_identifier_field
+        )
+    }
+
+
+def _parent_embed_filter(
+    id: str,
+    embed_id: str,
+    embed_name: str,
+    parent_identifier_field: str,
+    embed_identifier_field: str,
+) -> dict:
+    """Build a filter matching the parent document holding the embedded sub-document."""
+    parent_filter = _parent_filter(id, parent_identifier_field)
+    for field, value in _embed_filter(embed_id, embed_identifier_field).items():
+        parent_filter[f"{embed_name}.{field}"] = value
+    return parent_filter
+
+
+def _stamped(update: dict, changes_field: str | None) -> dict:
+    """Stamp the parent document with the server date, if its changes are tracked."""
+    if changes_field is None:
+        return update
+    return {**update, "$currentDate": {changes_field: True}}
+
+
+_FILTER_EXPRESSION_OPERATORS = {"$eq", "$ne", "$in", "$nin"}
+
+# Largest count accepted by $slice, used to slice "until the end" of an array
+_SLICE_ALL = 2**31 - 1
+
+
+def _may_be_array(annotation: Any) -> bool:
+    """Tell whether a model field annotation may hold an array."""
+    if annotation is Any:
+        return True
+    if annotation in (list, set, tuple, frozenset):
+        return True
+    origin = get_origin(annotation)
+    if origin in (list, set, tuple, frozenset):
+        return True
+    if origin is Annotated:
+        return _may_be_array(get_args(annotation)[0])
+    if origin in (Union, UnionType):
+        return any(_may_be_array(arg) for arg in get_args(annotation))
+    return False
+
+
+def _is_scalar_field(model: MongoModel, field: str) -> bool:
+    """Tell whether a stored field name maps to a model field that is never an array."""
+    attribute = "id" if field == "_id" else field
+    for name, field_info in model.model_fields.items():
+        if attribute in (name, field_info.alias):
+            return not _may_be_array(field_info.annotation)
+    return False
+
+
+def _filter_expression(
+    filters: dict, model: MongoModel, variable: str = "item"
+) -> dict | None:
+    """
+    Translate an equality filter document into a ``$filter`` condition.
+
+    Only plain values and the ``$eq``, ``$ne``, ``$in`` and ``$nin`` operators on
+    scalar fields of the model are supported, because aggregation expressions do not
+    match ``null`` against missing fields nor values against array elements like
+    ``$match`` does. None is returned for any other filter.
+    """
+    conditions = []
+    for field, value in filters.items():
+        if field.startswith("$") or not _is_scalar_field(model, field):
+            return None
+        path = f"$${variable}.{field}"
+        if not (isinstance(value, dict) and any(key.startswith("$") for key in value)):
+            value = {"$eq": value}
+        for operator, operand in value.items():
+            if operator not in _FILTER_EXPRESSION_OPERATORS:
+                return None
+            operands = operand if operator in {"$in", "$nin"} else [operand]
+            if not isinstance(operands, list) or any(
+                item is None or isinstance(item, list) for item in operands
+            ):
+                return None
+            if operator == "$nin":
+                conditions.append({"$not": [{"$in": [path, operand]}]})
+            else:
+                conditions.append({operator: [path, operand]})
+    return {"$and": conditions}
+
+
+def _unwind_stages(
+    embed_name: str,
+    filters: dict | None = None,
+    sort_by: str | None = None,
+    order_by: int = 1,
+    skip: int | None = None,
+    limit: int | None = None,
+) -> list[dict]:
+    """Build the stages paging embedded documents by unwinding the whole array."""
+    stages: list[dict] = [
+        {"$unwind": f"${embed_name}"},
+        {"$replaceRoot": {"newRoot": f"${embed_name}"}},
+    ]
+    if filters is not None:
+        stages.append({"$match": filters})
+    if sort_by is not None:
+        stages.append({"$sort": {sort_by: order_by}})
+    if skip is not None:
+        stages.append({"$skip": skip})
+    if limit is not None:
+        stages.append({"$limit": limit})
+    return stages
+
+
+async def _get_all_projected(
+    db,
+    parent_filter: dict,
+    parent_collection_name: str,
+    embed_name: str,
+    skip: int | None,
+    limit: int | None,
+    filters: dict | None,
+    condition: dict | None,
+    slice_threshold: int,
+) -> list:
+    """
+    Page embedded documents inside a ``$project`` using ``$filter`` and ``$slice``.
+
+    With a ``slice_threshold``, a ``$facet`` lets the server unwind arrays holding
+    fewer embedded documents than the threshold, in the same aggregation.
+    """
+    items: Any = f"${embed_name}"
+    if condition is not None:
+        items = {"$filter": {"input": items, "as": "item", "cond": condition}}
+    if skip is not None or limit is not None:
+        items = {"$slice": [items, skip or 0, limit or _SLICE_ALL]}
+    projected = [{"$project": {"_id": 0, "items": items}}]
+
+    if slice_threshold > 0:
+        # The array reaches the threshold if its last required index exists
+        threshold_path = f"{embed_name}.{slice_threshold - 1}"
+        facet = {
+            "unwound": [
+                {"$match": {threshold_path: {"$exists": False}}},
+                *_unwind_stages(embed_name, filters, skip=skip, limit=limit),
+            ],
+            "projected": [
+                {"$match": {threshold_path: {"$exists": True}}},
+                *projected,
+            ],
+        }
+        pipeline = [{"$match": parent_filter}, {"$facet": facet}]
+    else:
+        pipeline = [{"$match": parent_filter}, *projected]
+
+    async for document in db[parent_collection_name].aggregate(
+        pipeline, **max_time_kwargs()
+    ):
+        if slice_threshold <= 0:
+            return document.get("items") or []
+        if document["unwound"]:
+            return document["unwound"]
+        if document["projected"]:
+            return document["projected"][0].get("items") or []
+    return []
 
 
 async def get_all(
@@ -37,31 +218,52 @@ async def get_all(
     order_by: int = 1,
     filters: dict | None = None,
     parent_identifier_field: str = "_id",
+    slice_threshold: int | None = 0,
 ) -> list:
     """
     Get all embeded documents from the database
+
+    Without sort and with equality filters on scalar fields only, the page is built
+    with ``$slice``/``$filter`` on parents holding at least ``slice_threshold``
+    embedded documents, instead of unwinding the whole array.
+    ``slice_threshold=None`` always unwinds.
     """
     try:
-        pipeline = [
-            {"$match": _parent_filter(id, parent_identifier_field)},
-            {"$unwind": f"${embed_name}"},
-            {"$replaceRoot": {"newRoot": f"${embed_name}"}},
-        ]
-        if filters is not None:
-            pipeline.append({"$match": filters})
-        if sort_by is not None:
-            pipeline.append({"$sort": {sort_by: order_by}})
-        if skip is not None:
-            pipeline.append({"$skip": skip})
-        if limit is not None:
-            pipeline.append({"$limit": limit})
-
-        documents = db[parent_collection_name].aggregate(pipeline)
+        parent_filter = _parent_filter(id, parent_identifier_field)
+        if slice_threshold is not None and sort_by is None:
+            condition = None if not filters else _filter_expression(filters, model)
+            if not filters or condition is not None:
+                try:
+                    documents = await _get_all_projected(
+                        db,
+                        parent_filter,
+                        parent_collection_name,
+                        embed_name,
+                        skip,
+                        limit,
+                        filters,
+                        condition,
+                        slice_threshold,
+                    )
+                    return [model.from_mongo(document) for document in documents]
+                except NotImplementedError:
+                    pass
+
+        documents = db[parent_collection_name].aggregate(
+            [
+                {"$match": parent_filter},
+                *_unwind_stages(embed_name, filters, sort_by, order_by, skip, limit),
+            ],
+            **max_time_kwargs(),
+        )
 
         models = []
-        async for document in documents:
-            models.append(model.from_mongo(document))
+        async with closing_cursor(documents):
+            async for document in documents:
+                models.append(model.from_mongo(document))
         return models
+    except ExecutionTimeout:
+        raise
     except Exception:
         return []
 
@@ -78,20 +280,32 @@ async def get_one(
 ) -> MongoModel | None:
     """
     Get a document from the database
+
+    The parent filter on ``{embed_name}.{identifier}`` can use a multikey index,
+    and the ``$elemMatch`` projection only returns the matching sub-document.
     """
     try:
-        document = db[parent_collection_name].aggregate(
-            [
-                {"$match": _parent_filter(id, parent_identifier_field)},
-                {"$unwind": f"${embed_name}"},
-                {"$replaceRoot": {"newRoot": f"${embed_name}"}},
-                {"$match": _embed_filter(embed_id, embed_identifier_field)},
-            ]
+        document = await db[parent_collection_name].find_one(
+            _parent_embed_filter(
+                id,
+                embed_id,
+                embed_name,
+                parent_identifier_field,
+                embed_identifier_field,
+            ),
+            {
+                "_id": 0,
+                embed_name: {
+                    "$elemMatch": _embed_filter(embed_id, embed_identifier_field)
+                },
+            },
+            **cursor_max_time_kwargs(),
         )
-        models = []
-        async for document in document:
-            models.append(model.from_mongo(document))
-        return models[0]
+        if not document or not document.get(embed_name):
+            return None
+        return model.from_mongo(document[embed_name][0])
+    except ExecutionTimeout:
+        raise
     except Exception:
         return None
 
@@ -104,6 +318,7 @@ async def create_one(
     data: MongoModel,
     model: MongoModel,
     parent_identifier_field: str = "_id",
+    changes_field: str | None = None,
 ) -> MongoModel:
     """
     Create a new document in the database
@@ -111,12 +326,47 @@ async def create_one(
     document_mongo = data.to_mongo(add_id=True)
     await db[parent_collection_name].update_one(
         _parent_filter(id, parent_identifier_field),
-        {"$push": {embed_name: document_mongo}},
+        _stamped({"$push": {embed_name: document_mongo}}, changes_field),
     )
 
     return model.from_mongo(document_mongo)
 
 
+async def create_many(
+    db,
+    id: str,
+    parent_collection_name: str,
+    embed_name: str,
+    data: list[MongoModel],
+    model: MongoModel,
+    parent_identifier_field: str = "_id",
+    sort_by: str | None = None,
+    order_by: int = 1,
+    slice: int | None = None,
+    changes_field: str | None = None,
+) -> list[MongoModel] | None:
+    """
+    Create many documents in the database with a single ``$push``/``$each``
+
+    ``sort_by`` and ``slice`` are applied to the whole array by the same update,
+    ``slice`` keeps the first items when positive and the last ones when negative.
+    """
+    documents_mongo = [item.to_mongo(add_id=True) for item in data]
+    push: dict[str, Any] = {"$each": documents_mongo}
+    if sort_by is not None:
+        push["$sort"] = {sort_by: order_by}
+    if slice is not None:
+        push["$slice"] = slice
+    result = await db[parent_collection_name].update_one(
+        _parent_filter(id, parent_identifier_field),
+        _stamped({"$push": {embed_name: push}}, changes_field),
+    )
+    if not result.matched_count:
+        return None
+
+    return [model.from_mongo(document) for document in documents_mongo]
+
+
 async def update_one(
     db,
     id: str,
@@ -127,39 +377,157 @@ async def update_one(
     model: MongoModel,
     parent_identifier_field: str = "_id",
     embed_identifier_field: str = "_id",
+    changes_field: str | None = None,
 ) -> MongoModel:
     """
     Update a document in the database
     """
     document_mongo = data.to_mongo(add_id=False)
-    if embed_identifier_field == "_id":
-        try:
-            document_mongo["_id"] = ObjectId(embed_id)
-        except (InvalidId, TypeError):
-            document_mongo[embed_identifier_field] = embed_id
-    else:
-        document_mongo[embed_identifier_field] = embed_id
-    parent_filter = _parent_filter(id, parent_identifier_field)
-    embed_key = (
-        f"{embed_name}._id"
-        if embed_identifier_field == "_id"
-        else f"{embed_name}.{embed_identifier_field}"
+    document_mongo.update(_embed_filter(embed_id, embed_identifier_field))
+    parent_filter = _parent_embed_filter(
+        id, embed_id, embed_name, parent_identifier_field, embed_identifier_field
     )
-    if embed_identifier_field == "_id":
-        try:
-            parent_filter[embed_key] = ObjectId(embed_id)
-        except (InvalidId, TypeError):
-            parent_filter[embed_key] = embed_id
-    else:
-        parent_filter[embed_key] = embed_id
     await db[parent_collection_name].update_one(
         parent_filter,
-        {"$set": {f"{embed_name}.$": document_mongo}},
+        _stamped({"$set": {f"{embed_name}.$": document_mongo}}, changes_field),
     )
 
     return model.from_mongo(document_mongo)
 
 
+def _embed_set_paths(
+    data: MongoModel, prefix: str, embed_identifier_field: str
+) -> dict:
+    """Build the ``$set`` paths of an embedded patch, the identifier cannot be patched."""
+    return {
+        path: value
+        for path, value in set_paths(data, prefix).items()
+        if path not in (f"{prefix}_id", f"{prefix}{embed_identifier_field}")
+    }
+
+
+def _array_filters_update(
+    embed_ids: list[str],
+    embed_name: str,
+    data: MongoModel,
+    embed_identifier_field: str = "_id",
+) -> tuple[dict, list[dict]]:
+    """Build the update and ``arrayFilters`` patching every listed embedded document."""
+    values = [
+        _embed_identifier_value(embed_id, embed_identifier_field)
+        for embed_id in embed_ids
+    ]
+    update = {
+        "$set": _embed_set_paths(data, f"{embed_name}.$[item].", embed_identifier_field)
+    }
+    return update, [{f"item.{embed_identifier_field}": {"$in": values}}]
+
+
+async def patch_one(
+    db,
+    id: str,
+    embed_id: str,
+    parent_collection_name: str,
+    embed_name: str,
+    data: MongoModel,
+    model: MongoModel,
+    parent_identifier_field: str = "_id",
+    embed_identifier_field: str = "_id",
+    changes_field: str | None = None,
+) -> MongoModel | None:
+    """
+    Partially update a document in the database
+
+    Only the fields set by the client are written, with ``{embed_name}.$.{field}`` paths.
+    """
+    parent_filter = _parent_embed_filter(
+        id, embed_id, embed_name, parent_identifier_field, embed_identifier_field
+    )
+    fields = _embed_set_paths(data, f"{embed_name}.$.", embed_identifier_field)
+    if not fields:
+        return await get_one(
+            db,
+            id,
+            embed_id,
+            parent_collection_name,
+            embed_name,
+            model,
+            parent_identifier_field,
+            embed_identifier_field,
+        )
+    document = await db[parent_collection_name].find_one_and_update(
+        parent_filter,
+        _stamped({"$set": fields}, changes_field),
+        projection={
+            "_id": 0,
+            embed_name: {"$elemMatch": _embed_filter(embed_id, embed_identifier_field)},
+        },
+        return_document=ReturnDocument.AFTER,
+        **max_time_kwargs(),
+    )
+    if not document or not document.get(embed_name):
+        return None
+    return model.from_mongo(document[embed_name][0])
+
+
+async def patch_many(
+    db,
+    id: str,
+    embed_ids: list[str],
+    parent_collection_name: str,
+    embed_name: str,
+    data: MongoModel,
+    parent_identifier_field: str = "_id",
+    embed_identifier_field: str = "_id",
+    changes_field: str | None = None,
+) -> int:
+    """
+    Partially update many documents in the database with a single ``arrayFilters`` update
+
+    Returns the number of parent documents holding at least one of the embedded documents.
+    """
+    update, array_filters = _array_filters_update(
+        embed_ids, embed_name, data, embed_identifier_field
+    )
+    parent_filter = _parent_filter(id, parent_identifier_field)
+    parent_filter[f"{embed_name}.{embed_identifier_field}"] = array_filters[0][
+        f"item.{embed_identifier_field}"
+    ]
+    if not update["$set"]:
+        return await db[parent_collection_name].count_documents(
+            parent_filter, limit=1, **max_time_kwargs()
+        )
+    try:
+        result = await db[parent_collection_name].update_one(
+            parent_filter, _stamped(update, changes_field), array_filters=array_filters
+        )
+        return result.matched_count
+    except NotImplementedError:
+        # Some backends (e.g. mongomock) do not support arrayFilters,
+        # patch each embedded document with a positional update instead.
+        matched_count = 0
+        for embed_id in embed_ids:
+            result = await db[parent_collection_name].update_one(
+                _parent_embed_filter(
+                    id,
+                    embed_id,
+                    embed_name,
+                    parent_identifier_field,
+                    embed_identifier_field,
+                ),
+                _stamped(
+                    {
+                        "$set": _embed_set_paths(
+                            data, f"{embed_name}.$.", embed_identifier_field
+                        )
+                    },
+                    changes_field,
+                ),
+            )
+            matched_count = max(matched_count, result.matched_count)
+        return matched_count
+
+
 async def delete_one(
     db,
     id: str,
@@ -169,33 +537,88 @@ async def delete_one(
     model: MongoModel,
     parent_identifier_field: str = "_id",
     embed_identifier_field: str = "_id",
+    changes_field: str | None = None,
 ) -> Response | None:
     """
     Delete a document in the database
     """
     try:
-        await db[parent_collection_name].update_one(
-            _parent_filter(id, parent_identifier_field),
-            {
-                "$pull": {
-                    f"{embed_name}": _embed_filter(embed_id, embed_identifier_field)
-                }
-            },
-        )
-        return (
-            DeletedModelOut.from_mongo({"_id": embed_id})
-            if await get_one(
-                db,
+        # only the parent holding the document is matched, and stamped
+        result = await db[parent_collection_name].update_one(
+            _parent_embed_filter(
                 id,
                 embed_id,
-                parent_collection_name,
                 embed_name,
-                model,
                 parent_identifier_field,
                 embed_identifier_field,
-            )
-            is None
+            ),
+            _stamped(
+                {
+                    "$pull": {
+                        f"{embed_name}": _embed_filter(embed_id, embed_identifier_field)
+                    }
+                },
+                changes_field,
+            ),
+        )
+        return (
+            DeletedModelOut.from_mongo({"_id": embed_id})
+            if result.modified_count
             else None
         )
     except Exception:
         return None
+
+
+async def delete_many(
+    db,
+    id: str,
+    embed_ids: list[str],
+    parent_collection_name: str,
+    embed_name: str,
+    parent_identifier_field: str = "_id",
+    embed_identifier_field: str = "_id",
+    changes_field: str | None = None,
+) -> list[DeletedModelOut] | None:
+    """
+    Delete many documents in the database with a single ``$pull``
+
+    Only the identifiers of the pulled documents are returned, read from the
+    identifiers of the parent before the update.
+    """
+    values = {
+        embed_id: _embed_identifier_value(embed_id, embed_identifier_field)
+        for embed_id in embed_ids
+    }
+    try:
+        before = await db[parent_collection_name].find_one_and_update(
+            _parent_filter(id, parent_identifier_field),
+            _stamped(
+                {
+                    "$pull": {
+                        embed_name: {
+                            embed_identifier_field: {"$in": list(values.values())}
+                        }
+                    }
+                },
+                changes_field,
+            ),
+            projection={"_id": 0, f"{embed_name}.{embed_identifier_field}": 1},
+            return_document=ReturnDocument.BEFORE,
+            **max_time_kwargs(),
+        )
+    except ExecutionTimeout:
+        raise
+    except Exception:
+        return None
+    if before is None:
+        return None
+
+    existing = {
+        str(item.get(embed_identifier_field)) for item in before.get(embed_name) or []
+    }
+    return [
+        DeletedModelOut.from_mongo({"_id": embed_id})
+        for embed_id, value in values.items()
+        if str(value) in existing
+    ]
@@ -3,6 +3,7 @@ from fastapi import APIRouter
 
 from .CRUDRouterFactory import CRUDRouterFactory
 from ..models.CRUDLookup import CRUDLookup
+from ..metrics.labels import label_route
 
 
 class CRUDLookupRouterFactory(APIRouter):
@@ -13,7 +14,10 @@ class CRUDLookupRouterFactory(APIRouter):
         self.child_args = child_args
 
     def _add_api_route(self, path: str, endpoint: Callable, **kwargs: Any) -> None:
-        self.parent_router._add_api_route(path, endpoint, **kwargs)
+        label_route(endpoint, self.child_args.collection_name, "lookup")
+        self.parent_router._add_api_route(
+            path, endpoint, max_time_ms=self.child_args.max_time_ms, **kwargs
+        )
 
     def _get_all(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
         return self.parent_router._get_all(*args, **kwargs)
@@ -0,0 +1,237 @@
+import threading
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterable
+from fastapi import APIRouter
+from pymongo import monitoring
+from ..utils.shapes import COLLECTION_COMMANDS, command_shape
+from .MetricsRegistry import MetricsRegistry
+
+# the buckets of the command durations, in seconds
+COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1, 5)
+MAX_OPEN_CURSORS = 1024
+
+
+@dataclass
+class CommandRecord:
+    """A command that ran over the slow threshold."""
+
+    collection: str
+    command: str
+    shape: dict | None
+    duration_ms: float
+    documents: int | None
+    failed: bool
+    at: datetime
+
+
+@dataclass
+class CommandStats:
+    """The commands of a collection, by command name."""
+
+    count: int = 0
+    failures: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    documents: int = 0
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    CommandMonitor records the commands the driver sends for the CRUD routers.
+
+    Pass it to the client, ``AsyncIOMotorClient(url, event_listeners=[monitor])``:
+    the driver only takes listeners when a client is created. The routers given the
+    monitor then add their collections, and those of their lookups and populates,
+    to the collections it records; commands on other collections are ignored.
+
+    For each command, it records its duration and the number of documents it
+    returned or wrote, by collection and command. The commands slower than
+    ``slow_ms`` are kept, with the shape of their filter or pipeline, literals
+    stripped, in a ring buffer of the last ``capacity`` slow commands. The
+    ``getMore`` commands of a cursor carry the shape of the query which opened it.
+
+    :param slow_ms: The duration, in milliseconds, over which a command is slow.
+    :type slow_ms: float
+    :param capacity: The number of slow commands kept.
+    :type capacity: int
+    :param metrics: (Optional) Registry recording the command durations, as
+        ``crudrouter_command_duration_seconds`` by collection and command.
+    :type metrics: MetricsRegistry | None
+    """
+
+    def __init__(
+        self,
+        slow_ms: float = 100,
+        capacity: int = 100,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self.slow_ms = slow_ms
+        self.collections: set[str] = set()
+        self.slow_commands: deque[CommandRecord] = deque(maxlen=capacity)
+        self.stats: dict[tuple[str, str], CommandStats] = {}
+        self.duration = (
+            metrics.histogram(
+                "crudrouter_command_duration_seconds",
+                "Duration of the commands sent for the CRUD routes, in seconds.",
+                ("collection", "command"),
+                COMMAND_BUCKETS,
+            )
+            if metrics is not None
+            else None
+        )
+        # the driver calls the listener from its own threads
+        self._lock = threading.Lock()
+        # collection, command name, shape and cursor id of the running commands
+        self._started: dict[tuple, tuple] = {}
+        self._cursors: OrderedDict[int, dict | None] = OrderedDict()
+
+    def watch(self, collections: Iterable[str]) -> None:
+        """
+        Record the commands sent on the given collections.
+
+        :param collections: The collection names.
+        :type collections: Iterable[str]
+        """
+        self.collections.update(collections)
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        command_name = event.command_name
+        if command_name in COLLECTION_COMMANDS:
+            collection = event.command.get(command_name)
+        elif command_name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            return
+        if collection not in self.collections:
+            return
+        cursor_id = None
+        if command_name == "getMore":
+            cursor_id = event.command.get("getMore")
+            with self._lock:
+                shape = self._cursors.get(cursor_id)
+        else:
+            shape = command_shape(command_name, event.command)
+        with self._lock:
+            self._started[self._key(event)] = (
+                collection,
+                command_name,
+                shape,
+                cursor_id,
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        with self._lock:
+            started = self._started.pop(self._key(event), None)
+        if started is None:
+            return
+        reply = event.reply
+        cursor = reply.get("cursor")
+        if cursor is not None:
+            batch = cursor.get("firstBatch", cursor.get("nextBatch", []))
+            documents = len(batch)
+            self._track_cursor(started[3], cursor.get("id", 0), started[2])
+        elif "value" in reply:
+            documents = 0 if reply["value"] is None else 1
+        else:
+            documents = reply.get("n")
+        self._record(started, event.duration_micros, documents, False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        with self._lock:
+            started = self._started.pop(self._key(event), None)
+        if started is not None:
+            self._record(started, event.duration_micros, None, True)
+
+    def _key(self, event: Any) -> tuple:
+        return (event.connection_id, event.request_id)
+
+    def _track_cursor(
+        self, previous_id: int | None, cursor_id: int, shape: dict | None
+    ) -> None:
+        with self._lock:
+            if previous_id is not None and not cursor_id:
+                # the getMore exhausted the cursor
+                self._cursors.pop(previous_id, None)
+            if not cursor_id:
+                return
+            self._cursors[cursor_id] = shape
+            self._cursors.move_to_end(cursor_id)
+            if len(self._cursors) > MAX_OPEN_CURSORS:
+                self._cursors.popitem(last=False)
+
+    def _record(
+        self,
+        started: tuple,
+        duration_micros: int,
+        documents: int | None,
+        failed: bool,
+    ) -> None:
+        collection, command_name, shape, _ = started
+        duration_ms = duration_micros / 1000
+        with self._lock:
+            stats = self.stats.setdefault((collection, command_name), CommandStats())
+            stats.count += 1
+            stats.failures += failed
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            stats.documents += documents or 0
+            if duration_ms >= self.slow_ms:
+                self.slow_commands.append(
+                    CommandRecord(
+                        collection=collection,
+                        command=command_name,
+                        shape=shape,
+                        duration_ms=duration_ms,
+                        documents=documents,
+                        failed=failed,
+                        at=datetime.now(timezone.utc),
+                    )
+                )
+        if self.duration is not None:
+            self.duration.observe(collection, command_name, value=duration_ms / 1000)
+
+    def report(self) -> dict[str, Any]:
+        """
+        Return the slow commands, the slowest first, and the stats by collection.
+
+        :rtype: dict[str, Any]
+        """
+        with self._lock:
+            slow_commands = sorted(
+                self.slow_commands, key=lambda record: -record.duration_ms
+            )
+            stats = {
+                f"{collection}.{command}": asdict(command_stats)
+                for (collection, command), command_stats in self.stats.items()
+            }
+        return {
+            "slow_ms": self.slow_ms,
+            "slow_commands": [asdict(record) for record in slow_commands],
+            "stats": stats,
+        }
+
+    def router(self, path: str = "/debug/slow-commands", **kwargs: Any) -> APIRouter:
+        """
+        Return a router exposing the report on a ``GET`` route.
+
+        :param path: The path of the route.
+        :type path: str
+        :param kwargs: The kwargs to be passed to the APIRouter.
+        :type kwargs: Any
+        :rtype: APIRouter
+        """
+        router = APIRouter(**kwargs)
+
+        async def route() -> dict[str, Any]:
+            return self.report()
+
+        router.add_api_route(
+            path,
+            route,
+            methods=["GET"],
+            include_in_schema=False,
+            summary="Get the slow commands of the CRUD routes",
+        )
+        return router
@@ -0,0 +1,245 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from time import monotonic
+from typing import Any
+from fastapi import APIRouter
+from ..utils.shapes import query_shape
+
+# the operators which match a range of values, last in an ESR index
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$ne", "$nin", "$regex", "$exists"}
+
+
+@dataclass
+class QueryShape:
+    """A query shape of a collection, with an example query to explain."""
+
+    collection: str
+    shape: dict
+    filter: dict | None = None
+    sort: dict | None = None
+    projection: dict | None = None
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    collection_scan: bool | None = None
+    in_memory_sort: bool | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "collection": self.collection,
+            "shape": self.shape,
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "collection_scan": self.collection_scan,
+            "in_memory_sort": self.in_memory_sort,
+            "error": self.error,
+        }
+
+
+def suggest_index(shape: dict) -> list[tuple[str, int]]:
+    """
+    Suggest a compound index for a query shape, in ESR order.
+
+    Fields matched by equality come first, then the sort fields, then the fields
+    matched by a range. Fields under ``$or`` are left out, they need an index each.
+
+    :param shape: The query shape, with its ``filter`` and ``sort``.
+    :type shape: dict
+    :return: The index keys and directions.
+    :rtype: list[tuple[str, int]]
+    """
+    equality: list[str] = []
+    ranges: list[str] = []
+
+    def visit(filter_shape: dict) -> None:
+        for key, value in filter_shape.items():
+            if key == "$and":
+                for clause in value if isinstance(value, list) else []:
+                    visit(clause)
+                continue
+            if key.startswith("$"):
+                continue
+            operators = set(value) if isinstance(value, dict) else set()
+            target = ranges if operators & RANGE_OPERATORS else equality
+            if key not in target:
+                target.append(key)
+
+    visit(shape.get("filter", {}))
+    keys = [(key, 1) for key in equality]
+    for key, direction in (shape.get("sort") or {}).items():
+        if key not in equality:
+            keys.append((key, direction))
+    used = {key for key, _ in keys}
+    keys += [(key, 1) for key in ranges if key not in used]
+    return keys
+
+
+def _stages(plan: Any) -> set[str]:
+    if isinstance(plan, list):
+        return set().union(*(_stages(item) for item in plan))
+    if not isinstance(plan, dict):
+        return set()
+    stages = {plan["stage"]} if isinstance(plan.get("stage"), str) else set()
+    for key, value in plan.items():
+        if key != "rejectedPlans":
+            stages |= _stages(value)
+    return stages
+
+
+class IndexAdvisor:
+    """
+    IndexAdvisor records the query shapes of the get all routes and explains them.
+
+    Each query is recorded by shape, its filter keys and operators with literals
+    stripped, its sort and its projection, with its frequency and latency. Every
+    ``interval`` seconds, the next recorded query runs ``explain`` on the ``top``
+    shapes with the most time spent, in the background. The report lists those
+    which scan the collection or sort in memory, with a compound index suggested in
+    ESR order: equality, sort, then range fields.
+
+    :param top: The number of shapes explained.
+    :type top: int
+    :param interval: The minimum time, in seconds, between two analyses.
+    :type interval: float
+    :param max_shapes: The maximum number of shapes recorded, new shapes are ignored
+        past it.
+    :type max_shapes: int
+    """
+
+    def __init__(
+        self, top: int = 10, interval: float = 300, max_shapes: int = 1000
+    ) -> None:
+        self.top = top
+        self.interval = interval
+        self.max_shapes = max_shapes
+        self.shapes: dict[tuple[str, str], QueryShape] = {}
+        self.analyzed_at: datetime | None = None
+        self._collections: dict[str, Any] = {}
+        self._next_analysis = monotonic() + interval
+        self._analysis: asyncio.Future | None = None
+
+    def record(
+        self,
+        collection,
+        filters: dict | None,
+        sort: dict | None,
+        projection: dict | None,
+        duration: float,
+    ) -> None:
+        """
+        Record a query, and start an analysis if the last one is old enough.
+
+        :param collection: The collection queried.
+        :type collection: AsyncIOMotorCollection
+        :param filters: The filter of the query.
+        :type filters: dict | None
+        :param sort: The sort of the query.
+        :type sort: dict | None
+        :param projection: The projection of the query.
+        :type projection: dict | None
+        :param duration: The duration of the query, in seconds.
+        :type duration: float
+        """
+        shape = {"filter": query_shape(filters or {})}
+        if sort:
+            shape["sort"] = dict(sort)
+        if projection:
+            shape["projection"] = dict(projection)
+        key = (collection.name, json.dumps(shape))
+        query = self.shapes.get(key)
+        if query is None:
+            if len(self.shapes) >= self.max_shapes:
+                return
+            self._collections[collection.name] = collection
+            query = self.shapes[key] = QueryShape(collection.name, shape)
+        query.filter, query.sort, query.projection = filters or {}, sort, projection
+        duration_ms = duration * 1000
+        query.count += 1
+        query.total_ms += duration_ms
+        query.max_ms = max(query.max_ms, duration_ms)
+        if monotonic() >= self._next_analysis and (
+            self._analysis is None or self._analysis.done()
+        ):
+            self._analysis = asyncio.ensure_future(self.analyze())
+
+    def top_shapes(self) -> list[QueryShape]:
+        """
+        Return the ``top`` shapes with the most time spent.
+
+        :rtype: list[QueryShape]
+        """
+        return sorted(self.shapes.values(), key=lambda query: -query.total_ms)[
+            : self.top
+        ]
+
+    async def analyze(self) -> None:
+        """Explain the top shapes, with the last query recorded of each."""
+        self._next_analysis = monotonic() + self.interval
+        for query in self.top_shapes():
+            collection = self._collections[query.collection]
+            command = {"find": collection.name, "filter": query.filter}
+            if query.sort:
+                command["sort"] = query.sort
+            if query.projection:
+                command["projection"] = query.projection
+            try:
+                explained = await collection.database.command(
+                    {"explain": command, "verbosity": "queryPlanner"}
+                )
+            except Exception as e:
+                query.error = str(e)
+                continue
+            stages = _stages(explained.get("queryPlanner", {}).get("winningPlan"))
+            query.collection_scan = "COLLSCAN" in stages
+            query.in_memory_sort = "SORT" in stages
+            query.error = None
+        self.analyzed_at = datetime.now(timezone.utc)
+
+    def report(self) -> dict[str, Any]:
+        """
+        Return the top shapes, and the indexes suggested for those which scan the
+        collection or sort in memory.
+
+        :rtype: dict[str, Any]
+        """
+        shapes = self.top_shapes()
+        return {
+            "analyzed_at": self.analyzed_at,
+            "shapes": [query.to_dict() for query in shapes],
+            "advice": [
+                {
+                    **query.to_dict(),
+                    "suggested_index": suggest_index(query.shape),
+                }
+                for query in shapes
+                if query.collection_scan or query.in_memory_sort
+            ],
+        }
+
+    def router(self, path: str = "/debug/index-advice", **kwargs: Any) -> APIRouter:
+        """
+        Return a router exposing the report on a ``GET`` route.
+
+        :param path: The path of the route.
+        :type path: str
+        :param kwargs: The kwargs to be passed to the APIRouter.
+        :type kwargs: Any
+        :rtype: APIRouter
+        """
+        router = APIRouter(**kwargs)
+
+        async def route() -> dict[str, Any]:
+            return self.report()
+
+        router.add_api_route(
+            path,
+            route,
+            methods=["GET"],
+            include_in_schema=False,
+            summary="Get the index advice of the CRUD routes",
+        )
+        return router
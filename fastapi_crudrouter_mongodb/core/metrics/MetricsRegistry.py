@@ -0,0 +1,325 @@
+import math
+import threading
+from bisect import bisect_left
+from typing import Any, Sequence
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+SIZE_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], **extra: str) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """
+    A counter, by label values. It can be updated from the driver threads, e.g. by
+    the CommandMonitor.
+
+    :param name: The metric name.
+    :type name: str
+    :param documentation: The help text of the metric.
+    :type documentation: str
+    :param labelnames: The names of the labels.
+    :type labelnames: Sequence[str]
+    """
+
+    kind = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        """
+        Increment the counter of the given label values.
+
+        :param labels: The label values, in the order of ``labelnames``.
+        :type labels: Any
+        :param amount: The increment.
+        :type amount: float
+        """
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = list(self.values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+
+class Histogram:
+    """
+    A histogram, by label values. It can be updated from the driver threads, e.g. by
+    the CommandMonitor.
+
+    :param name: The metric name.
+    :type name: str
+    :param documentation: The help text of the metric.
+    :type documentation: str
+    :param labelnames: The names of the labels.
+    :type labelnames: Sequence[str]
+    :param buckets: The upper bounds of the buckets.
+    :type buckets: Sequence[float]
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # per label values: the count of each bucket, the sum and the count
+        self.values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *labels: Any, value: float) -> None:
+        """
+        Record a value for the given label values.
+
+        :param labels: The label values, in the order of ``labelnames``.
+        :type labels: Any
+        :param value: The observed value.
+        :type value: float
+        """
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self.values.get(labels)
+            if entry is None:
+                entry = self.values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            entry[0][bucket] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = [
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in self.values.items()
+            ]
+        samples = []
+        for labels, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(
+                    self.labelnames, labels, le=_format_value(bound)
+                )
+                samples.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            samples.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            samples.append(f"{self.name}_count{label_text} {count}")
+        return samples
+
+
+class MetricsRegistry:
+    """
+    MetricsRegistry keeps the metrics of CRUD routers in memory.
+
+    Share one registry between the routers of an app, and include ``router()`` in
+    the app to expose it in the Prometheus text format. Each router records:
+
+    - ``crudrouter_requests_total``, by collection, operation, subrouter and status
+      code,
+    - ``crudrouter_request_duration_seconds``, by collection, operation and
+      subrouter,
+    - ``crudrouter_result_size``, the number of documents returned, by collection,
+      operation and subrouter,
+    - ``crudrouter_cache_requests_total``, the document cache lookups, by collection
+      and result, ``hit`` or ``miss``.
+
+    :param duration_buckets: The buckets of the request durations, in seconds.
+    :type duration_buckets: Sequence[float]
+    :param size_buckets: The buckets of the result sizes.
+    :type size_buckets: Sequence[float]
+    """
+
+    def __init__(
+        self,
+        duration_buckets: Sequence[float] = DURATION_BUCKETS,
+        size_buckets: Sequence[float] = SIZE_BUCKETS,
+    ) -> None:
+        self.metrics: dict[str, Counter | Histogram] = {}
+        route_labels = ("collection", "operation", "subrouter")
+        self.requests = self.counter(
+            "crudrouter_requests_total",
+            "Requests handled by the CRUD routes.",
+            route_labels + ("code",),
+        )
+        self.request_duration = self.histogram(
+            "crudrouter_request_duration_seconds",
+            "Duration of the requests handled by the CRUD routes, in seconds.",
+            route_labels,
+            duration_buckets,
+        )
+        self.result_size = self.histogram(
+            "crudrouter_result_size",
+            "Number of documents returned by the CRUD routes.",
+            route_labels,
+            size_buckets,
+        )
+        self.cache_requests = self.counter(
+            "crudrouter_cache_requests_total",
+            "Lookups of the document cache.",
+            ("collection", "result"),
+        )
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """
+        Return the counter of a name, registering it on the first call.
+
+        :param name: The metric name.
+        :type name: str
+        :param documentation: The help text of the metric.
+        :type documentation: str
+        :param labelnames: The names of the labels.
+        :type labelnames: Sequence[str]
+        :rtype: Counter
+        """
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> Histogram:
+        """
+        Return the histogram of a name, registering it on the first call.
+
+        :param name: The metric name.
+        :type name: str
+        :param documentation: The help text of the metric.
+        :type documentation: str
+        :param labelnames: The names of the labels.
+        :type labelnames: Sequence[str]
+        :param buckets: The upper bounds of the buckets.
+        :type buckets: Sequence[float]
+        :rtype: Histogram
+        """
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        existing = self.metrics.get(metric.name)
+        if existing is None:
+            self.metrics[metric.name] = metric
+            return metric
+        if existing.kind != metric.kind or existing.labelnames != metric.labelnames:
+            raise ValueError(f"Metric {metric.name} is already registered differently")
+        return existing
+
+    def observe_request(
+        self,
+        collection: str,
+        operation: str,
+        subrouter: str,
+        status_code: int,
+        duration: float,
+        result_size: int | None = None,
+    ) -> None:
+        """
+        Record a request handled by a CRUD route.
+
+        :param collection: The collection of the router.
+        :type collection: str
+        :param operation: The operation, e.g. ``find_all``.
+        :type operation: str
+        :param subrouter: The subrouter type, ``lookup``, ``embed``, ``populate``
+            or ``none``.
+        :type subrouter: str
+        :param status_code: The response status code.
+        :type status_code: int
+        :param duration: The duration of the request, in seconds.
+        :type duration: float
+        :param result_size: The number of documents returned, if known.
+        :type result_size: int | None
+        """
+        self.requests.inc(collection, operation, subrouter, status_code)
+        self.request_duration.observe(collection, operation, subrouter, value=duration)
+        if result_size is not None:
+            self.result_size.observe(
+                collection, operation, subrouter, value=result_size
+            )
+
+    def observe_cache(self, collection: str, hit: bool) -> None:
+        """
+        Record a lookup of the document cache.
+
+        :param collection: The collection of the document.
+        :type collection: str
+        :param hit: Whether the document was cached.
+        :type hit: bool
+        """
+        self.cache_requests.inc(collection, "hit" if hit else "miss")
+
+    def render(self) -> str:
+        """
+        Return the metrics in the Prometheus text exposition format.
+
+        :rtype: str
+        """
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def router(self, path: str = "/metrics", **kwargs: Any) -> APIRouter:
+        """
+        Return a router exposing the metrics on a ``GET`` route.
+
+        :param path: The path of the route.
+        :type path: str
+        :param kwargs: The kwargs to be passed to the APIRouter.
+        :type kwargs: Any
+        :rtype: APIRouter
+        """
+        router = APIRouter(**kwargs)
+
+        async def route() -> PlainTextResponse:
+            return PlainTextResponse(
+                self.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+            )
+
+        router.add_api_route(
+            path,
+            route,
+            methods=["GET"],
+            include_in_schema=False,
+            summary="Get the metrics of the CRUD routes",
+        )
+        return router
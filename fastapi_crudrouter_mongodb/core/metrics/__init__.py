@@ -0,0 +1,15 @@
+from .MetricsRegistry import Counter, Histogram, MetricsRegistry
+from .CommandMonitor import CommandMonitor, CommandRecord, CommandStats
+from .IndexAdvisor import IndexAdvisor, QueryShape, suggest_index
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "CommandMonitor",
+    "CommandRecord",
+    "CommandStats",
+    "IndexAdvisor",
+    "QueryShape",
+    "suggest_index",
+]
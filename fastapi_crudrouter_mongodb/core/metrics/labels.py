@@ -0,0 +1,41 @@
+from typing import Any, Callable
+
+# the route methods named after a different repository operation
+_OPERATIONS = {
+    "get_all": "find_all",
+    "get_one": "find_one",
+    "get_changes": "find_changes",
+    "update_operators": "update_one_with_operators",
+}
+
+
+def route_operation(endpoint: Callable[..., Any]) -> str:
+    """
+    Return the operation of a route, from the router method which built it.
+
+    :param endpoint: The route, e.g. the ``route`` closure of ``CRUDRouter._get_all``.
+    :type endpoint: Callable[..., Any]
+    :return: The operation, e.g. ``find_all``.
+    :rtype: str
+    """
+    method = endpoint.__qualname__.rsplit(".<locals>", 1)[0].rsplit(".", 1)[-1]
+    method = method.lstrip("_")
+    return _OPERATIONS.get(method, method)
+
+
+def label_route(
+    endpoint: Callable[..., Any], collection: str, subrouter: str = "none"
+) -> None:
+    """
+    Label a route for the metrics, unless a subrouter already labeled it.
+
+    :param endpoint: The route.
+    :type endpoint: Callable[..., Any]
+    :param collection: The collection of the route.
+    :type collection: str
+    :param subrouter: The subrouter type, ``lookup``, ``embed``, ``populate`` or
+        ``none``.
+    :type subrouter: str
+    """
+    if not hasattr(endpoint, "__route_labels__"):
+        endpoint.__route_labels__ = (collection, route_operation(endpoint), subrouter)
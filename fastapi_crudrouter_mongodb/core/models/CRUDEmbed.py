@@ -1,5 +1,26 @@
+from typing import Any
+from ..utils.concerns import resolve_read_concern, resolve_write_concern
+from ..utils.time_budget import validate_max_time_ms
+
+
 class CRUDEmbed:
-    def __init__(self, model, embed_name, identifier_field: str = "_id") -> None:
+    def __init__(
+        self,
+        model,
+        embed_name,
+        identifier_field: str = "_id",
+        slice_threshold: int | None = 0,
+        write_concern: Any = None,
+        read_concern: Any = None,
+        max_time_ms: int | dict[str, int] | None = None,
+    ) -> None:
         self.model = model
         self.embed_name = embed_name
         self.identifier_field = identifier_field
+        self.slice_threshold = slice_threshold
+        # concerns of the embed routes, default to the ones of the parent router
+        # resolved here, so a bad option fails with the configuration
+        self.write_concern = resolve_write_concern(write_concern)
+        self.read_concern = resolve_read_concern(read_concern)
+        # time budget of the embed queries, defaults to the one of the parent router
+        self.max_time_ms = validate_max_time_ms(max_time_ms)
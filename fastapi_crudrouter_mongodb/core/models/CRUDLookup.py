@@ -1,7 +1,45 @@
+from typing import Any
+from bson.codec_options import CodecOptions
 from .mongo_model import MongoModel
+from ..utils.concerns import resolve_read_concern, resolve_write_concern
+from ..utils.time_budget import validate_max_time_ms
 
 
 class CRUDLookup:
+    """
+    Configuration object for a lookup on CRUDRouter.
+
+    :param model: MongoModel subclass of the looked up documents.
+    :type model: type
+    :param model_out: Output schema of the parent document with its looked up documents.
+    :type model_out: type
+    :param collection_name: Collection where the looked up documents are stored.
+    :type collection_name: str
+    :param prefix: Path of the lookup routes, also its name in the ``include``
+        query parameter and the response field holding the joined documents.
+    :type prefix: str
+    :param local_field: Parent field matched against ``foreign_field``.
+    :type local_field: str
+    :param foreign_field: Field of the looked up documents.
+    :type foreign_field: str
+    :param limit: Optional maximum number of joined documents when included,
+        sorted on ``foreign_field``. Requires MongoDB 5.0+.
+    :type limit: int | None
+    :param write_concern: Write concern of the lookup routes, a pymongo write concern
+        or its options. Defaults to the write concern of the parent router.
+    :type write_concern: WriteConcern | dict | None
+    :param read_concern: Read concern of the lookup routes, a pymongo read concern or
+        a level. Defaults to the read concern of the parent router.
+    :type read_concern: ReadConcern | str | None
+    :param codec_options: Codec options of the lookup routes. Defaults to the codec
+        options of the parent router.
+    :type codec_options: CodecOptions | None
+    :param max_time_ms: Time budget of the queries of the lookup routes, in
+        milliseconds, for every route or by operation. Defaults to the budgets of
+        the parent router.
+    :type max_time_ms: int | dict[str, int] | None
+    """
+
     def __init__(
         self,
         model: MongoModel,
@@ -10,6 +48,11 @@ class CRUDLookup:
         prefix: str,
         local_field: str,
         foreign_field: str,
+        limit: int | None = None,
+        write_concern: Any = None,
+        read_concern: Any = None,
+        codec_options: CodecOptions | None = None,
+        max_time_ms: int | dict[str, int] | None = None,
     ):
         self.model = model
         self.model_out = model_out
@@ -17,3 +60,9 @@ class CRUDLookup:
         self.prefix = prefix
         self.local_field = local_field
         self.foreign_field = foreign_field
+        self.limit = limit
+        # resolved here, so a bad option fails with the configuration
+        self.write_concern = resolve_write_concern(write_concern)
+        self.read_concern = resolve_read_concern(read_concern)
+        self.codec_options = codec_options
+        self.max_time_ms = validate_max_time_ms(max_time_ms)
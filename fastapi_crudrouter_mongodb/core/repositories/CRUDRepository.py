@@ -1,10 +1,43 @@
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Any
+import bson
 from bson import ObjectId
+from bson.codec_options import CodecOptions
 from bson.errors import InvalidId
+from bson.raw_bson import RawBSONDocument
 from pydantic import BaseModel
 from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.read_concern import ReadConcern
+from pymongo.write_concern import WriteConcern
 from ..models.mongo_model import MongoModel
 from ..utils.sorting import normalize_order_by
 from ..utils.deprecated_util import deprecated
+from ..utils.partial import set_paths
+from ..utils.matching import prefix_filters
+from ..utils.raw_json import raw_projection, to_plain, transcode
+from ..utils.timing import timed
+from ..utils.sessions import current_session, session_kwargs
+from ..utils.time_budget import (
+    closing_cursor,
+    cursor_max_time_kwargs,
+    max_time_kwargs,
+)
+from ..cache import DocumentCache
+from ..events import EventSource
+from ..metrics import IndexAdvisor, MetricsRegistry
+from .CollectionHandles import CollectionHandles
+from .InsertBatcher import InsertBatcher
+
+
+def _and_filters(filters: dict, other: dict | None) -> dict:
+    """Combine two filters, the second one being optional."""
+    if not other:
+        return filters
+    if not filters:
+        return other
+    return {"$and": [filters, other]}
 
 
 class CRUDRepository:
@@ -16,6 +49,19 @@ class CRUDRepository:
         collection_name: str,
         identifier_field: str = "_id",
         model_out: BaseModel | None = None,
+        batch_create_max_size: int | None = None,
+        batch_create_max_latency: float = 0.005,
+        read_preferences: dict[str, Any] | None = None,
+        changes_field: str | None = None,
+        tombstone_collection_name: str | None = None,
+        event_source: EventSource | None = None,
+        cache: DocumentCache | None = None,
+        changes_window: float = 2.0,
+        write_concern: WriteConcern | None = None,
+        read_concern: ReadConcern | None = None,
+        codec_options: CodecOptions | None = None,
+        metrics: MetricsRegistry | None = None,
+        index_advisor: IndexAdvisor | None = None,
         *args,
         **kwargs,
     ) -> None:
@@ -24,6 +70,33 @@ class CRUDRepository:
         self.collection_name = collection_name
         self.identifier_field = self._to_lower_camel_case(identifier_field)
         self.model_out = model_out
+        self.handles = CollectionHandles(
+            db,
+            codec_options=codec_options,
+            write_concern=write_concern,
+            read_concern=read_concern,
+            read_preferences=read_preferences,
+        )
+        self.insert_batcher = (
+            InsertBatcher(
+                self._collection(),
+                max_size=batch_create_max_size,
+                max_latency=batch_create_max_latency,
+                stamp_field=changes_field,
+            )
+            if batch_create_max_size is not None
+            else None
+        )
+        self.changes_field = changes_field
+        self.changes_window = changes_window
+        self.tombstone_collection_name = tombstone_collection_name
+        self.event_source = event_source
+        self.cache = cache
+        self.metrics = metrics
+        self.index_advisor = index_advisor
+        self.raw_projection = raw_projection(
+            model_out if model_out is not None else model
+        )
 
     def _to_camel_case(self, snake_str):
         return "".join(x.capitalize() for x in snake_str.lower().split("_"))
@@ -50,10 +123,149 @@ class CRUDRepository:
             return ObjectId(value)
         return value
 
+    def _collection(
+        self, read: str | None = None, name: str | None = None, raw: bool = False
+    ):
+        """
+        Return the cached collection handle of the given read.
+
+        :param read: The kind of read, ``get_all``, ``get_one`` or ``populate``,
+            None for writes.
+        :type read: str | None
+        :param name: The collection name, defaults to the repository collection.
+        :type name: str | None
+        :param raw: Return the documents as ``RawBSONDocument``.
+        :type raw: bool
+        :return: The collection.
+        :rtype: AsyncIOMotorCollection
+        """
+        return self.handles.get(name or self.collection_name, read, raw)
+
+    def _raw_json(self, document: RawBSONDocument) -> bytes:
+        """Return the JSON of a raw document, as serialized by the output model."""
+        try:
+            return transcode(document.raw)
+        except ValueError:
+            # types without a JSON transcoding are serialized by the output model
+            model = self.model_out if self.model_out is not None else self.model
+            return (
+                model.model_validate(to_plain(bson.decode(document.raw)))
+                .model_dump_json(by_alias=True)
+                .encode()
+            )
+
+    def _to_model(self, document: dict, apply_model_out: bool = True):
+        """Build the model of a document, and convert it to the output model."""
+        with timed("validate"):
+            model = self.model.from_mongo(document)
+        if self.model_out is not None and apply_model_out:
+            with timed("convert"):
+                model = model.convert_to(model=self.model_out)
+        return model
+
+    def _stamp(self, document: dict) -> dict:
+        """Set the modification date of a replacement from the app clock, when the
+        backend can not stamp it on the server."""
+        if self.changes_field is not None:
+            document[self.changes_field] = datetime.now(timezone.utc)
+        return document
+
+    def _stamp_update(self, update: dict) -> dict:
+        """Stamp an update with the server date, if changes are tracked."""
+        if self.changes_field is None:
+            return update
+        return {**update, "$currentDate": {self.changes_field: True}}
+
+    async def _replace(self, filters: dict, document: dict, find_one: bool, **kwargs):
+        """
+        Replace one document, stamped with the server date if changes are tracked.
+
+        :param filters: The filter of the replaced document.
+        :type filters: dict
+        :param document: The replacement.
+        :type document: dict
+        :param find_one: Return the replaced document instead of the write result.
+        :type find_one: bool
+        :param kwargs: The options of the write.
+        :type kwargs: Any
+        :return: The document, or the write result.
+        :rtype: dict | UpdateResult
+        """
+        collection = self._collection()
+        if self.changes_field is not None:
+            # a pipeline update can set $$NOW, the _id of a match is kept
+            update = [
+                {
+                    "$replaceWith": {
+                        "$mergeObjects": [{"_id": "$_id"}, {"$literal": document}]
+                    }
+                },
+                {"$set": {self.changes_field: "$$NOW"}},
+            ]
+            try:
+                if find_one:
+                    return await collection.find_one_and_update(
+                        filters, update, **kwargs
+                    )
+                return await collection.update_one(filters, update, **kwargs)
+            except NotImplementedError:
+                # Some backends (e.g. mongomock) do not support pipeline updates,
+                # stamp the replacement from the app clock instead.
+                document = self._stamp(document)
+        if find_one:
+            return await collection.find_one_and_replace(filters, document, **kwargs)
+        return await collection.replace_one(filters, document, **kwargs)
+
+    async def _written(
+        self, operation_type: str, document_key: dict, document: dict | None = None
+    ) -> None:
+        """Invalidate the cached document and publish the write to the event source."""
+        if self.cache is not None and operation_type != "insert":
+            key = document_key.get("_id")
+            await self.cache.invalidate(
+                self.collection_name,
+                key if key is not None else next(iter(document_key.values())),
+            )
+        if self.event_source is None or not self.event_source.feeds_from_writes:
+            return
+        self.event_source.publish(
+            {
+                "operationType": operation_type,
+                "documentKey": document_key,
+                "fullDocument": dict(document) if document is not None else None,
+            }
+        )
+
+    async def _written_document(
+        self, operation_type: str, document: dict | None
+    ) -> None:
+        if document is not None:
+            await self._written(operation_type, {"_id": document["_id"]}, document)
+
+    async def mark_written(self, id: str) -> None:
+        """
+        Invalidate the cached document, and publish its update to the event source,
+        after a write made outside of this repository, e.g. by the embed routes.
+
+        :param id: The id of the written document.
+        :type id: str
+        """
+        await self._written(
+            "update", {f"{self.identifier_field}": self._get_identifier_value(id)}
+        )
+
+    async def close(self) -> None:
+        """
+        Write the documents still waiting for their create batch.
+        """
+        if self.insert_batcher is not None:
+            await self.insert_batcher.close()
+
     @deprecated("get_all is deprecated. Use find_all instead.")
     async def get_all(self) -> list:
         return await self.find_all()
 
+    @timed("db")
     async def find_all(
         self,
         skip: int | None = None,
@@ -62,6 +274,7 @@ class CRUDRepository:
         order_by: str | None = None,
         filters: dict | None = None,
         apply_model_out: bool = True,
+        raw: bool = False,
     ) -> list:
         """
         Find all documents from the database.
@@ -76,53 +289,270 @@ class CRUDRepository:
         :type order_by: str | None
         :param filters: MongoDB filter document.
         :type filters: dict | None
+        :param raw: Return the JSON of the documents, transcoded from their BSON
+            without building the models.
+        :type raw: bool
 
-        :return: A list of documents from the database.
+        :return: A list of documents from the database, or of their JSON.
         :rtype: list
         """
+        started = perf_counter()
         documents = []
-        cursor = self.db[self.collection_name].find(filters or {})
+        projection = self.raw_projection if raw else None
+        cursor = self._collection("get_all", raw=raw).find(
+            filters or {}, projection, **session_kwargs(), **cursor_max_time_kwargs()
+        )
         if sort_by is not None:
             cursor = cursor.sort(sort_by, normalize_order_by(order_by))
         if skip is not None:
             cursor = cursor.skip(skip)
         if limit is not None:
             cursor = cursor.limit(limit)
-        async for document in cursor:
-            mongo_model = self.model.from_mongo(document)
-            if self.model_out is not None and apply_model_out:
-                mongo_model = mongo_model.convert_to(model=self.model_out)
-            documents.append(mongo_model)
+        async with closing_cursor(cursor):
+            async for document in cursor:
+                if raw:
+                    with timed("encode"):
+                        documents.append(self._raw_json(document))
+                    continue
+                mongo_model = self._to_model(document, apply_model_out)
+                documents.append(mongo_model)
+        self._record_query(filters, sort_by, order_by, projection, started)
         return documents
 
+    def _record_query(
+        self,
+        filters: dict | None,
+        sort_by: str | None,
+        order_by: str | None,
+        projection: dict | None,
+        started: float,
+    ) -> None:
+        """Record the shape of a get all query in the index advisor, if any."""
+        if self.index_advisor is None:
+            return
+        self.index_advisor.record(
+            self._collection("get_all"),
+            filters,
+            {sort_by: normalize_order_by(order_by)} if sort_by is not None else None,
+            projection,
+            perf_counter() - started,
+        )
+
     @deprecated("get_one is deprecated. Use find_one instead.")
     async def get_one(self, id):
         return await self.find_one(id)
 
+    @timed("db")
     async def find_one(
         self,
         id: str,
         apply_model_out: bool = True,
+        raw: bool = False,
     ):
         """
         Find one document from the database
 
         :type id: str
+        :param raw: Return the JSON of the document, transcoded from its BSON
+            without building the model. The cache is not used.
+        :type raw: bool
         :return: The document from the database.
         :rtype: dict
         """
         identifier_value = self._get_identifier_value(id)
-        response = await self.db[self.collection_name].find_one(
-            {f"{self.identifier_field}": identifier_value}
+        if raw:
+            response = await self._collection("get_one", raw=True).find_one(
+                {f"{self.identifier_field}": identifier_value},
+                self.raw_projection,
+                **session_kwargs(),
+                **cursor_max_time_kwargs(),
+            )
+            if response is None:
+                return None
+            with timed("encode"):
+                return self._raw_json(response)
+        # the invalidations are keyed by _id, other identifiers are not cached,
+        # and causally consistent reads must not be served by a lagging cache
+        cache = (
+            self.cache
+            if self.identifier_field == "_id" and current_session.get() is None
+            else None
         )
+        response = cache.get(self.collection_name, identifier_value) if cache else None
+        if cache and self.metrics is not None:
+            self.metrics.observe_cache(self.collection_name, response is not None)
         if response is None:
-            return None
-        return (
-            self.model.from_mongo(response)
-            if self.model_out is None or not apply_model_out
-            else self.model.from_mongo(response).convert_to(model=self.model_out)
-        )
+            generation = cache.generation if cache else 0
+            response = await self._collection("get_one").find_one(
+                {f"{self.identifier_field}": identifier_value},
+                **session_kwargs(),
+                **cursor_max_time_kwargs(),
+            )
+            if response is None:
+                return None
+            if cache:
+                cache.set(self.collection_name, identifier_value, response, generation)
+        return self._to_model(response, apply_model_out)
+
+    @timed("db")
+    async def find_all_with_lookups(
+        self,
+        lookups: list,
+        skip: int | None = None,
+        limit: int | None = None,
+        sort_by: str | None = None,
+        order_by: str | None = None,
+        filters: dict | None = None,
+        apply_model_out: bool = True,
+    ) -> tuple[list, list[dict]]:
+        """
+        Find all documents and join the given lookups in a single aggregation.
+
+        :param lookups: List of CRUDLookup configuration objects to join.
+        :type lookups: list
+        :param skip: Optional number of documents to skip.
+        :type skip: int | None
+        :param limit: Optional maximum number of documents to return.
+        :type limit: int | None
+        :param sort_by: Field name used for sorting.
+        :type sort_by: str | None
+        :param order_by: Sort order, ``ASC`` for ascending or ``DESC`` for descending.
+        :type order_by: str | None
+        :param filters: MongoDB filter document.
+        :type filters: dict | None
+
+        :return: The documents and, for each of them, the joined documents by lookup.
+        :rtype: tuple[list, list[dict]]
+        """
+        started = perf_counter()
+        pipeline: list[dict] = [{"$match": filters or {}}]
+        if sort_by is not None:
+            pipeline.append({"$sort": {sort_by: normalize_order_by(order_by)}})
+        if skip is not None:
+            pipeline.append({"$skip": skip})
+        if limit is not None:
+            pipeline.append({"$limit": limit})
 
+        documents = []
+        joined = []
+        for document in await self._aggregate_with_lookups(
+            pipeline, lookups, "get_all"
+        ):
+            joined.append(self._pop_lookups(document, lookups))
+            mongo_model = self._to_model(document, apply_model_out)
+            documents.append(mongo_model)
+        self._record_query(filters, sort_by, order_by, None, started)
+        return documents, joined
+
+    @timed("db")
+    async def find_one_with_lookups(
+        self,
+        id: str,
+        lookups: list,
+        apply_model_out: bool = True,
+    ) -> tuple | None:
+        """
+        Find one document and join the given lookups in a single aggregation.
+
+        :param id: The id of the document to be retrieved.
+        :type id: str
+        :param lookups: List of CRUDLookup configuration objects to join.
+        :type lookups: list
+        :return: The document and its joined documents by lookup, or None.
+        :rtype: tuple | None
+        """
+        identifier_value = self._get_identifier_value(id)
+        pipeline = [
+            {"$match": {f"{self.identifier_field}": identifier_value}},
+            {"$limit": 1},
+        ]
+        documents = await self._aggregate_with_lookups(pipeline, lookups, "get_one")
+        if not documents:
+            return None
+        document = documents[0]
+        joined = self._pop_lookups(document, lookups)
+        mongo_model = self._to_model(document, apply_model_out)
+        return mongo_model, joined
+
+    def _build_lookup_stage(self, lookup) -> dict:
+        # localField/foreignField combined with a pipeline requires MongoDB 5.0+
+        stage = {
+            "from": lookup.collection_name,
+            "localField": lookup.local_field,
+            "foreignField": lookup.foreign_field,
+            "as": lookup.prefix,
+        }
+        if lookup.limit is not None:
+            stage["pipeline"] = [
+                {"$sort": {lookup.foreign_field: 1, "_id": 1}},
+                {"$limit": lookup.limit},
+            ]
+        return {"$lookup": stage}
+
+    async def _aggregate_with_lookups(
+        self, pipeline: list, lookups: list, read: str
+    ) -> list:
+        lookup_stages = [self._build_lookup_stage(lookup) for lookup in lookups]
+        try:
+            return [
+                document
+                async for document in self._collection(read).aggregate(
+                    pipeline + lookup_stages, **session_kwargs(), **max_time_kwargs()
+                )
+            ]
+        except NotImplementedError:
+            # Some backends (e.g. mongomock) do not support $lookup sub-pipelines,
+            # join each lookup with one batched $in query instead.
+            documents = [
+                document
+                async for document in self._collection(read).aggregate(
+                    pipeline, **session_kwargs(), **max_time_kwargs()
+                )
+            ]
+            for lookup in lookups:
+                await self._join_lookup(documents, lookup, read)
+            return documents
+
+    async def _join_lookup(self, documents: list, lookup, read: str) -> None:
+        def local_values(document):
+            value = document.get(lookup.local_field)
+            if value is None:
+                return []
+            return value if isinstance(value, list) else [value]
+
+        all_values = [value for doc in documents for value in local_values(doc)]
+        children: dict = {}
+        if all_values:
+            async for child in self._collection(read, lookup.collection_name).find(
+                {lookup.foreign_field: {"$in": all_values}},
+                **session_kwargs(),
+                **cursor_max_time_kwargs(),
+            ):
+                children.setdefault(child.get(lookup.foreign_field), []).append(child)
+
+        for document in documents:
+            matched = [
+                child
+                for value in dict.fromkeys(local_values(document))
+                for child in children.get(value, [])
+            ]
+            if lookup.limit is not None:
+                matched = sorted(
+                    matched,
+                    key=lambda child: (child.get(lookup.foreign_field), child["_id"]),
+                )[: lookup.limit]
+            document[lookup.prefix] = matched
+
+    def _pop_lookups(self, document: dict, lookups: list) -> dict:
+        return {
+            lookup.prefix: [
+                lookup.model.from_mongo(child)
+                for child in document.pop(lookup.prefix, None) or []
+            ]
+            for lookup in lookups
+        }
+
+    @timed("db")
     async def create_one(
         self,
         data: MongoModel,
@@ -130,6 +560,9 @@ class CRUDRepository:
         """
         Create one document in the database
 
+        When create batching is enabled, the document is written by the batcher
+        along with the other pending creates, and is returned without reading it back.
+
         :param data: The data of the document to be created.
         :type data: dict
         :return: The created document.
@@ -141,25 +574,55 @@ class CRUDRepository:
         identifier_value = getattr(data, identifier_attr, None)
         if self.identifier_field is None:
             return None
-        if identifier_value is not None:
+        # with batching, the unique _id index rejects duplicates in the batch write
+        check_existing = self.insert_batcher is None or self.identifier_field != "_id"
+        if identifier_value is not None and check_existing:
             does_document_exist = await self.find_one(str(identifier_value))
             if does_document_exist:
                 return None
 
-        response = await self.db[self.collection_name].insert_one(data.to_mongo())
-        response = await self.db[self.collection_name].find_one(
-            {"_id": response.inserted_id}
-        )
-        return (
-            self.model.from_mongo(response)
-            if self.model_out is None
-            else self.model.from_mongo(response).convert_to(model=self.model_out)
+        if self.insert_batcher is not None:
+            # the batcher stamps the written documents with the server date
+            document = data.to_mongo()
+            try:
+                document["_id"] = await self.insert_batcher.insert(document)
+            except BulkWriteError:
+                return None
+            await self._written_document("insert", document)
+            return self._to_model(document)
+
+        document = data.to_mongo()
+        if self.changes_field is None:
+            inserted_id = (
+                await self._collection().insert_one(document, **session_kwargs())
+            ).inserted_id
+        else:
+            # an upsert can stamp the inserted document with the server date
+            inserted_id = document.pop("_id") if "_id" in document else ObjectId()
+            document.pop(self.changes_field, None)
+            result = await self._collection().update_one(
+                {"_id": inserted_id},
+                self._stamp_update({"$setOnInsert": document}),
+                upsert=True,
+                **session_kwargs(),
+            )
+            if result.upserted_id is None:
+                # created concurrently
+                return None
+        response = await self._collection().find_one(
+            {"_id": inserted_id},
+            **session_kwargs(),
+            **cursor_max_time_kwargs(),
         )
+        await self._written_document("insert", response)
+        return self._to_model(response)
 
+    @timed("db")
     async def replace_one(
         self,
         id: str,
         data: MongoModel,
+        minimal: bool = False,
     ):
         """
         Update one document in the database
@@ -168,64 +631,316 @@ class CRUDRepository:
         :type id: str
         :param data: The data of the document to be replaced.
         :type data: dict
-        :return: The replaced document.
-        :rtype: dict
+        :param minimal: Skip reading the document back and return the matched count.
+        :type minimal: bool
+        :return: The replaced document, or the matched count if ``minimal``.
+        :rtype: dict | int
         """
         identifier_value = self._get_identifier_value(id)
-        response = await self.db[self.collection_name].find_one_and_replace(
+        if minimal:
+            result = await self._replace(
+                {f"{self.identifier_field}": identifier_value},
+                data.to_mongo(),
+                find_one=False,
+                **session_kwargs(),
+            )
+            if result.matched_count:
+                await self._written(
+                    "replace", {f"{self.identifier_field}": identifier_value}
+                )
+            return result.matched_count
+        response = await self._replace(
             {f"{self.identifier_field}": identifier_value},
             data.to_mongo(),
+            find_one=True,
             return_document=ReturnDocument.AFTER,
+            **session_kwargs(),
+            **max_time_kwargs(),
         )
-        return (
-            self.model.from_mongo(response)
-            if self.model_out is None
-            else self.model.from_mongo(response).convert_to(model=self.model_out)
-        )
+        await self._written_document("replace", response)
+        return self._to_model(response)
+
+    @timed("db")
+    async def upsert_one(
+        self, id: str, data: MongoModel
+    ) -> tuple[BaseModel, bool] | None:
+        """
+        Replace one document in the database, creating it if it does not exist
+
+        The write is a single replace with ``upsert=True`` on the identifier field,
+        the returned document is built from ``data`` without reading it back, so it
+        does not carry the server date of ``changes_field``.
+        When the identifier field is not ``_id``, the ``_id`` of an existing document
+        is only returned if ``data`` carries it.
 
+        :param id: The id of the document to be upserted.
+        :type id: str
+        :param data: The data of the document to be upserted.
+        :type data: MongoModel
+        :return: The written document and whether it was created, or None if it
+            conflicts with another document, e.g. on its ``_id`` or when a concurrent
+            upsert created it first.
+        :rtype: tuple[BaseModel, bool] | None
+        """
+        identifier_value = self._get_identifier_value(id)
+        document = data.to_mongo()
+        # the filter is not merged into a replacement, keep the identifier in it
+        document[self.identifier_field] = identifier_value
+        try:
+            result = await self._replace(
+                {f"{self.identifier_field}": identifier_value},
+                dict(document),
+                find_one=False,
+                upsert=True,
+                **session_kwargs(),
+            )
+        except DuplicateKeyError:
+            return None
+        created = result.upserted_id is not None
+        if created:
+            document["_id"] = result.upserted_id
+        if "_id" in document:
+            await self._written_document("insert" if created else "replace", document)
+        else:
+            await self._written(
+                "replace", {f"{self.identifier_field}": identifier_value}
+            )
+        return self._to_model(document), created
+
+    @timed("db")
     async def update_one(
         self,
         id: str,
         data: MongoModel,
+        minimal: bool = False,
     ):
         """
         Update one document in the database
 
+        Only the fields explicitly set on ``data`` are written, nested models with
+        dotted paths, so a partial model can be used to patch a few fields.
+
         :param id: The id of the document to be updated.
         :type id: str
         :param data: The data of the document to be updated.
         :type data: dict
-        :return: The updated document.
-        :rtype: dict
+        :param minimal: Skip reading the document back and return the matched count.
+        :type minimal: bool
+        :return: The updated document, or the matched count if ``minimal``.
+        :rtype: dict | int
         """
         identifier_value = self._get_identifier_value(id)
-        response = await self.db[self.collection_name].find_one_and_update(
+        identifier_filter = {f"{self.identifier_field}": identifier_value}
+        fields = set_paths(data)
+        # _id is immutable
+        fields.pop("_id", None)
+        if minimal:
+            if not fields:
+                return await self._collection().count_documents(
+                    identifier_filter, limit=1, **session_kwargs(), **max_time_kwargs()
+                )
+            result = await self._collection().update_one(
+                identifier_filter,
+                self._stamp_update({"$set": fields}),
+                **session_kwargs(),
+            )
+            if result.matched_count:
+                await self._written("update", identifier_filter)
+            return result.matched_count
+        if not fields:
+            return await self.find_one(id)
+        response = await self._collection().find_one_and_update(
             {f"{self.identifier_field}": identifier_value},
-            {"$set": data.to_mongo()},
+            self._stamp_update({"$set": fields}),
             return_document=ReturnDocument.AFTER,
+            **session_kwargs(),
+            **max_time_kwargs(),
         )
+        await self._written_document("update", response)
+
+        return self._to_model(response)
 
-        return (
-            self.model.from_mongo(response)
-            if self.model_out is None
-            else self.model.from_mongo(response).convert_to(model=self.model_out)
+    @timed("db")
+    async def update_one_with_operators(
+        self,
+        id: str,
+        update: dict,
+        minimal: bool = False,
+    ):
+        """
+        Apply update operators to one document in a single server-side update
+
+        :param id: The id of the document to be updated.
+        :type id: str
+        :param update: The update document, as built by ``operator_update``.
+        :type update: dict
+        :param minimal: Skip reading the document back and return the matched count.
+        :type minimal: bool
+        :return: The updated document, or the matched count if ``minimal``.
+        :rtype: dict | int
+        """
+        identifier_value = self._get_identifier_value(id)
+        identifier_filter = {f"{self.identifier_field}": identifier_value}
+        update = self._stamp_update(update)
+        if minimal:
+            result = await self._collection().update_one(
+                identifier_filter, update, **session_kwargs()
+            )
+            if result.matched_count:
+                await self._written("update", identifier_filter)
+            return result.matched_count
+        response = await self._collection().find_one_and_update(
+            identifier_filter,
+            update,
+            return_document=ReturnDocument.AFTER,
+            **session_kwargs(),
+            **max_time_kwargs(),
         )
+        if response is None:
+            return None
+        await self._written_document("update", response)
+        return self._to_model(response)
 
-    async def delete_one(self, id: str):
+    @timed("db")
+    async def delete_one(self, id: str, minimal: bool = False):
         """
         Delete one document from the database
 
         :param id: The id of the document to be deleted.
         :type id: str
-        :return: The id of the deleted document.
-        :rtype: dict
+        :param minimal: Skip decoding the deleted document and return the deleted count.
+        :type minimal: bool
+        :return: The deleted document, or the deleted count if ``minimal``.
+        :rtype: dict | int
         """
         identifier_value = self._get_identifier_value(id)
-        response = await self.db[self.collection_name].find_one_and_delete(
-            {f"{self.identifier_field}": identifier_value}
+        if minimal and self.tombstone_collection_name is None:
+            result = await self._collection().delete_one(
+                {f"{self.identifier_field}": identifier_value}, **session_kwargs()
+            )
+            if result.deleted_count:
+                await self._written(
+                    "delete", {f"{self.identifier_field}": identifier_value}
+                )
+            return result.deleted_count
+        # the tombstone keeps the deleted document, to filter the deleted ids
+        response = await self._collection().find_one_and_delete(
+            {f"{self.identifier_field}": identifier_value},
+            **session_kwargs(),
+            **max_time_kwargs(),
         )
-        return self.model.from_mongo(response) if (response is not None) else None
-
+        if response is not None:
+            await self._written("delete", {"_id": response["_id"]})
+        if response is not None and self.tombstone_collection_name is not None:
+            await self._collection(name=self.tombstone_collection_name).insert_one(
+                {
+                    "documentId": response["_id"],
+                    "deletedAt": datetime.now(timezone.utc),
+                    "document": response,
+                },
+                **session_kwargs(),
+            )
+        if minimal:
+            return int(response is not None)
+        return self._to_model(response, False) if (response is not None) else None
+
+    @timed("db")
+    async def find_changes(
+        self, position: dict | None, limit: int, filters: dict | None = None
+    ) -> tuple[list, list, dict]:
+        """
+        Find the documents written, and the ids deleted, after a changes feed position.
+
+        Documents are ordered by ``changes_field`` then ``_id``, or by ``_id`` alone when
+        no changes field is maintained, in which case only inserts are seen. Deleted ids
+        are read from the tombstone collection, when there is one.
+
+        The writes are stamped with the server date, and those of the last
+        ``changes_window`` seconds, which may still be followed by writes committed
+        with an earlier date, are held back to a later call. The window must cover the
+        clock skew between the app hosts and the server.
+
+        :param position: The position returned by a previous call, None to start over.
+        :type position: dict | None
+        :param limit: The maximum number of documents, and of deleted ids, to return.
+        :type limit: int
+        :param filters: Only return the documents matching this filter, and the ids
+            of the deleted documents which matched it.
+        :type filters: dict | None
+        :return: The documents, the deleted ids and the position to resume from.
+        :rtype: tuple[list, list, dict]
+        """
+        position = dict(position or {})
+        after = position.get("d")
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.changes_window)
+        if self.changes_field is None:
+            sort = [("_id", 1)]
+            changes_filters = {} if after is None else {"_id": {"$gt": after[1]}}
+        else:
+            sort = [(self.changes_field, 1), ("_id", 1)]
+            changes_filters = (
+                {self.changes_field: {"$exists": True}}
+                if after is None
+                else {
+                    "$or": [
+                        {self.changes_field: {"$gt": after[0]}},
+                        {self.changes_field: after[0], "_id": {"$gt": after[1]}},
+                    ]
+                }
+            )
+            if self.changes_window:
+                changes_filters = _and_filters(
+                    changes_filters, {self.changes_field: {"$lt": cutoff}}
+                )
+        raw_documents = (
+            await self._collection("get_all")
+            .find(
+                _and_filters(changes_filters, filters),
+                **session_kwargs(),
+                **cursor_max_time_kwargs(),
+            )
+            .sort(sort)
+            .limit(limit)
+            .to_list(length=limit)
+        )
+        if raw_documents:
+            last = raw_documents[-1]
+            position["d"] = [
+                last.get(self.changes_field) if self.changes_field else None,
+                last["_id"],
+            ]
+        documents = []
+        for document in raw_documents:
+            documents.append(self._to_model(document))
+
+        deleted = []
+        if self.tombstone_collection_name is not None:
+            tombstone_range = {}
+            if position.get("t") is not None:
+                tombstone_range["$gt"] = position["t"]
+            if self.changes_window:
+                # the ObjectIds are dated by the app hosts, to the second
+                tombstone_range["$lt"] = ObjectId.from_datetime(cutoff)
+            tombstones = (
+                await self._collection("get_all", self.tombstone_collection_name)
+                .find(
+                    _and_filters(
+                        {"_id": tombstone_range} if tombstone_range else {},
+                        prefix_filters(filters, "document") if filters else None,
+                    ),
+                    **session_kwargs(),
+                    **cursor_max_time_kwargs(),
+                )
+                .sort("_id", 1)
+                .limit(limit)
+                .to_list(length=limit)
+            )
+            if tombstones:
+                position["t"] = tombstones[-1]["_id"]
+            deleted = [tombstone["documentId"] for tombstone in tombstones]
+        return documents, deleted, position
+
+    @timed("populate")
     async def resolve_populate(self, docs: list, populates: list) -> list:
         """
         Resolve ObjectId array fields in documents using batch ``$in`` queries.
@@ -264,8 +979,12 @@ class CRUDRepository:
                 continue
 
             resolved_map = {}
-            async for document in self.db[populate.collection].find(
-                {"_id": {"$in": all_ids}}
+            async for document in self._collection(
+                "populate", populate.collection
+            ).find(
+                {"_id": {"$in": all_ids}},
+                **session_kwargs(),
+                **cursor_max_time_kwargs(),
             ):
                 document_copy = dict(document)
                 document_id = document_copy.get("_id")
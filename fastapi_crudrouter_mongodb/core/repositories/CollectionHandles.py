@@ -0,0 +1,82 @@
+from typing import Any
+from bson.codec_options import CodecOptions
+from bson.raw_bson import DEFAULT_RAW_BSON_OPTIONS
+from pymongo.read_concern import ReadConcern
+from pymongo.write_concern import WriteConcern
+
+
+class CollectionHandles:
+    """
+    CollectionHandles builds the collection handles of a router once and reuses them.
+
+    Each handle carries the codec options, the concerns and, for reads, the read
+    preference of the router, so they are configured in one place. Indexing it like
+    a database, ``handles[name]``, returns the write handle of a collection, so it
+    can be given to the repository functions in place of the database.
+
+    :param db: The database.
+    :type db: AsyncIOMotorDatabase
+    :param codec_options: (Optional) The codec options used to encode and decode the
+        documents, defaults to the ones of ``db``.
+    :type codec_options: CodecOptions | None
+    :param write_concern: (Optional) The write concern, defaults to the one of ``db``.
+    :type write_concern: WriteConcern | None
+    :param read_concern: (Optional) The read concern, defaults to the one of ``db``.
+    :type read_concern: ReadConcern | None
+    :param read_preferences: (Optional) The read preference by kind of read, like
+        ``get_all``, defaults to the one of ``db``.
+    :type read_preferences: dict[str, Any] | None
+    """
+
+    def __init__(
+        self,
+        db,
+        codec_options: CodecOptions | None = None,
+        write_concern: WriteConcern | None = None,
+        read_concern: ReadConcern | None = None,
+        read_preferences: dict[str, Any] | None = None,
+    ) -> None:
+        self.db = db
+        self.codec_options = codec_options
+        self.write_concern = write_concern
+        self.read_concern = read_concern
+        self.read_preferences = read_preferences or {}
+        self._handles: dict[tuple[str, str | None, bool], Any] = {}
+
+    def get(self, name: str, read: str | None = None, raw: bool = False):
+        """
+        Return the handle of a collection.
+
+        :param name: The collection name.
+        :type name: str
+        :param read: The kind of read, None for writes.
+        :type read: str | None
+        :param raw: Return the documents as ``RawBSONDocument``, left undecoded.
+        :type raw: bool
+        :return: The collection.
+        :rtype: AsyncIOMotorCollection
+        """
+        read_preference = self.read_preferences.get(read) if read else None
+        # reads without a read preference share the handle of the writes
+        key = (name, read if read_preference is not None else None, raw)
+        handle = self._handles.get(key)
+        if handle is None:
+            handle = self._build(name, read_preference, raw)
+            self._handles[key] = handle
+        return handle
+
+    def __getitem__(self, name: str):
+        return self.get(name)
+
+    def _build(self, name: str, read_preference: Any, raw: bool):
+        options = {
+            "codec_options": DEFAULT_RAW_BSON_OPTIONS if raw else self.codec_options,
+            "write_concern": self.write_concern,
+            "read_concern": self.read_concern,
+            "read_preference": read_preference,
+        }
+        options = {key: value for key, value in options.items() if value is not None}
+        collection = self.db[name]
+        if not options:
+            return collection
+        return collection.with_options(**options)
@@ -0,0 +1,116 @@
+import asyncio
+from typing import Any
+from pymongo.errors import BulkWriteError
+
+
+class InsertBatcher:
+    """
+    InsertBatcher coalesces single inserts into ``insert_many(ordered=False)`` calls.
+
+    Documents are gathered until ``max_size`` of them are pending, or until the
+    first of them has waited ``max_latency`` seconds, and are then written in one
+    round trip. Each caller gets its own inserted id, or its own write error.
+    ``close`` writes the pending documents, call it on shutdown.
+
+    :param collection: The collection the documents are inserted in.
+    :type collection: AsyncIOMotorCollection
+    :param max_size: The maximum number of documents written in one batch.
+    :type max_size: int
+    :param max_latency: The maximum time, in seconds, a document waits for its batch.
+    :type max_latency: float
+    :param stamp_field: A field set to the server date on the written documents, by
+        one ``update_many`` after each batch.
+    :type stamp_field: str | None
+    """
+
+    def __init__(
+        self,
+        collection,
+        max_size: int = 100,
+        max_latency: float = 0.005,
+        stamp_field: str | None = None,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if max_latency < 0:
+            raise ValueError("max_latency must be positive")
+        self.collection = collection
+        self.max_size = max_size
+        self.max_latency = max_latency
+        self.stamp_field = stamp_field
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        # the batches being written, referenced until they are done
+        self._tasks: set[asyncio.Task] = set()
+
+    async def insert(self, document: dict) -> Any:
+        """
+        Queue a document and wait for its batch to be written.
+
+        :param document: The document to insert.
+        :type document: dict
+        :raises Exception: The write error of this document, if any.
+        :return: The inserted id.
+        :rtype: Any
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((document, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_latency, self._flush)
+        return await future
+
+    async def close(self) -> None:
+        """
+        Write the pending documents, and wait for every batch being written.
+        """
+        self._flush()
+        if self._tasks:
+            await asyncio.wait(set(self._tasks))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._write(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        documents = [document for document, _ in batch]
+        errors: dict[int, Exception] = {}
+        try:
+            # insert_many sets the generated _id on each document
+            await self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                errors[error["index"]] = BulkWriteError(
+                    {"writeErrors": [error], "nInserted": 0}
+                )
+        except Exception as e:
+            errors = {index: e for index in range(len(batch))}
+        if self.stamp_field is not None:
+            written = [index for index in range(len(batch)) if index not in errors]
+            try:
+                if written:
+                    await self.collection.update_many(
+                        {
+                            "_id": {
+                                "$in": [documents[index]["_id"] for index in written]
+                            }
+                        },
+                        {"$currentDate": {self.stamp_field: True}},
+                    )
+            except Exception as e:
+                errors.update({index: e for index in written})
+        for index, (document, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in errors:
+                future.set_exception(errors[index])
+            else:
+                future.set_result(document["_id"])
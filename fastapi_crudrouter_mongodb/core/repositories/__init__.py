@@ -1,3 +1,5 @@
+from .CollectionHandles import CollectionHandles
 from .CRUDRepository import CRUDRepository
+from .InsertBatcher import InsertBatcher
 
-__all__ = ["CRUDRepository"]
+__all__ = ["CollectionHandles", "CRUDRepository", "InsertBatcher"]
@@ -1,15 +1,40 @@
+import asyncio
+import inspect
 import json
-from typing import Annotated, Any, Callable, Sequence
-from pydantic import BaseModel
-from fastapi import Response, Query, HTTPException, Path, status
+from contextlib import asynccontextmanager
+from functools import wraps
+from typing import Annotated, Any, AsyncIterator, Callable, Sequence
+from bson.codec_options import CodecOptions
+from pydantic import BaseModel, Field, create_model, model_serializer
+from fastapi.responses import StreamingResponse
+from fastapi import Body, Header, Request, Response, Query, HTTPException, Path, status
 from fastapi.params import Depends
+from pymongo.errors import ExecutionTimeout
 from ..factories import CRUDRouterFactory
 from ..services import CRUDService
+from ..utils.partial import partial_model
+from .TimedAPIRoute import TimedAPIRoute
 from .embed.CRUDEmbedRouter import CRUDEmbedRouter
 from .lookup.CRUDLookupRouter import CRUDLookupRouter
 from ..models.CRUDEmbed import CRUDEmbed
 from ..models.CRUDLookup import CRUDLookup
 from ..models.CRUDPopulate import CRUDPopulate
+from ..models.camel_model import CamelModel
+from ..cache import DocumentCache
+from ..metrics import CommandMonitor, IndexAdvisor, MetricsRegistry
+from ..metrics.labels import label_route, route_operation
+from ..events import EventSource
+from ..utils.matching import matches, validate_filters
+from ..utils.query_validator import QueryValidator
+from ..utils.concerns import resolve_read_concern, resolve_write_concern
+from ..utils.read_preference import resolve_read_preference
+from ..utils.timing import TimingHook
+from ..utils.sessions import advance_session, current_session, encode_session_token
+from ..utils.time_budget import (
+    current_max_time_ms,
+    resolve_max_time_ms,
+    validate_max_time_ms,
+)
 
 
 def _validate_order_by(order_by: str | None) -> str | None:
@@ -25,6 +50,33 @@ def _validate_order_by(order_by: str | None) -> str | None:
     return normalized_value
 
 
+def _parse_filters(filters: str | None) -> dict | None:
+    if filters is None:
+        return None
+    try:
+        return json.loads(filters)
+    except json.JSONDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid JSON in filters parameter",
+        ) from e
+
+
+def _prefers_minimal(prefer: str | None, default: bool) -> bool:
+    """Resolve the ``return`` preference of a ``Prefer`` header (RFC 7240)."""
+    if prefer:
+        for preference in prefer.split(","):
+            name, _, value = preference.partition("=")
+            if name.strip().lower() != "return":
+                continue
+            value = value.split(";")[0].strip().strip('"').lower()
+            if value == "minimal":
+                return True
+            if value == "representation":
+                return False
+    return default
+
+
 class CRUDRouter(CRUDRouterFactory):
     """
     CRUDRouter is a class that extends CRUDRouterFactory and implements the CRUD operations for a given model.
@@ -36,7 +88,135 @@ class CRUDRouter(CRUDRouterFactory):
     :param collection_name: The name of the collection to be used for the CRUD operations.
     :type collection_name: str
     :param lookups: A list of lookup objects to be used for the CRUD operations.
+        They can also be joined on the get one and get all routes with the
+        ``include`` query parameter, using their prefix as name.
     :type lookups: List[CRUDLookup]
+    :param return_minimal: Answer the replace and update routes with an empty 204
+        instead of the written document. Clients can override it per request with
+        ``Prefer: return=minimal`` or ``Prefer: return=representation``.
+    :type return_minimal: bool
+    :param enable_upsert: Let the replace route accept ``upsert=true`` to create a
+        missing document in the same write, answering 201 when it was created. As it
+        creates documents, the replace route is then also guarded by
+        ``dependencies_create_one``, and the create route must not be disabled.
+    :type enable_upsert: bool
+    :param enable_update_operators: Add a ``PATCH /{id}/ops`` route, that applies
+        ``$inc``, ``$min``, ``$max``, ``$addToSet``, ``$pull`` and ``$push`` to the
+        model fields in a single update. It is an update route: it is not added when
+        ``disable_update_one`` is set, and is guarded by ``dependencies_update_one``
+        unless ``dependencies_update_operators`` is given.
+    :type enable_update_operators: bool
+    :param batch_create_max_size: Opt in to coalesce the documents created within a short
+        window into one ``insert_many(ordered=False)``, writing at most this many at once.
+        Created documents are then returned without being read back, and the pending
+        ones are written on the application shutdown, see ``close``.
+    :type batch_create_max_size: int | None
+    :param batch_create_max_latency: The maximum time, in seconds, a created document
+        waits for its batch to be written.
+    :type batch_create_max_latency: float
+    :param enable_changes: Add a ``GET /changes?since=<token>`` route returning the documents
+        written, and the ids deleted, since the token of a previous call.
+    :type enable_changes: bool
+    :param changes_field: The field stamped with the server date of every write made
+        through the router, and through its embed routes, e.g. ``updatedAt``. Without
+        it, the changes route only sees inserts, using the ObjectId timestamp of
+        ``_id``. Documents never written through the router with this field set are
+        not part of the feed.
+    :type changes_field: str | None
+    :param changes_window: The changes route holds back the writes of the last
+        ``changes_window`` seconds, as a write can commit after a later one. It must
+        cover the clock skew between the app hosts and the server, and the duration of
+        the writes.
+    :type changes_window: float
+    :param tombstone_collection_name: The collection recording the ids deleted through the
+        router, so the changes route can report them. Each tombstone keeps a copy of
+        the deleted document, for the changes route to apply ``filter_dependency``.
+    :type tombstone_collection_name: str | None
+    :param event_source: Add a ``GET /stream`` Server-Sent Events route pushing the insert,
+        update, replace and delete events of this source, filtered like the get all route.
+        Events whose document is not known, like deletes, are sent to every subscriber.
+    :type event_source: EventSource | None
+    :param cache: Cache the documents read by the get one route. Every write made through
+        the router, or its embed routes, evicts the document from the cache of every
+        worker sharing the cache transport. Only routers identified by ``_id`` are cached.
+    :type cache: DocumentCache | None
+    :param read_preference_get_all: Read preference of the get all and changes routes,
+        a pymongo read preference or a mode name like ``secondaryPreferred``.
+    :type read_preference_get_all: str | ServerMode | None
+    :param read_preference_get_one: Read preference of the get one route.
+    :type read_preference_get_one: str | ServerMode | None
+    :param read_preference_populate: Read preference of the populated documents.
+    :type read_preference_populate: str | ServerMode | None
+    :param read_max_staleness_seconds: The maximum replication lag of the secondaries
+        read from, applied to the read preferences given as mode names.
+    :type read_max_staleness_seconds: int | None
+    :param causal_consistency: Run the routes in causally consistent sessions. Responses
+        carry an ``X-Causal-Token`` header, that clients send back on their next
+        requests to read their own writes, even from secondaries. Batched creates
+        are not part of the session.
+    :type causal_consistency: bool
+    :param write_concern: Write concern of the routes, a pymongo write concern or its
+        options like ``{"w": "majority"}``. Defaults to the write concern of ``db``.
+        Also the default of the lookup and embed routes.
+    :type write_concern: WriteConcern | dict | None
+    :param read_concern: Read concern of the routes, a pymongo read concern or a level
+        like ``majority``. Defaults to the read concern of ``db``. Also the default of
+        the lookup and embed routes.
+    :type read_concern: ReadConcern | str | None
+    :param codec_options: Codec options used to encode and decode the documents, e.g.
+        ``build_codec_options()`` for UTC aware datetimes and Decimal128 decimals.
+        Defaults to the codec options of ``db``. Also the default of the lookup and
+        embed routes.
+    :type codec_options: CodecOptions | None
+    :param raw_reads: Transcode the documents of the get all and get one routes straight
+        from BSON to JSON, without building the models, when nothing is populated or
+        included. Only for a ``model_out`` whose fields map one-to-one onto the stored
+        documents: fields missing from a document are left out of its JSON, and values
+        are not validated. The get one route then bypasses the cache.
+    :type raw_reads: bool
+    :param server_timing: Time the phases of each request, ``db``, ``validate``
+        (``from_mongo``), ``convert`` (``convert_to``), ``populate``, ``app`` (the rest
+        of the route) and ``encode`` (request parsing and response encoding), and send
+        them in a ``Server-Timing`` response header.
+    :type server_timing: bool
+    :param timing_hook: Called with the request and the duration of its phases, in
+        milliseconds, after each request, e.g. to forward them to a tracing stack.
+        Times the requests even without ``server_timing``.
+    :type timing_hook: TimingHook | None
+    :param metrics: Record the requests of the routes, and of the lookup and embed
+        routes, in this registry: their count by status code, duration and number
+        of documents returned, and the hits and misses of ``cache``. Include
+        ``metrics.router()`` in the app to expose it.
+    :type metrics: MetricsRegistry | None
+    :param command_monitor: Record the commands sent on the collection of the router,
+        and on the collections of its lookups and populates, with their duration, the
+        number of documents returned and, for the slow ones, the shape of their
+        filter. The monitor must also be given to the client, in ``event_listeners``.
+    :type command_monitor: CommandMonitor | None
+    :param index_advisor: Record the shapes of the get all queries, their filter,
+        sort and projection, with their frequency and latency. The advisor explains
+        the most expensive ones and suggests indexes for those which scan the
+        collection or sort in memory.
+    :type index_advisor: IndexAdvisor | None
+    :param filterable_fields: The fields the get all ``filters`` can match, by model
+        field name, with the operators allowed on each, e.g.
+        ``{"status": ["$eq", "$in"], "created_at": ["$gte", "$lt"]}``, a literal
+        value being ``$eq``. Declare the indexed fields, other fields and operators,
+        like ``$where`` or ``$regex``, are rejected with a 422 before any query runs.
+        Values are converted to the type of their field, e.g. ObjectId strings and
+        ISO dates. Filters built by ``filter_dependency`` are not checked.
+    :type filterable_fields: dict[str, Sequence[str]] | None
+    :param sortable_fields: The fields the get all ``sort_by`` can name, by model
+        field name. Other fields are rejected with a 422.
+    :type sortable_fields: Sequence[str] | None
+    :param max_time_ms: Time budget of the queries of each route, in milliseconds,
+        sent as ``maxTimeMS`` with every find, aggregate and find and modify. Either
+        one budget for every route, or the budgets by operation, e.g.
+        ``{"find_all": 2000, "default": 500}``. A query over its budget is aborted
+        by the server and the route answers with a 504. The reads under a budget
+        are also cancelled, and their cursors killed, when the client disconnects.
+        Lookups and embeds default to these budgets.
+    :type max_time_ms: int | dict[str, int] | None
     :param args: The args to be passed to the CRUDRouterFactory.
     :type args: Any
     :param kwargs: The kwargs to be passed to the CRUDRouterFactory.
@@ -59,21 +239,88 @@ class CRUDRouter(CRUDRouterFactory):
         disable_replace_one=False,
         disable_update_one=False,
         disable_delete_one=False,
+        enable_update_operators=False,
+        enable_upsert=False,
         dependencies_get_all: Sequence[Depends] | None = None,
         dependencies_get_one: Sequence[Depends] | None = None,
         dependencies_create_one: Sequence[Depends] | None = None,
         dependencies_replace_one: Sequence[Depends] | None = None,
         dependencies_update_one: Sequence[Depends] | None = None,
         dependencies_delete_one: Sequence[Depends] | None = None,
+        dependencies_update_operators: Sequence[Depends] | None = None,
         filter_dependency: Callable | None = None,
+        return_minimal: bool = False,
+        batch_create_max_size: int | None = None,
+        batch_create_max_latency: float = 0.005,
+        enable_changes: bool = False,
+        changes_field: str | None = None,
+        changes_window: float = 2.0,
+        tombstone_collection_name: str | None = None,
+        dependencies_changes: Sequence[Depends] | None = None,
+        event_source: EventSource | None = None,
+        dependencies_stream: Sequence[Depends] | None = None,
+        cache: DocumentCache | None = None,
+        read_preference_get_all: Any = None,
+        read_preference_get_one: Any = None,
+        read_preference_populate: Any = None,
+        read_max_staleness_seconds: int | None = None,
+        causal_consistency: bool = False,
+        write_concern: Any = None,
+        read_concern: Any = None,
+        codec_options: CodecOptions | None = None,
+        raw_reads: bool = False,
+        server_timing: bool = False,
+        timing_hook: TimingHook | None = None,
+        metrics: MetricsRegistry | None = None,
+        command_monitor: CommandMonitor | None = None,
+        index_advisor: IndexAdvisor | None = None,
+        filterable_fields: dict[str, Sequence[str]] | None = None,
+        sortable_fields: Sequence[str] | None = None,
+        max_time_ms: int | dict[str, int] | None = None,
         *args,
         **kwargs,
     ) -> None:
+        if enable_upsert and disable_create_one:
+            raise ValueError("enable_upsert requires the create route")
         if lookups is None:
             lookups = []
         super().__init__(model, db, collection_name, *args, **kwargs)
+        if server_timing or timing_hook is not None or metrics is not None:
+            self.route_class = TimedAPIRoute.configure(
+                server_timing, timing_hook, metrics
+            )
+        self.write_concern = resolve_write_concern(write_concern)
+        self.read_concern = resolve_read_concern(read_concern)
+        self.codec_options = codec_options
         self.service = CRUDService(
-            model, db, collection_name, identifier_field, model_out
+            model,
+            db,
+            collection_name,
+            identifier_field,
+            model_out,
+            batch_create_max_size=batch_create_max_size,
+            batch_create_max_latency=batch_create_max_latency,
+            changes_field=changes_field,
+            tombstone_collection_name=tombstone_collection_name,
+            event_source=event_source,
+            cache=cache,
+            changes_window=changes_window,
+            read_preferences={
+                "get_all": resolve_read_preference(
+                    read_preference_get_all, read_max_staleness_seconds
+                ),
+                "get_one": resolve_read_preference(
+                    read_preference_get_one, read_max_staleness_seconds
+                ),
+                "populate": resolve_read_preference(
+                    read_preference_populate, read_max_staleness_seconds
+                ),
+            },
+            write_concern=self.write_concern,
+            read_concern=self.read_concern,
+            codec_options=codec_options,
+            metrics=metrics,
+            index_advisor=index_advisor,
         )
         self.identifier_field = identifier_field
         self.model_out = model if model_out is None else model_out
@@ -83,17 +330,50 @@ class CRUDRouter(CRUDRouterFactory):
         self.disable_replace_one = disable_replace_one
         self.disable_update_one = disable_update_one
         self.disable_delete_one = disable_delete_one
+        self.enable_update_operators = enable_update_operators
+        self.enable_upsert = enable_upsert
         self.dependencies_get_all = dependencies_get_all
         self.dependencies_get_one = dependencies_get_one
         self.dependencies_create_one = dependencies_create_one
         self.dependencies_replace_one = dependencies_replace_one
         self.dependencies_update_one = dependencies_update_one
         self.dependencies_delete_one = dependencies_delete_one
+        self.dependencies_update_operators = (
+            dependencies_update_one
+            if dependencies_update_operators is None
+            else dependencies_update_operators
+        )
         self.filter_dependency = filter_dependency
+        # compiled once, so a bad declaration fails at startup
+        self.query_validator = (
+            QueryValidator(model, filterable_fields, sortable_fields)
+            if filterable_fields is not None or sortable_fields is not None
+            else None
+        )
+        self.max_time_ms = validate_max_time_ms(max_time_ms)
+        self.return_minimal = return_minimal
+        self.enable_changes = enable_changes
+        self.dependencies_changes = dependencies_changes
+        self.event_source = event_source
+        self.dependencies_stream = dependencies_stream
+        self.causal_consistency = causal_consistency
+        self.raw_reads = raw_reads
+        self.lookups = {lookup.prefix: lookup for lookup in lookups}
         self.populates = populates or []
         self._has_populate_without_model_out = (
             len(self.populates) > 0 and model_out is None
         )
+        self.model_out_with_includes = self._build_include_model()
+        if command_monitor is not None:
+            command_monitor.watch(
+                [collection_name]
+                + [lookup.collection_name for lookup in lookups]
+                + [populate.collection for populate in self.populates]
+                + ([tombstone_collection_name] if tombstone_collection_name else [])
+            )
+        if self.service.repository.insert_batcher is not None:
+            # carried over to the application by include_router
+            self.add_event_handler("shutdown", self.close)
         self._register_routes()
         try:
             if lookups is not None:
@@ -105,6 +385,281 @@ class CRUDRouter(CRUDRouterFactory):
         except Exception as e:
             print(e)
 
+    async def close(self) -> None:
+        """
+        Write the documents still waiting for their create batch.
+
+        It runs on the shutdown of the application including this router; call it
+        from the application ``lifespan`` instead when one is given.
+        """
+        await self.service.repository.close()
+
+    def _build_include_model(self) -> type[BaseModel]:
+        """
+        Build the get routes response model, declaring one optional field per lookup.
+
+        Lookups that were not requested with ``include`` are left out of the response.
+
+        :return: The ``model_out`` subclass with the lookups fields.
+        :rtype: type[BaseModel]
+        """
+        if not self.lookups:
+            return self.model_out
+        include_fields: dict[str, Any] = {
+            prefix: (list[lookup.model] | None, Field(None, alias=prefix))
+            for prefix, lookup in self.lookups.items()
+        }
+
+        @model_serializer(mode="wrap")
+        def serialize_includes(self: BaseModel, handler: Callable):
+            serialized = handler(self)
+            for prefix in include_fields:
+                if getattr(self, prefix) is None:
+                    serialized.pop(prefix, None)
+            return serialized
+
+        return create_model(
+            f"{self.model_out.__name__}WithIncludes",
+            __base__=self.model_out,
+            __validators__={"serialize_includes": serialize_includes},
+            **include_fields,
+        )
+
+    def _build_changes_model(self) -> type[BaseModel]:
+        """
+        Build the changes route response model.
+
+        :return: The model listing the changed documents, the deleted ids and the next token.
+        :rtype: type[BaseModel]
+        """
+        return create_model(
+            f"{self.model_out.__name__}Changes",
+            __base__=CamelModel,
+            documents=(list[self.model_out], ...),
+            deleted=(list[str], ...),
+            next=(
+                str,
+                Field(..., description="Token to send as since on the next call"),
+            ),
+            has_more=(bool, ...),
+        )
+
+    @asynccontextmanager
+    async def _causal_session(self, token: str | None) -> AsyncIterator[Any]:
+        """
+        Run the repository operations in a causally consistent session.
+
+        :param token: The ``X-Causal-Token`` of a previous response, to read after it.
+        :type token: str | None
+        :return: The session.
+        :rtype: AsyncIterator[AsyncIOMotorClientSession]
+        """
+        async with await self.db.client.start_session(
+            causal_consistency=True
+        ) as session:
+            if token:
+                try:
+                    advance_session(session, token)
+                except ValueError as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Invalid X-Causal-Token header",
+                    ) from e
+            reset_token = current_session.set(session)
+            try:
+                yield session
+            finally:
+                current_session.reset(reset_token)
+
+    def _with_causal_session(self, endpoint: Callable) -> Callable:
+        """
+        Wrap a route to run it in a causally consistent session, if enabled.
+
+        :param endpoint: The route.
+        :type endpoint: Callable
+        :return: The wrapped route, which reads and returns the ``X-Causal-Token`` header.
+        :rtype: Callable
+        """
+        if not self.causal_consistency:
+            return endpoint
+
+        @wraps(endpoint)
+        async def route(
+            *args: Any,
+            causal_token: str | None,
+            causal_response: Response,
+            **kwargs: Any,
+        ) -> Any:
+            async with self._causal_session(causal_token) as session:
+                result = await endpoint(*args, **kwargs)
+            token = encode_session_token(session)
+            if token is not None:
+                target = result if isinstance(result, Response) else causal_response
+                target.headers["X-Causal-Token"] = token
+            return result
+
+        signature = inspect.signature(endpoint)
+        route.__signature__ = signature.replace(
+            parameters=[
+                parameter.replace(kind=inspect.Parameter.KEYWORD_ONLY)
+                for parameter in signature.parameters.values()
+            ]
+            + [
+                inspect.Parameter(
+                    "causal_token",
+                    inspect.Parameter.KEYWORD_ONLY,
+                    default=Header(None, alias="X-Causal-Token"),
+                    annotation=str | None,
+                ),
+                inspect.Parameter(
+                    "causal_response",
+                    inspect.Parameter.KEYWORD_ONLY,
+                    annotation=Response,
+                ),
+            ]
+        )
+        return route
+
+    def _with_time_budget(
+        self, endpoint: Callable, max_time_ms: int, operation: str
+    ) -> Callable:
+        """
+        Wrap a route to run its queries within a time budget.
+
+        A query over the budget is answered with a 504. A read is cancelled when the
+        client disconnects, which kills its open cursor on the server.
+
+        :param endpoint: The route.
+        :type endpoint: Callable
+        :param max_time_ms: The budget, in milliseconds.
+        :type max_time_ms: int
+        :param operation: The operation of the route, e.g. ``find_all``.
+        :type operation: str
+        :return: The wrapped route.
+        :rtype: Callable
+        """
+        cancellable = operation in ("find_all", "find_one", "find_changes")
+
+        @wraps(endpoint)
+        async def route(*args: Any, time_budget_request: Request, **kwargs: Any) -> Any:
+            reset_token = current_max_time_ms.set(max_time_ms)
+            try:
+                if not cancellable:
+                    return await endpoint(*args, **kwargs)
+                return await self._cancel_on_disconnect(
+                    time_budget_request, endpoint(*args, **kwargs)
+                )
+            except ExecutionTimeout as e:
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail="The query exceeded its time budget",
+                ) from e
+            finally:
+                current_max_time_ms.reset(reset_token)
+
+        signature = inspect.signature(endpoint)
+        route.__signature__ = signature.replace(
+            parameters=[
+                parameter.replace(kind=inspect.Parameter.KEYWORD_ONLY)
+                for parameter in signature.parameters.values()
+            ]
+            + [
+                inspect.Parameter(
+                    "time_budget_request",
+                    inspect.Parameter.KEYWORD_ONLY,
+                    annotation=Request,
+                )
+            ]
+        )
+        return route
+
+    @staticmethod
+    async def _cancel_on_disconnect(request: Request, coroutine: Any) -> Any:
+        """
+        Run a route, and cancel it if the client disconnects first.
+
+        :param request: The request of the route.
+        :type request: Request
+        :param coroutine: The route.
+        :type coroutine: Coroutine
+        :return: The result of the route, or a 499 if the client disconnected.
+        :rtype: Any
+        """
+
+        async def disconnected() -> None:
+            while (await request.receive())["type"] != "http.disconnect":
+                pass
+
+        task = asyncio.ensure_future(coroutine)
+        watcher = asyncio.ensure_future(disconnected())
+        try:
+            await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            watcher.cancel()
+            if not task.done():
+                # the cursors of the route are closed as its task unwinds
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if task.cancelled():
+            return Response(status_code=499)
+        return task.result()
+
+    def _resolve_includes(self, include: list[str] | None) -> list[CRUDLookup]:
+        """
+        Resolve the ``include`` query parameter into the configured lookups.
+
+        Names can be repeated (``?include=a&include=b``) or comma separated (``?include=a,b``).
+
+        :param include: The lookup prefixes requested by the client.
+        :type include: list[str] | None
+        :return: The matching lookups, without duplicates.
+        :rtype: list[CRUDLookup]
+        """
+        if not include:
+            return []
+        names = [
+            name.strip()
+            for value in include
+            for name in value.split(",")
+            if name.strip()
+        ]
+        unknown = [name for name in names if name not in self.lookups]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unknown include: {', '.join(unknown)}",
+            )
+        return [self.lookups[name] for name in dict.fromkeys(names)]
+
+    def _validate_query(
+        self, filters: dict | None, sort_by: str | None
+    ) -> tuple[dict | None, str | None]:
+        """
+        Check the filters and sort of the get all route against the allowlists.
+
+        :param filters: The parsed ``filters`` parameter.
+        :type filters: dict | None
+        :param sort_by: The ``sort_by`` parameter.
+        :type sort_by: str | None
+        :raises HTTPException: 422 if a field, operator or value is not allowed.
+        :return: The filters, with converted values, and the stored sort field.
+        :rtype: tuple[dict | None, str | None]
+        """
+        if self.query_validator is None:
+            return filters, sort_by
+        try:
+            return (
+                self.query_validator.validate_filters(filters),
+                self.query_validator.validate_sort(sort_by),
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+            ) from e
+
     def _get_all(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
         if self.filter_dependency is None:
 
@@ -114,17 +669,12 @@ class CRUDRouter(CRUDRouterFactory):
                 sort_by: str | None = Query(None),
                 order_by: str | None = Query(None),
                 filters: str | None = Query(None),
+                include: list[str] | None = Query(None),
             ) -> list[Any]:
-                filters_dict = None
                 normalized_order_by = _validate_order_by(order_by)
-                if filters is not None:
-                    try:
-                        filters_dict = json.loads(filters)
-                    except json.JSONDecodeError as e:
-                        raise HTTPException(
-                            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                            detail="Invalid JSON in filters parameter",
-                        ) from e
+                filters_dict, sort_by = self._validate_query(
+                    _parse_filters(filters), sort_by
+                )
                 return await self.service.find_all(
                     skip=skip,
                     limit=limit,
@@ -132,6 +682,8 @@ class CRUDRouter(CRUDRouterFactory):
                     order_by=normalized_order_by,
                     filters=filters_dict,
                     populates=self.populates,
+                    lookups=self._resolve_includes(include),
+                    raw=self.raw_reads,
                 )
 
             return route_default
@@ -142,8 +694,10 @@ class CRUDRouter(CRUDRouterFactory):
             sort_by: str | None = Query(None),
             order_by: str | None = Query(None),
             filters_dependency: Any = Depends(self.filter_dependency),
+            include: list[str] | None = Query(None),
         ) -> list[Any]:
             normalized_order_by = _validate_order_by(order_by)
+            _, sort_by = self._validate_query(None, sort_by)
             return await self.service.find_all(
                 skip=skip,
                 limit=limit,
@@ -151,10 +705,88 @@ class CRUDRouter(CRUDRouterFactory):
                 order_by=normalized_order_by,
                 filters=filters_dependency,
                 populates=self.populates,
+                lookups=self._resolve_includes(include),
+                raw=self.raw_reads,
             )
 
         return route_with_dependency
 
+    def _get_changes(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
+        if self.filter_dependency is None:
+
+            async def route_default(
+                since: str | None = Query(None),
+                limit: int = Query(100, ge=1, le=1000),
+            ) -> Any:
+                return await self.service.find_changes(since=since, limit=limit)
+
+            return route_default
+
+        async def route_with_dependency(
+            since: str | None = Query(None),
+            limit: int = Query(100, ge=1, le=1000),
+            filters_dependency: Any = Depends(self.filter_dependency),
+        ) -> Any:
+            return await self.service.find_changes(
+                since=since, limit=limit, filters=filters_dependency
+            )
+
+        return route_with_dependency
+
+    def _stream(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
+        if self.filter_dependency is None:
+
+            async def route_default(
+                filters: str | None = Query(None),
+            ) -> StreamingResponse:
+                return self._stream_response(_parse_filters(filters))
+
+            return route_default
+
+        async def route_with_dependency(
+            filters_dependency: Any = Depends(self.filter_dependency),
+        ) -> StreamingResponse:
+            return self._stream_response(filters_dependency)
+
+        return route_with_dependency
+
+    def _stream_response(self, filters: dict | None) -> StreamingResponse:
+        if filters is not None:
+            try:
+                validate_filters(filters)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+                ) from e
+        return StreamingResponse(
+            self._stream_events(filters),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    async def _stream_events(self, filters: dict | None):
+        """
+        Format the events of the event source as Server-Sent Events.
+
+        :param filters: The MongoDB filter the event documents must match.
+        :type filters: dict | None
+        :return: The Server-Sent Events.
+        :rtype: AsyncIterator[str]
+        """
+        async for event in self.event_source.subscribe():
+            document = event["fullDocument"]
+            if filters and document is not None and not matches(document, filters):
+                continue
+            payload: dict[str, Any] = {
+                "id": str(next(iter(event["documentKey"].values())))
+            }
+            if document is not None:
+                mongo_model = self.model.from_mongo(dict(document))
+                if self.service.model_out is not None:
+                    mongo_model = mongo_model.convert_to(model=self.service.model_out)
+                payload["document"] = mongo_model.model_dump(by_alias=True, mode="json")
+            yield f"event: {event['operationType']}\ndata: {json.dumps(payload)}\n\n"
+
     def _get_one(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
         identifier_display = (
             self.identifier_field if self.identifier_field != "_id" else "id"
@@ -162,8 +794,14 @@ class CRUDRouter(CRUDRouterFactory):
 
         async def route(
             id: Annotated[str, Path(alias=identifier_display)],
-        ) -> self.model:
-            return await self.service.find_one(id, populates=self.populates)
+            include: list[str] | None = Query(None),
+        ) -> Any:
+            return await self.service.find_one(
+                id,
+                populates=self.populates,
+                lookups=self._resolve_includes(include),
+                raw=self.raw_reads,
+            )
 
         return route
 
@@ -181,10 +819,40 @@ class CRUDRouter(CRUDRouterFactory):
         async def route(
             id: Annotated[str, Path(alias=identifier_display)],
             data: self.model,
+            prefer: str | None = Header(None),
+        ) -> self.model:
+            return await self.service.replace_one(
+                id, data, minimal=_prefers_minimal(prefer, self.return_minimal)
+            )
+
+        if not self.enable_upsert:
+            return route
+
+        async def route_with_upsert(
+            id: Annotated[str, Path(alias=identifier_display)],
+            data: self.model,
+            response: Response,
+            upsert: bool = Query(False),
+            prefer: str | None = Header(None),
         ) -> self.model:
-            return await self.service.replace_one(id, data)
+            minimal = _prefers_minimal(prefer, self.return_minimal)
+            if not upsert:
+                return await self.service.replace_one(id, data, minimal=minimal)
+            document, created = await self.service.upsert_one(id, data)
+            if minimal:
+                return Response(
+                    status_code=(
+                        status.HTTP_201_CREATED
+                        if created
+                        else status.HTTP_204_NO_CONTENT
+                    ),
+                    headers={"Preference-Applied": "return=minimal"},
+                )
+            if created:
+                response.status_code = status.HTTP_201_CREATED
+            return document
 
-        return route
+        return route_with_upsert
 
     def _update_one(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
         identifier_display = (
@@ -193,9 +861,33 @@ class CRUDRouter(CRUDRouterFactory):
 
         async def route(
             id: Annotated[str, Path(alias=identifier_display)],
-            data: self.model,
+            data: partial_model(self.model),
+            prefer: str | None = Header(None),
         ) -> self.model:
-            return await self.service.update_one(id, data)
+            return await self.service.update_one(
+                id, data, minimal=_prefers_minimal(prefer, self.return_minimal)
+            )
+
+        return route
+
+    def _update_operators(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
+        identifier_display = (
+            self.identifier_field if self.identifier_field != "_id" else "id"
+        )
+
+        async def route(
+            id: Annotated[str, Path(alias=identifier_display)],
+            operations: dict[str, dict[str, Any]] = Body(
+                ...,
+                examples=[{"$inc": {"count": 1}, "$addToSet": {"tags": "new"}}],
+            ),
+            prefer: str | None = Header(None),
+        ) -> self.model:
+            return await self.service.update_one_with_operators(
+                id,
+                operations,
+                minimal=_prefers_minimal(prefer, self.return_minimal),
+            )
 
         return route
 
@@ -209,6 +901,23 @@ class CRUDRouter(CRUDRouterFactory):
 
         return route
 
+    def _add_api_route(
+        self,
+        path: str,
+        endpoint: Callable,
+        max_time_ms: int | dict[str, int] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        operation = route_operation(endpoint)
+        populated = len(self.populates) > 0 and operation in ("find_all", "find_one")
+        label_route(endpoint, self.collection_name, "populate" if populated else "none")
+        budget = resolve_max_time_ms(
+            self.max_time_ms if max_time_ms is None else max_time_ms, operation
+        )
+        if budget is not None:
+            endpoint = self._with_time_budget(endpoint, budget, operation)
+        super()._add_api_route(path, endpoint, **kwargs)
+
     def _register_routes(self) -> None:
         """
         Register the routes for the CRUDRouter.
@@ -224,23 +933,47 @@ class CRUDRouter(CRUDRouterFactory):
         if not self.disable_get_all:
             self._add_api_route(
                 "",
-                self._get_all(),
+                self._with_causal_session(self._get_all()),
                 response_model=(
                     None
                     if self._has_populate_without_model_out
-                    else list[self.model_out]
+                    else list[self.model_out_with_includes]
                 ),
                 dependencies=self.dependencies_get_all,
                 methods=["GET"],
                 summary=f"Get All {self.model.__name__} from the collection",
                 description=f"Get All {self.model.__name__} from the collection",
             )
+        if self.enable_changes:
+            # the changes and stream routes are registered before the get one
+            # route, which would match them
+            self._add_api_route(
+                "/changes",
+                self._with_causal_session(self._get_changes()),
+                response_model=self._build_changes_model(),
+                dependencies=self.dependencies_changes,
+                methods=["GET"],
+                summary=f"Get the {self.model.__name__} changes since a token",
+                description=f"Get the {self.model.__name__} written, and the ids deleted, since the token of a previous call",
+            )
+        if self.event_source is not None:
+            self._add_api_route(
+                "/stream",
+                self._stream(),
+                response_class=StreamingResponse,
+                dependencies=self.dependencies_stream,
+                methods=["GET"],
+                summary=f"Stream the {self.model.__name__} changes",
+                description=f"Stream the {self.model.__name__} insert, update, replace and delete events as Server-Sent Events",
+            )
         if not self.disable_get_one:
             self._add_api_route(
                 f"{identifier_path}",
-                self._get_one(),
+                self._with_causal_session(self._get_one()),
                 response_model=(
-                    None if self._has_populate_without_model_out else self.model_out
+                    None
+                    if self._has_populate_without_model_out
+                    else self.model_out_with_includes
                 ),
                 dependencies=self.dependencies_get_one,
                 methods=["GET"],
@@ -250,7 +983,7 @@ class CRUDRouter(CRUDRouterFactory):
         if not self.disable_create_one:
             self._add_api_route(
                 "",
-                self._create_one(),
+                self._with_causal_session(self._create_one()),
                 response_model=self.model_out,
                 dependencies=self.dependencies_create_one,
                 methods=["POST"],
@@ -260,27 +993,58 @@ class CRUDRouter(CRUDRouterFactory):
         if not self.disable_update_one:
             self._add_api_route(
                 f"{identifier_path}",
-                self._update_one(),
+                self._with_causal_session(self._update_one()),
                 response_model=self.model_out,
                 dependencies=self.dependencies_update_one,
                 methods=["PATCH"],
+                responses={
+                    204: {"description": "Written, with Prefer: return=minimal"}
+                },
                 summary=f"Update One {self.model.__name__} by {{{identifier_display}}} in the collection",
-                description=f"Update One {self.model.__name__} by {{{identifier_display}}} in the collection",
+                description=f"Update the given fields of One {self.model.__name__} by {{{identifier_display}}} in the collection",
+            )
+        if self.enable_update_operators and not self.disable_update_one:
+            self._add_api_route(
+                f"{identifier_path}/ops",
+                self._with_causal_session(self._update_operators()),
+                response_model=self.model_out,
+                dependencies=self.dependencies_update_operators,
+                methods=["PATCH"],
+                responses={
+                    204: {"description": "Written, with Prefer: return=minimal"}
+                },
+                summary=f"Apply update operators to One {self.model.__name__} by {{{identifier_display}}} in the collection",
+                description=f"Atomically apply $inc, $min, $max, $addToSet, $pull and $push to the fields of One {self.model.__name__} by {{{identifier_display}}} in the collection",
             )
         if not self.disable_replace_one:
             self._add_api_route(
                 f"{identifier_path}",
-                self._replace_one(),
+                self._with_causal_session(self._replace_one()),
                 response_model=self.model_out,
-                dependencies=self.dependencies_replace_one,
+                dependencies=(
+                    [
+                        *(self.dependencies_replace_one or []),
+                        *(self.dependencies_create_one or []),
+                    ]
+                    if self.enable_upsert
+                    else self.dependencies_replace_one
+                ),
                 methods=["PUT"],
+                responses={
+                    **(
+                        {201: {"description": "Created, with upsert=true"}}
+                        if self.enable_upsert
+                        else {}
+                    ),
+                    204: {"description": "Written, with Prefer: return=minimal"},
+                },
                 summary=f"Replace One {self.model.__name__} by {{{identifier_display}}} in the collection",
                 description=f"Replace One {self.model.__name__} by {{{identifier_display}}} in the collection",
             )
         if not self.disable_delete_one:
             self._add_api_route(
                 f"{identifier_path}",
-                self._delete_one(),
+                self._with_causal_session(self._delete_one()),
                 dependencies=self.dependencies_delete_one,
                 methods=["DELETE"],
                 summary=f"Delete One {self.model.__name__} by {{{identifier_display}}} from the collection",
@@ -0,0 +1,133 @@
+import inspect
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from ..metrics import MetricsRegistry
+from ..utils.timing import RequestTimings, TimingHook, current_timings, timed
+
+# a one item list, filled by the endpoint with the number of documents it returns
+_result_size: ContextVar[list | None] = ContextVar("_result_size", default=None)
+
+
+class TimedAPIRoute(APIRoute):
+    """
+    TimedAPIRoute times the phases of each request of a route.
+
+    The route itself is timed as ``app``, the phases timed by the service and the
+    repository are subtracted from it. With a metrics registry, the requests of the
+    routes labeled by ``label_route`` are counted, with their duration and the
+    number of documents returned. Use ``configure`` to build the route class of a
+    router, the options are class attributes so they survive ``include_router``,
+    which builds the routes again from their class.
+    """
+
+    server_timing: bool = True
+    timing_hook: TimingHook | None = None
+    metrics: MetricsRegistry | None = None
+
+    @classmethod
+    def configure(
+        cls,
+        server_timing: bool = True,
+        timing_hook: TimingHook | None = None,
+        metrics: MetricsRegistry | None = None,
+    ) -> type["TimedAPIRoute"]:
+        """
+        Build a route class with the given options.
+
+        :param server_timing: Add the timings as a ``Server-Timing`` response header.
+        :type server_timing: bool
+        :param timing_hook: (Optional) Called with the request and its timings, in
+            milliseconds, after each request.
+        :type timing_hook: TimingHook | None
+        :param metrics: (Optional) Registry recording the requests of the routes.
+        :type metrics: MetricsRegistry | None
+        :return: The route class.
+        :rtype: type[TimedAPIRoute]
+        """
+        return type(
+            cls.__name__,
+            (cls,),
+            {
+                "server_timing": server_timing,
+                "timing_hook": staticmethod(timing_hook),
+                "metrics": metrics,
+            },
+        )
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if not getattr(endpoint, "__timed__", False):
+            endpoint = _timed_endpoint(endpoint)
+        # read by get_route_handler, which APIRoute calls on init
+        self.labels = getattr(endpoint, "__route_labels__", None)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        times_phases = self.server_timing or self.timing_hook is not None
+        metrics = self.metrics if self.labels is not None else None
+
+        async def timed_handler(request: Request) -> Response:
+            timings = RequestTimings() if times_phases else None
+            reset_token = current_timings.set(timings)
+            size = [None]
+            size_token = _result_size.set(size)
+            started = perf_counter()
+            status_code = 500
+            try:
+                response = await handler(request)
+                status_code = response.status_code
+            except HTTPException as e:
+                status_code = e.status_code
+                raise
+            except RequestValidationError:
+                status_code = 422
+                raise
+            finally:
+                current_timings.reset(reset_token)
+                _result_size.reset(size_token)
+                if metrics is not None:
+                    metrics.observe_request(
+                        *self.labels,
+                        status_code,
+                        perf_counter() - started,
+                        size[0] if status_code < 400 else None,
+                    )
+            if timings is None:
+                return response
+            timings.finish()
+            if self.server_timing:
+                response.headers["Server-Timing"] = timings.header()
+            if self.timing_hook is not None:
+                result = self.timing_hook(request, timings.as_milliseconds())
+                if inspect.isawaitable(result):
+                    await result
+            return response
+
+        return timed_handler
+
+
+def _timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    @wraps(endpoint)
+    async def route(*args: Any, **kwargs: Any) -> Any:
+        with timed("app"):
+            result = await endpoint(*args, **kwargs)
+        size = _result_size.get()
+        if size is not None:
+            size[0] = _count(result)
+        return result
+
+    route.__timed__ = True
+    return route
+
+
+def _count(result: Any) -> int | None:
+    if isinstance(result, list):
+        return len(result)
+    if result is None or isinstance(result, Response):
+        return None
+    return 1
@@ -1,10 +1,12 @@
 import json
 from typing import Annotated, Any, Callable
-from fastapi import HTTPException, Query, Path, status
+from fastapi import HTTPException, Query, Path, Response, status
 
 from ...models.CRUDEmbed import CRUDEmbed
 from ...models.deleted_mongo_model import DeletedModelOut
+from ...repositories import CollectionHandles
 from ...utils.sorting import normalize_order_by
+from ...utils.partial import partial_model
 
 from .CRUDEmbedRouterFactory import CRUDEmbedRouterFactory
 from ...factories import CRUDEmbedRouterRepository
@@ -34,9 +36,18 @@ class CRUDEmbedRouter(CRUDEmbedRouterFactory):
             else "embed_id"
         )
         self.prefix = f"/{{{self.identifier_display}}}/{child_args.embed_name}"
-        self.db = parent_router.db
+        # built once, the repository functions index it like the database
+        self.db = CollectionHandles(
+            parent_router.db,
+            codec_options=parent_router.codec_options,
+            write_concern=child_args.write_concern or parent_router.write_concern,
+            read_concern=child_args.read_concern or parent_router.read_concern,
+        )
         self.model = child_args.model
         self.embed_name = child_args.embed_name
+        self.slice_threshold = child_args.slice_threshold
+        # the writes stamp the parent, to be seen by its changes route
+        self.changes_field = parent_router.service.repository.changes_field
         super().__init__(parent_router, child_args, *args, **kwargs)
         self._register_routes()
 
@@ -77,6 +88,7 @@ class CRUDEmbedRouter(CRUDEmbedRouterFactory):
                 normalized_order_by,
                 filters_dict,
                 self.parent_identifier_field,
+                self.slice_threshold,
             )
             return response if len(response) else []
 
@@ -116,9 +128,49 @@ class CRUDEmbedRouter(CRUDEmbedRouterFactory):
                 data,
                 self.model,
                 self.parent_identifier_field,
+                changes_field=self.changes_field,
             )
             if response is None:
                 raise HTTPException(422, "Document not created")
+            await self.parent_router.service.repository.mark_written(id)
+            return response
+
+        return route
+
+    def _create_many(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
+        async def route(
+            id: Annotated[str, Path(alias=self.identifier_display)],
+            data: list[self.model],
+            sort_by: str | None = Query(None),
+            order_by: str | None = Query(None),
+            slice: int | None = Query(
+                None,
+                description="Keep the first (positive) or last (negative) items of the array",
+            ),
+        ) -> list[Any]:
+            try:
+                normalized_order_by = normalize_order_by(order_by)
+            except ValueError as e:
+                raise HTTPException(
+                    status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    str(e),
+                ) from e
+            response = await CRUDEmbedRouterRepository.create_many(
+                self.db,
+                id,
+                self.parent_router.collection_name,
+                self.embed_name,
+                data,
+                self.model,
+                self.parent_identifier_field,
+                sort_by,
+                normalized_order_by,
+                slice,
+                changes_field=self.changes_field,
+            )
+            if response is None:
+                raise HTTPException(422, "Documents not created")
+            await self.parent_router.service.repository.mark_written(id)
             return response
 
         return route
@@ -127,9 +179,9 @@ class CRUDEmbedRouter(CRUDEmbedRouterFactory):
         async def route(
             id: Annotated[str, Path(alias=self.identifier_display)],
             embed_id: Annotated[str, Path(alias=self.embed_identifier_display)],
-            data: self.model,
+            data: partial_model(self.model),
         ) -> self.model:
-            response = await CRUDEmbedRouterRepository.update_one(
+            response = await CRUDEmbedRouterRepository.patch_one(
                 self.db,
                 id,
                 embed_id,
@@ -139,13 +191,39 @@ class CRUDEmbedRouter(CRUDEmbedRouterFactory):
                 self.model,
                 self.parent_identifier_field,
                 self.embed_identifier_field,
+                changes_field=self.changes_field,
             )
             if response is None:
                 raise HTTPException(422, "Document not updated")
+            await self.parent_router.service.repository.mark_written(id)
             return response
 
         return route
 
+    def _update_many(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
+        async def route(
+            id: Annotated[str, Path(alias=self.identifier_display)],
+            embed_ids: Annotated[list[str], Query(alias=self.embed_identifier_display)],
+            data: partial_model(self.model),
+        ) -> Response:
+            matched_count = await CRUDEmbedRouterRepository.patch_many(
+                self.db,
+                id,
+                embed_ids,
+                self.parent_router.collection_name,
+                self.embed_name,
+                data,
+                self.parent_identifier_field,
+                self.embed_identifier_field,
+                changes_field=self.changes_field,
+            )
+            if not matched_count:
+                raise HTTPException(422, "Documents not updated")
+            await self.parent_router.service.repository.mark_written(id)
+            return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+        return route
+
     def _delete_one(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
         async def route(
             id: Annotated[str, Path(alias=self.identifier_display)],
@@ -160,9 +238,33 @@ class CRUDEmbedRouter(CRUDEmbedRouterFactory):
                 self.model,
                 self.parent_identifier_field,
                 self.embed_identifier_field,
+                changes_field=self.changes_field,
             )
             if response is None:
                 raise HTTPException(422, "Document not deleted")
+            await self.parent_router.service.repository.mark_written(id)
+            return response
+
+        return route
+
+    def _delete_many(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
+        async def route(
+            id: Annotated[str, Path(alias=self.identifier_display)],
+            embed_ids: Annotated[list[str], Query(alias=self.embed_identifier_display)],
+        ) -> list[DeletedModelOut]:
+            response = await CRUDEmbedRouterRepository.delete_many(
+                self.db,
+                id,
+                embed_ids,
+                self.parent_router.collection_name,
+                self.embed_name,
+                self.parent_identifier_field,
+                self.embed_identifier_field,
+                changes_field=self.changes_field,
+            )
+            if response is None:
+                raise HTTPException(422, "Documents not deleted")
+            await self.parent_router.service.repository.mark_written(id)
             return response
 
         return route
@@ -196,6 +298,15 @@ class CRUDEmbedRouter(CRUDEmbedRouterFactory):
             summary=f"Create One {self.model.__name__} embedded into a {self.parent_router.model.__name__}",
             description=f"Create One {self.model.__name__} embedded into a {self.parent_router.model.__name__}",
         )
+        self._add_api_route(
+            path=self.prefix + "/bulk",
+            endpoint=self._create_many(),
+            methods=["POST"],
+            response_model=list[self.model],
+            tags=[self.embed_name],
+            summary=f"Create Many {self.model.__name__} embedded into a {self.parent_router.model.__name__}",
+            description=f"Create Many {self.model.__name__} embedded into a {self.parent_router.model.__name__} in a single update",
+        )
         self._add_api_route(
             path=self.prefix + embed_id_segment,
             endpoint=self._update_one(),
@@ -203,7 +314,16 @@ class CRUDEmbedRouter(CRUDEmbedRouterFactory):
             response_model=self.model,
             tags=[self.embed_name],
             summary=f"Update One {self.model.__name__} embedded into a {self.parent_router.model.__name__}",
-            description=f"Update One {self.model.__name__} embedded into a {self.parent_router.model.__name__}",
+            description=f"Update the given fields of One {self.model.__name__} embedded into a {self.parent_router.model.__name__}",
+        )
+        self._add_api_route(
+            path=self.prefix,
+            endpoint=self._update_many(),
+            methods=["PATCH"],
+            status_code=status.HTTP_204_NO_CONTENT,
+            tags=[self.embed_name],
+            summary=f"Update Many {self.model.__name__} embedded into a {self.parent_router.model.__name__}",
+            description=f"Update the given fields of many {self.model.__name__} embedded into a {self.parent_router.model.__name__} by {self.embed_identifier_display} in a single update",
         )
         self._add_api_route(
             path=self.prefix + embed_id_segment,
@@ -214,3 +334,12 @@ class CRUDEmbedRouter(CRUDEmbedRouterFactory):
             summary=f"Delete One {self.model.__name__} embedded into a {self.parent_router.model.__name__}",
             description=f"Delete One {self.model.__name__} embedded into a {self.parent_router.model.__name__}",
         )
+        self._add_api_route(
+            path=self.prefix,
+            endpoint=self._delete_many(),
+            methods=["DELETE"],
+            response_model=list[DeletedModelOut],
+            tags=[self.embed_name],
+            summary=f"Delete Many {self.model.__name__} embedded into a {self.parent_router.model.__name__}",
+            description=f"Delete Many {self.model.__name__} embedded into a {self.parent_router.model.__name__} by {self.embed_identifier_display} in a single update",
+        )
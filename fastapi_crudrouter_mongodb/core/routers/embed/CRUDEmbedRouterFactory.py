@@ -3,6 +3,7 @@ from fastapi import APIRouter
 
 from ...factories.CRUDRouterFactory import CRUDRouterFactory
 from ...models.mongo_model import MongoModel
+from ...metrics.labels import label_route
 
 
 class CRUDEmbedRouterFactory(APIRouter):
@@ -13,7 +14,10 @@ class CRUDEmbedRouterFactory(APIRouter):
         self.child_args = child_args
 
     def _add_api_route(self, path: str, endpoint: Callable, **kwargs: Any) -> None:
-        self.parent_router._add_api_route(path, endpoint, **kwargs)
+        label_route(endpoint, self.parent_router.collection_name, "embed")
+        self.parent_router._add_api_route(
+            path, endpoint, max_time_ms=self.child_args.max_time_ms, **kwargs
+        )
 
     def _get_all(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
         return self.parent_router._get_all(*args, **kwargs)
@@ -5,6 +5,7 @@ from fastapi import HTTPException, Response, Query, Path, status
 from ...models.CRUDLookup import CRUDLookup
 from ...factories.CRUDLookupRouterFactory import CRUDLookupRouterFactory
 from . import CRUDLookupRouterRepository
+from ...repositories import CollectionHandles
 from ...utils.sorting import normalize_order_by
 
 
@@ -16,7 +17,13 @@ class CRUDLookupRouter(CRUDLookupRouterFactory):
             else "id"
         )
         self.prefix = f"/{{{self.identifier_display}}}/{child_args.prefix}"
-        self.db = parent_router.db
+        # built once, the repository functions index it like the database
+        self.db = CollectionHandles(
+            parent_router.db,
+            codec_options=child_args.codec_options or parent_router.codec_options,
+            write_concern=child_args.write_concern or parent_router.write_concern,
+            read_concern=child_args.read_concern or parent_router.read_concern,
+        )
         self.model = child_args.model
         self.model_out = (
             child_args.model_out
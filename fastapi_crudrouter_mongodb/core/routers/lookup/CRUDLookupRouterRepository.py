@@ -3,6 +3,11 @@ from bson import ObjectId
 
 from ...models.mongo_model import MongoModel
 from ...models.deleted_mongo_model import DeletedModelOut
+from ...utils.time_budget import (
+    closing_cursor,
+    cursor_max_time_kwargs,
+    max_time_kwargs,
+)
 
 
 def _matches_filters(document: dict[str, Any], filters: dict[str, Any] | None) -> bool:
@@ -68,16 +73,17 @@ async def get_all(
 
     try:
         documents = db[parent_collection_name].aggregate(
-            [{"$match": {"_id": ObjectId(id)}}, lookup_stage]
+            [{"$match": {"_id": ObjectId(id)}}, lookup_stage], **max_time_kwargs()
         )
         models = []
-        async for document in documents:
-            models.append(parent_model.from_mongo(document))
+        async with closing_cursor(documents):
+            async for document in documents:
+                models.append(parent_model.from_mongo(document))
         returned_value = models[0]
         return returned_value.convert_to(model=model_out)
     except NotImplementedError:
         parent_document = await db[parent_collection_name].find_one(
-            {"_id": ObjectId(id)}
+            {"_id": ObjectId(id)}, **cursor_max_time_kwargs()
         )
         if parent_document is None:
             return None
@@ -85,7 +91,7 @@ async def get_all(
         local_values = parent_document.get(local_field, []) or []
         child_documents = []
         async for child in db[collection_name].find(
-            {foreign_field: {"$in": local_values}}
+            {foreign_field: {"$in": local_values}}, **cursor_max_time_kwargs()
         ):
             if _matches_filters(child, filters):
                 child_documents.append(child)
@@ -135,7 +141,8 @@ async def get_one(
                         "preserveNullAndEmptyArrays": True,
                     }
                 },
-            ]
+            ],
+            **max_time_kwargs(),
         )
         models = []
         async for document in documents:
@@ -144,7 +151,7 @@ async def get_one(
         return returned_value.convert_to(model=model_out)
     except NotImplementedError:
         parent_document = await db[parent_collection_name].find_one(
-            {"_id": ObjectId(id)}
+            {"_id": ObjectId(id)}, **cursor_max_time_kwargs()
         )
         if parent_document is None:
             return None
@@ -156,7 +163,7 @@ async def get_one(
             return parent_model.from_mongo(parent_document).convert_to(model=model_out)
 
         child_document = await db[collection_name].find_one(
-            {foreign_field: lookup_object_id}
+            {foreign_field: lookup_object_id}, **cursor_max_time_kwargs()
         )
         parent_document[collection_name] = child_document
         return parent_model.from_mongo(parent_document).convert_to(model=model_out)
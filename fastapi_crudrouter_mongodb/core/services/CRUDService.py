@@ -1,8 +1,17 @@
 from typing import Any, Callable
+from bson.codec_options import CodecOptions
 from fastapi import HTTPException, status, Response
 from pydantic import BaseModel
+from pymongo.read_concern import ReadConcern
+from pymongo.write_concern import WriteConcern
+from ..cache import DocumentCache
+from ..events import EventSource
+from ..metrics import IndexAdvisor, MetricsRegistry
 from ..repositories import CRUDRepository
+from ..utils.tokens import decode_token, encode_token
 from ..utils.deprecated_util import deprecated
+from ..utils.operators import operator_update
+from ..utils.timing import timed
 
 
 class CRUDService:
@@ -20,6 +29,32 @@ class CRUDService:
     :type collection_name: str
     :param model_out: (Optional) The Pydantic model to be used for output validation and serialization.
     :type model_out: BaseModel | None
+    :param batch_create_max_size: (Optional) Coalesce creates into ``insert_many`` batches of at most this size.
+    :type batch_create_max_size: int | None
+    :param batch_create_max_latency: The maximum time, in seconds, a create waits for its batch.
+    :type batch_create_max_latency: float
+    :param read_preferences: (Optional) Read preference by kind of read, ``get_all``, ``get_one`` or ``populate``.
+    :type read_preferences: dict[str, Any] | None
+    :param changes_field: (Optional) Field stamped with the date of every write, used by the changes feed.
+    :type changes_field: str | None
+    :param tombstone_collection_name: (Optional) Collection recording the deleted ids for the changes feed.
+    :type tombstone_collection_name: str | None
+    :param changes_window: The seconds of the latest writes held back by the changes feed.
+    :type changes_window: float
+    :param event_source: (Optional) Event source the writes are published to.
+    :type event_source: EventSource | None
+    :param cache: (Optional) Cache of the documents read by id, invalidated on writes.
+    :type cache: DocumentCache | None
+    :param write_concern: (Optional) Write concern of the writes, defaults to the one of ``db``.
+    :type write_concern: WriteConcern | None
+    :param read_concern: (Optional) Read concern of the reads, defaults to the one of ``db``.
+    :type read_concern: ReadConcern | None
+    :param codec_options: (Optional) Codec options of the documents, defaults to the ones of ``db``.
+    :type codec_options: CodecOptions | None
+    :param metrics: (Optional) Registry recording the hits and misses of the cache.
+    :type metrics: MetricsRegistry | None
+    :param index_advisor: (Optional) Advisor recording the shapes of the find all queries.
+    :type index_advisor: IndexAdvisor | None
     :param args: Additional arguments to be passed to the CRUD operations.
     :type args: Any
     :param kwargs: Additional keyword arguments to be passed to the CRUD operations.
@@ -33,6 +68,19 @@ class CRUDService:
         collection_name: str,
         identifier_field: str = "_id",
         model_out: BaseModel | None = None,
+        batch_create_max_size: int | None = None,
+        batch_create_max_latency: float = 0.005,
+        read_preferences: dict[str, Any] | None = None,
+        changes_field: str | None = None,
+        tombstone_collection_name: str | None = None,
+        event_source: EventSource | None = None,
+        cache: DocumentCache | None = None,
+        changes_window: float = 2.0,
+        write_concern: WriteConcern | None = None,
+        read_concern: ReadConcern | None = None,
+        codec_options: CodecOptions | None = None,
+        metrics: MetricsRegistry | None = None,
+        index_advisor: IndexAdvisor | None = None,
         *args,
         **kwargs,
     ) -> None:
@@ -47,6 +95,19 @@ class CRUDService:
             collection_name=collection_name,
             identifier_field=identifier_field,
             model_out=model_out,
+            batch_create_max_size=batch_create_max_size,
+            batch_create_max_latency=batch_create_max_latency,
+            read_preferences=read_preferences,
+            changes_field=changes_field,
+            tombstone_collection_name=tombstone_collection_name,
+            event_source=event_source,
+            cache=cache,
+            changes_window=changes_window,
+            write_concern=write_concern,
+            read_concern=read_concern,
+            codec_options=codec_options,
+            metrics=metrics,
+            index_advisor=index_advisor,
         )
 
     @deprecated("get_all is deprecated. Use find_all instead.")
@@ -61,6 +122,8 @@ class CRUDService:
         order_by: str | None = None,
         filters: dict | None = None,
         populates: list | None = None,
+        lookups: list | None = None,
+        raw: bool = False,
     ) -> list[Any]:
         """
         Find all documents from the collection.
@@ -77,10 +140,44 @@ class CRUDService:
         :type filters: dict | None
         :param populates: List of CRUDPopulate configuration objects.
         :type populates: list | None
+        :param lookups: List of CRUDLookup configuration objects to join in the same query.
+        :type lookups: list | None
+        :param raw: Respond with the documents transcoded from BSON to JSON, when
+            nothing is populated or joined.
+        :type raw: bool
 
         :return: A list of documents from the collection.
         :rtype: list
         """
+        if raw and not populates and not lookups:
+            documents = await self.repository.find_all(
+                skip=skip,
+                limit=limit,
+                sort_by=sort_by,
+                order_by=order_by,
+                filters=filters,
+                raw=True,
+            )
+            return Response(
+                content=b"[" + b",".join(documents) + b"]",
+                media_type="application/json",
+            )
+        if lookups:
+            response, joined = await self.repository.find_all_with_lookups(
+                lookups,
+                skip=skip,
+                limit=limit,
+                sort_by=sort_by,
+                order_by=order_by,
+                filters=filters,
+                apply_model_out=not bool(populates),
+            )
+            response = await self._populate_many(response, populates)
+            return [
+                self._serialize_joined_document(doc, joined[i])
+                for i, doc in enumerate(response)
+            ]
+
         response = await self.repository.find_all(
             skip=skip,
             limit=limit,
@@ -90,25 +187,66 @@ class CRUDService:
             apply_model_out=not bool(populates),
         )
         if populates:
+            return await self._populate_many(response, populates)
+        return response if len(response) else []
+
+    async def _populate_many(self, response: list, populates: list | None) -> list:
+        if not populates:
+            return response
+        try:
+            response = await self.repository.resolve_populate(response, populates)
+        except ValueError as e:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                str(e),
+            ) from e
+        populated_payloads = [
+            self._serialize_populated_fields(doc, populates) for doc in response
+        ]
+        if self.model_out is not None:
+            response = [doc.convert_to(model=self.model_out) for doc in response]
+        return [
+            self._serialize_populated_document(doc, populates, populated_payloads[i])
+            for i, doc in enumerate(response)
+        ]
+
+    async def find_changes(
+        self, since: str | None = None, limit: int = 100, filters: dict | None = None
+    ) -> dict:
+        """
+        Find the changes made to the collection since a token.
+
+        :param since: The token returned by a previous call, None for a full sync.
+        :type since: str | None
+        :param limit: The maximum number of documents, and of deleted ids, to return.
+        :type limit: int
+        :param filters: Only return the changes of the documents matching this filter.
+        :type filters: dict | None
+        :return: The changed documents, the deleted ids and the next token.
+        :rtype: dict
+        """
+        position = None
+        if since is not None:
             try:
-                response = await self.repository.resolve_populate(response, populates)
+                position = decode_token(since)
             except ValueError as e:
                 raise HTTPException(
-                    status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    str(e),
+                    status.HTTP_422_UNPROCESSABLE_ENTITY, "Invalid since token"
                 ) from e
-            populated_payloads = [
-                self._serialize_populated_fields(doc, populates) for doc in response
-            ]
-            if self.model_out is not None:
-                response = [doc.convert_to(model=self.model_out) for doc in response]
-            return [
-                self._serialize_populated_document(
-                    doc, populates, populated_payloads[i]
+            after = position.get("d")
+            if after is not None and (not isinstance(after, list) or len(after) != 2):
+                raise HTTPException(
+                    status.HTTP_422_UNPROCESSABLE_ENTITY, "Invalid since token"
                 )
-                for i, doc in enumerate(response)
-            ]
-        return response if len(response) else []
+        documents, deleted, position = await self.repository.find_changes(
+            position, limit, filters
+        )
+        return {
+            "documents": documents,
+            "deleted": [str(document_id) for document_id in deleted],
+            "next": encode_token(position),
+            "has_more": len(documents) == limit or len(deleted) == limit,
+        }
 
     @deprecated("get_one is deprecated. Use find_one instead.")
     async def get_one(self, id: str, *args: Any, **kwargs: Any) -> Callable[..., Any]:
@@ -119,6 +257,8 @@ class CRUDService:
         id: str,
         *args: Any,
         populates: list | None = None,
+        lookups: list | None = None,
+        raw: bool = False,
         **kwargs: Any,
     ) -> Callable[..., Any]:
         """
@@ -126,9 +266,31 @@ class CRUDService:
 
         :param id: The id of the document to be retrieved.
         :type id: str
+        :param lookups: List of CRUDLookup configuration objects to join in the same query.
+        :type lookups: list | None
+        :param raw: Respond with the document transcoded from BSON to JSON, when
+            nothing is populated or joined.
+        :type raw: bool
         :return: The document from the collection.
         :rtype: dict
         """
+        if raw and not populates and not lookups:
+            response = await self.repository.find_one(id, raw=True)
+            if response is None:
+                raise HTTPException(status.HTTP_400_BAD_REQUEST, "Document not found")
+            return Response(content=response, media_type="application/json")
+        if lookups:
+            response = await self.repository.find_one_with_lookups(
+                id,
+                lookups,
+                apply_model_out=not bool(populates),
+            )
+            if response is None:
+                raise HTTPException(status.HTTP_400_BAD_REQUEST, "Document not found")
+            response, joined = response
+            response = (await self._populate_many([response], populates))[0]
+            return self._serialize_joined_document(response, joined)
+
         response = await self.repository.find_one(
             id,
             apply_model_out=not bool(populates),
@@ -157,6 +319,7 @@ class CRUDService:
 
         return response
 
+    @timed("encode")
     def _serialize_populated_document(
         self,
         doc: BaseModel,
@@ -177,6 +340,16 @@ class CRUDService:
             serialized[output_field] = self._serialize_populate_value(field_value)
         return serialized
 
+    @timed("encode")
+    def _serialize_joined_document(self, doc: Any, joined: dict[str, list]) -> dict:
+        """Serialize a document and attach the documents joined by its lookups."""
+        serialized = (
+            doc if isinstance(doc, dict) else doc.model_dump(by_alias=True, mode="json")
+        )
+        for field, values in joined.items():
+            serialized[field] = self._serialize_populate_value(values)
+        return serialized
+
     def _serialize_populated_fields(
         self, doc: BaseModel, populates: list
     ) -> dict[str, Any]:
@@ -213,7 +386,7 @@ class CRUDService:
         return response
 
     async def replace_one(
-        self, id: str, data, *args: Any, **kwargs: Any
+        self, id: str, data, *args: Any, minimal: bool = False, **kwargs: Any
     ) -> Callable[..., Any]:
         """
         Replace one document in the collection.
@@ -222,9 +395,18 @@ class CRUDService:
         :type id: str
         :param data: The data of the document to be replaced.
         :type data: dict
+        :param minimal: Return a 204 response instead of reading the document back.
+        :type minimal: bool
         :return: The replaced document.
         :rtype: dict
         """
+        if minimal:
+            matched = await self.repository.replace_one(id, data, minimal=True)
+            if not matched:
+                raise HTTPException(
+                    status.HTTP_422_UNPROCESSABLE_ENTITY, "Document not replaced"
+                )
+            return self._minimal_response()
         response = await self.repository.replace_one(id, data)
         if response is None:
             raise HTTPException(
@@ -232,8 +414,28 @@ class CRUDService:
             )
         return response
 
-    async def update_one(
+    async def upsert_one(
         self, id: str, data, *args: Any, **kwargs: Any
+    ) -> tuple[Any, bool]:
+        """
+        Replace one document in the collection, creating it if it does not exist.
+
+        :param id: The id of the document to be upserted.
+        :type id: str
+        :param data: The data of the document to be upserted.
+        :type data: dict
+        :return: The written document and whether it was created.
+        :rtype: tuple[dict, bool]
+        """
+        response = await self.repository.upsert_one(id, data)
+        if response is None:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY, "Document not upserted"
+            )
+        return response
+
+    async def update_one(
+        self, id: str, data, *args: Any, minimal: bool = False, **kwargs: Any
     ) -> Callable[..., Any]:
         """
         Update one document in the collection.
@@ -242,9 +444,18 @@ class CRUDService:
         :type id: str
         :param data: The data of the document to be updated.
         :type data: dict
+        :param minimal: Return a 204 response instead of reading the document back.
+        :type minimal: bool
         :return: The updated document.
         :rtype: dict
         """
+        if minimal:
+            matched = await self.repository.update_one(id, data, minimal=True)
+            if not matched:
+                raise HTTPException(
+                    status.HTTP_422_UNPROCESSABLE_ENTITY, "Document not updated"
+                )
+            return self._minimal_response()
         response = await self.repository.update_one(id, data)
         if response is None:
             raise HTTPException(
@@ -252,6 +463,39 @@ class CRUDService:
             )
         return response
 
+    async def update_one_with_operators(
+        self,
+        id: str,
+        operations: dict,
+        *args: Any,
+        minimal: bool = False,
+        **kwargs: Any,
+    ) -> Callable[..., Any]:
+        """
+        Apply atomic update operators to one document in the collection.
+
+        :param id: The id of the document to be updated.
+        :type id: str
+        :param operations: The operators to apply, e.g. ``{"$inc": {"count": 1}}``.
+        :type operations: dict
+        :param minimal: Return a 204 response instead of reading the document back.
+        :type minimal: bool
+        :return: The updated document.
+        :rtype: dict
+        """
+        try:
+            update = operator_update(self.model, operations)
+        except ValueError as e:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, str(e)) from e
+        response = await self.repository.update_one_with_operators(
+            id, update, minimal=minimal
+        )
+        if not response:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY, "Document not updated"
+            )
+        return self._minimal_response() if minimal else response
+
     async def delete_one(self, id: str, *args: Any, **kwargs: Any) -> Response:
         """
         Delete one document from the collection.
@@ -261,9 +505,16 @@ class CRUDService:
         :return: The deleted document id.
         :rtype: dict {"id": "{deleted_id}"}
         """
-        response = await self.repository.delete_one(id)
-        if response is None:
+        # the deleted document is not returned, so it is not decoded either
+        deleted = await self.repository.delete_one(id, minimal=True)
+        if not deleted:
             raise HTTPException(
                 status.HTTP_422_UNPROCESSABLE_ENTITY, "Document not deleted"
             )
         return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    def _minimal_response(self) -> Response:
+        return Response(
+            status_code=status.HTTP_204_NO_CONTENT,
+            headers={"Preference-Applied": "return=minimal"},
+        )
@@ -1,3 +1,13 @@
+from .codecs import DecimalCodec, build_codec_options
 from .deprecated_util import deprecated
+from .operators import operator_update
+from .partial import partial_model, set_paths
 
-__all__ = ["deprecated"]
+__all__ = [
+    "DecimalCodec",
+    "build_codec_options",
+    "deprecated",
+    "operator_update",
+    "partial_model",
+    "set_paths",
+]
@@ -0,0 +1,46 @@
+from collections.abc import Iterable, MutableMapping
+from datetime import timezone
+from decimal import Decimal
+from bson.codec_options import CodecOptions, TypeCodec, TypeRegistry
+from bson.decimal128 import Decimal128
+
+
+class DecimalCodec(TypeCodec):
+    """Store ``Decimal`` values, like the ones of ``Decimal`` fields, as Decimal128."""
+
+    python_type = Decimal
+    bson_type = Decimal128
+
+    def transform_python(self, value: Decimal) -> Decimal128:
+        return Decimal128(value)
+
+    def transform_bson(self, value: Decimal128) -> Decimal:
+        return value.to_decimal()
+
+
+def build_codec_options(
+    document_class: type[MutableMapping] = dict,
+    tz_aware: bool = True,
+    type_codecs: Iterable[TypeCodec] = (),
+) -> CodecOptions:
+    """
+    Build the codec options of a router.
+
+    Datetimes are decoded as UTC aware datetimes, and ``Decimal`` values are
+    stored as Decimal128, on top of the given codecs.
+
+    :param document_class: The class of the decoded documents.
+    :type document_class: type[MutableMapping]
+    :param tz_aware: Decode the datetimes as aware datetimes, in UTC.
+    :type tz_aware: bool
+    :param type_codecs: The codecs of other custom types.
+    :type type_codecs: Iterable[TypeCodec]
+    :return: The codec options.
+    :rtype: CodecOptions
+    """
+    return CodecOptions(
+        document_class=document_class,
+        tz_aware=tz_aware,
+        tzinfo=timezone.utc if tz_aware else None,
+        type_registry=TypeRegistry([DecimalCodec(), *type_codecs]),
+    )
@@ -0,0 +1,44 @@
+from typing import Any
+from pymongo.errors import ConfigurationError
+from pymongo.read_concern import ReadConcern
+from pymongo.write_concern import WriteConcern
+
+
+def resolve_write_concern(value: Any) -> WriteConcern | None:
+    """
+    Resolve a write concern given as a pymongo object or as its options.
+
+    Options are the ``WriteConcern`` keyword arguments, e.g.
+    ``{"w": "majority", "wtimeout": 1000}`` or ``{"w": 1, "j": False}``.
+
+    :param value: The write concern, or None.
+    :type value: WriteConcern | dict | None
+    :raises ValueError: If the options are not valid.
+    :return: The pymongo write concern, or None.
+    :rtype: WriteConcern | None
+    """
+    if value is None or isinstance(value, WriteConcern):
+        return value
+    if not isinstance(value, dict):
+        raise ValueError(f"Invalid write concern: {value!r}")
+    try:
+        return WriteConcern(**value)
+    except (ConfigurationError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid write concern: {e}") from e
+
+
+def resolve_read_concern(value: Any) -> ReadConcern | None:
+    """
+    Resolve a read concern given as a pymongo object or as a level name.
+
+    :param value: The read concern, or a level like ``majority``, or None.
+    :type value: ReadConcern | str | None
+    :raises ValueError: If the value is not valid.
+    :return: The pymongo read concern, or None.
+    :rtype: ReadConcern | None
+    """
+    if value is None or isinstance(value, ReadConcern):
+        return value
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid read concern: {value!r}")
+    return ReadConcern(value)
@@ -0,0 +1,151 @@
+from typing import Any
+
+_COMPARISONS = {
+    "$gt": lambda value, operand: value > operand,
+    "$gte": lambda value, operand: value >= operand,
+    "$lt": lambda value, operand: value < operand,
+    "$lte": lambda value, operand: value <= operand,
+}
+_LOGICAL = {"$and", "$or", "$nor"}
+_FIELD_OPERATORS = {"$eq", "$ne", "$in", "$nin", "$exists"} | set(_COMPARISONS)
+
+
+def validate_filters(filters: dict) -> None:
+    """
+    Check that a filter only uses the operators ``matches`` can evaluate.
+
+    :param filters: The MongoDB filter document.
+    :type filters: dict
+    :raises ValueError: If an operator is not supported.
+    """
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be an object")
+    for key, condition in filters.items():
+        if key in _LOGICAL:
+            if not isinstance(condition, list):
+                raise ValueError(f"{key} expects an array")
+            for sub_filters in condition:
+                validate_filters(sub_filters)
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported operator: {key}")
+        elif _is_operator_document(condition):
+            unknown = set(condition) - _FIELD_OPERATORS
+            if unknown:
+                raise ValueError(f"Unsupported operator: {', '.join(sorted(unknown))}")
+
+
+def prefix_filters(filters: dict, prefix: str) -> dict:
+    """
+    Move a filter onto the fields of a sub-document.
+
+    :param filters: The MongoDB filter document.
+    :type filters: dict
+    :param prefix: The path of the sub-document, e.g. ``document``.
+    :type prefix: str
+    :raises ValueError: If a top-level operator, like ``$expr``, can not be moved.
+    :return: The filter on the fields of the sub-document.
+    :rtype: dict
+    """
+    prefixed = {}
+    for key, condition in filters.items():
+        if key in _LOGICAL:
+            prefixed[key] = [prefix_filters(sub, prefix) for sub in condition]
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported operator: {key}")
+        else:
+            prefixed[f"{prefix}.{key}"] = condition
+    return prefixed
+
+
+def matches(document: dict, filters: dict | None) -> bool:
+    """
+    Evaluate a MongoDB filter against a document, in memory.
+
+    Supports field equality, dotted paths, arrays matching any of their items,
+    ``$eq``, ``$ne``, ``$gt``, ``$gte``, ``$lt``, ``$lte``, ``$in``, ``$nin``,
+    ``$exists``, ``$and``, ``$or`` and ``$nor``.
+
+    :param document: The document, as stored in MongoDB.
+    :type document: dict
+    :param filters: The filter, validated with ``validate_filters``.
+    :type filters: dict | None
+    :return: Whether the document matches the filter.
+    :rtype: bool
+    """
+    for key, condition in (filters or {}).items():
+        if key == "$and":
+            if not all(matches(document, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(document, sub) for sub in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(document, sub) for sub in condition):
+                return False
+        elif not _matches_field(_resolve(document, key), condition):
+            return False
+    return True
+
+
+_MISSING = object()
+
+
+def _resolve(document: Any, path: str) -> Any:
+    value = document
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return _MISSING
+    return value
+
+
+def _is_operator_document(condition: Any) -> bool:
+    return (
+        isinstance(condition, dict)
+        and len(condition) > 0
+        and all(key.startswith("$") for key in condition)
+    )
+
+
+def _equals(value: Any, operand: Any) -> bool:
+    if value is _MISSING:
+        return operand is None
+    if isinstance(value, list) and not isinstance(operand, list):
+        return operand in value
+    return value == operand
+
+
+def _compare(value: Any, operand: Any, comparison) -> bool:
+    candidates = value if isinstance(value, list) else [value]
+    for candidate in candidates:
+        try:
+            if candidate is not _MISSING and comparison(candidate, operand):
+                return True
+        except TypeError:
+            # values of different types do not match, like MongoDB type brackets
+            continue
+    return False
+
+
+def _matches_field(value: Any, condition: Any) -> bool:
+    if not _is_operator_document(condition):
+        return _equals(value, condition)
+    for operator, operand in condition.items():
+        if operator == "$eq":
+            result = _equals(value, operand)
+        elif operator == "$ne":
+            result = not _equals(value, operand)
+        elif operator == "$in":
+            result = any(_equals(value, item) for item in operand)
+        elif operator == "$nin":
+            result = not any(_equals(value, item) for item in operand)
+        elif operator == "$exists":
+            result = (value is not _MISSING) == bool(operand)
+        else:
+            result = _compare(value, operand, _COMPARISONS[operator])
+        if not result:
+            return False
+    return True
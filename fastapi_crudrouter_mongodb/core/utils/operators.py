@@ -0,0 +1,135 @@
+from decimal import Decimal
+from types import UnionType
+from typing import Any, Union, get_args, get_origin
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+NUMERIC_OPERATORS = {"$inc", "$min", "$max"}
+ARRAY_OPERATORS = {"$addToSet", "$pull", "$push"}
+UPDATE_OPERATORS = NUMERIC_OPERATORS | ARRAY_OPERATORS
+
+_ARRAY_TYPES = (list, set, frozenset, tuple)
+
+
+def operator_update(
+    model: type[BaseModel], operations: dict[str, dict[str, Any]]
+) -> dict[str, dict[str, Any]]:
+    """
+    Validate atomic update operators against the fields declared in a model.
+
+    Supported operators are ``$inc``, ``$min``, ``$max``, ``$addToSet``, ``$pull``
+    and ``$push`` (with ``$each`` and ``$slice``). Fields can be given by name or
+    alias, and values are validated and serialized with the field types, so the
+    result can be used as is as an ``update_one`` document.
+
+    :param model: The model of the documents to update.
+    :type model: type[BaseModel]
+    :param operations: The operators sent by the client, e.g. ``{"$inc": {"count": 1}}``.
+    :type operations: dict[str, dict[str, Any]]
+    :raises ValueError: If an operator, a field or a value is not valid.
+    :return: The update document.
+    :rtype: dict[str, dict[str, Any]]
+    """
+    if not operations:
+        raise ValueError("At least one operator is required")
+    fields = _model_fields(model)
+    update: dict[str, dict[str, Any]] = {}
+    seen: set[str] = set()
+    for operator, values in operations.items():
+        if operator not in UPDATE_OPERATORS:
+            raise ValueError(f"Unsupported operator: {operator}")
+        if not isinstance(values, dict) or not values:
+            raise ValueError(f"{operator} expects an object of fields")
+        update[operator] = {}
+        for field, value in values.items():
+            if field not in fields:
+                raise ValueError(f"Unknown field: {field}")
+            key, annotation = fields[field]
+            if key in seen:
+                raise ValueError(f"Conflicting operators on field: {field}")
+            seen.add(key)
+            update[operator][key] = _operator_value(operator, field, annotation, value)
+    return update
+
+
+def _model_fields(model: type[BaseModel]) -> dict[str, tuple[str, Any]]:
+    fields: dict[str, tuple[str, Any]] = {}
+    for name, field_info in model.model_fields.items():
+        key = field_info.alias or name
+        # the identifier is immutable
+        if key in ("id", "_id"):
+            continue
+        fields[name] = fields[key] = (key, field_info.annotation)
+    return fields
+
+
+def _strip_optional(annotation: Any) -> Any:
+    if get_origin(annotation) in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _array_item_type(annotation: Any) -> Any | None:
+    """Return the item type of an array field, or None if it is not an array."""
+    annotation = _strip_optional(annotation)
+    if annotation in _ARRAY_TYPES:
+        return Any
+    if get_origin(annotation) in _ARRAY_TYPES:
+        args = get_args(annotation)
+        return args[0] if args else Any
+    return None
+
+
+def _is_numeric(annotation: Any) -> bool:
+    annotation = _strip_optional(annotation)
+    return (
+        isinstance(annotation, type)
+        and issubclass(annotation, (int, float, Decimal))
+        and not issubclass(annotation, bool)
+    )
+
+
+def _dump(annotation: Any, field: str, value: Any) -> Any:
+    adapter = TypeAdapter(annotation)
+    try:
+        validated = adapter.validate_python(value)
+    except ValidationError as e:
+        raise ValueError(f"Invalid value for field {field}: {value!r}") from e
+    return adapter.dump_python(validated, by_alias=True, exclude_none=True)
+
+
+def _operator_value(operator: str, field: str, annotation: Any, value: Any) -> Any:
+    item_type = _array_item_type(annotation)
+    if operator in NUMERIC_OPERATORS:
+        if item_type is not None:
+            raise ValueError(f"{operator} can not be used on array field: {field}")
+        if operator == "$inc":
+            if not _is_numeric(annotation) or isinstance(value, bool):
+                raise ValueError(f"$inc requires a numeric field and value: {field}")
+        return _dump(_strip_optional(annotation), field, value)
+
+    if item_type is None:
+        raise ValueError(f"{operator} requires an array field: {field}")
+    modifiers = value if isinstance(value, dict) and "$each" in value else None
+    if modifiers is None:
+        return _dump(item_type, field, value)
+    if operator == "$pull":
+        raise ValueError("$pull does not accept $each")
+    allowed = {"$each", "$slice"} if operator == "$push" else {"$each"}
+    unknown = set(modifiers) - allowed
+    if unknown:
+        raise ValueError(
+            f"Unsupported modifier for {operator}: {', '.join(sorted(unknown))}"
+        )
+    each = modifiers["$each"]
+    if not isinstance(each, list):
+        raise ValueError(f"$each expects an array: {field}")
+    result: dict[str, Any] = {"$each": [_dump(item_type, field, item) for item in each]}
+    if "$slice" in modifiers:
+        if not isinstance(modifiers["$slice"], int) or isinstance(
+            modifiers["$slice"], bool
+        ):
+            raise ValueError(f"$slice expects an integer: {field}")
+        result["$slice"] = modifiers["$slice"]
+    return result
@@ -0,0 +1,62 @@
+from functools import lru_cache
+from typing import Any
+from pydantic import BaseModel, Field, create_model
+
+
+@lru_cache(maxsize=None)
+def partial_model(model: type[BaseModel]) -> type[BaseModel]:
+    """
+    Derive a model whose fields are all optional and default to None.
+
+    The derived model subclasses ``model`` to keep its configuration and methods,
+    and is cached so every router shares the same schema.
+
+    :param model: The model to derive.
+    :type model: type[BaseModel]
+    :return: The partial model.
+    :rtype: type[BaseModel]
+    """
+    fields: dict[str, Any] = {
+        name: (
+            field_info.annotation | None,
+            Field(None, alias=field_info.alias, description=field_info.description),
+        )
+        for name, field_info in model.model_fields.items()
+    }
+    return create_model(f"{model.__name__}Partial", __base__=model, **fields)
+
+
+def set_paths(data: BaseModel, prefix: str = "") -> dict[str, Any]:
+    """
+    Build the ``$set`` paths of the fields the client explicitly set.
+
+    Nested models are flattened into dotted paths, so only their set fields are written.
+    None values are skipped, like ``MongoModel.to_mongo`` does.
+
+    :param data: The validated request body.
+    :type data: BaseModel
+    :param prefix: Path prepended to every field, e.g. ``"items.$."``.
+    :type prefix: str
+    :return: The ``$set`` document.
+    :rtype: dict[str, Any]
+    """
+    return _set_paths(data, prefix, is_root=True)
+
+
+def _set_paths(data: BaseModel, prefix: str, is_root: bool) -> dict[str, Any]:
+    dumped = data.model_dump(by_alias=True, exclude_unset=True)
+    paths: dict[str, Any] = {}
+    for name, field_info in type(data).model_fields.items():
+        if name not in data.model_fields_set:
+            continue
+        value = getattr(data, name)
+        if value is None:
+            continue
+        key = field_info.alias or name
+        if isinstance(value, BaseModel):
+            paths.update(_set_paths(value, f"{prefix}{key}.", is_root=False))
+            continue
+        # Mongo uses `_id` as default key, like MongoModel.to_mongo
+        path = "_id" if key == "id" and is_root else key
+        paths[f"{prefix}{path}"] = dumped[key]
+    return paths
@@ -0,0 +1,206 @@
+import types
+from typing import Any, Sequence, Union, get_args, get_origin
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# the operators a field can be declared filterable with
+FILTER_OPERATORS = {
+    "$eq",
+    "$ne",
+    "$gt",
+    "$gte",
+    "$lt",
+    "$lte",
+    "$in",
+    "$nin",
+    "$all",
+    "$exists",
+    "$size",
+    "$regex",
+}
+_LIST_OPERATORS = {"$in", "$nin", "$all"}
+_LOGICAL = {"$and", "$or"}
+
+
+def _value_type(annotation: Any) -> Any:
+    """Return the type of the values of a field, without None and list."""
+    if get_origin(annotation) in (Union, types.UnionType):
+        members = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(members) == 1:
+            annotation = members[0]
+    if get_origin(annotation) in (list, set, tuple):
+        args = get_args(annotation)
+        annotation = args[0] if args else Any
+    return annotation
+
+
+class _Field:
+    def __init__(self, name: str, key: str, operators: set[str], annotation: Any):
+        self.name = name
+        self.key = key
+        self.operators = operators
+        value_type = _value_type(annotation)
+        self.adapter = (
+            None
+            if value_type is Any
+            or (isinstance(value_type, type) and issubclass(value_type, BaseModel))
+            else TypeAdapter(value_type)
+        )
+
+    def convert(self, condition: Any) -> Any:
+        if isinstance(condition, dict) and any(
+            key.startswith("$") for key in condition
+        ):
+            return {
+                operator: self._operand(operator, operand)
+                for operator, operand in condition.items()
+            }
+        self._check("$eq")
+        return self._value(condition)
+
+    def _check(self, operator: str) -> None:
+        if operator not in self.operators:
+            raise ValueError(f"Operator {operator} is not allowed on {self.name}")
+
+    def _operand(self, operator: str, operand: Any) -> Any:
+        if operator == "$options":
+            self._check("$regex")
+            return operand
+        self._check(operator)
+        if operator in _LIST_OPERATORS:
+            if not isinstance(operand, list):
+                raise ValueError(f"{operator} expects an array")
+            return [self._value(value) for value in operand]
+        if operator == "$exists":
+            if not isinstance(operand, bool):
+                raise ValueError("$exists expects a boolean")
+            return operand
+        if operator == "$size":
+            if not isinstance(operand, int) or isinstance(operand, bool):
+                raise ValueError("$size expects an integer")
+            return operand
+        if operator == "$regex":
+            if not isinstance(operand, str):
+                raise ValueError("$regex expects a string")
+            return operand
+        return self._value(operand)
+
+    def _value(self, value: Any) -> Any:
+        if value is None or self.adapter is None:
+            return value
+        try:
+            return self.adapter.validate_python(value)
+        except ValidationError as e:
+            raise ValueError(f"Invalid value for {self.name}") from e
+
+
+class QueryValidator:
+    """
+    QueryValidator checks the filters and sort of the get all route against allowlists.
+
+    The allowlists are compiled once: each field is resolved to its stored key, and
+    to the type of its values, from the model. Filters on other fields, or with
+    other operators, are rejected before any query runs, and the values are
+    converted to the type of the field, e.g. ObjectId strings to ObjectIds and ISO
+    strings to datetimes, so they match the stored values and their index. Fields
+    can be given by name or by alias, and ``$and`` and ``$or`` combine the allowed
+    conditions.
+
+    :param model: The model of the documents.
+    :type model: type[BaseModel]
+    :param filterable_fields: The operators allowed by field, a literal value being
+        ``$eq``. ``None`` allows any filter.
+    :type filterable_fields: dict[str, Sequence[str]] | None
+    :param sortable_fields: The fields allowed in ``sort_by``. ``None`` allows any
+        field.
+    :type sortable_fields: Sequence[str] | None
+    :raises ValueError: If a field is not a field of the model, or an operator is
+        not supported.
+    """
+
+    def __init__(
+        self,
+        model: type[BaseModel],
+        filterable_fields: dict[str, Sequence[str]] | None = None,
+        sortable_fields: Sequence[str] | None = None,
+    ) -> None:
+        self.model = model
+        self.filterable: dict[str, _Field] | None = None
+        self.sortable: dict[str, str] | None = None
+        if filterable_fields is not None:
+            self.filterable = {}
+            for name, operators in filterable_fields.items():
+                unknown = set(operators) - FILTER_OPERATORS
+                if unknown:
+                    raise ValueError(
+                        f"Unsupported operator: {', '.join(sorted(unknown))}"
+                    )
+                key, annotation = self._resolve(name)
+                field = _Field(name, key, set(operators), annotation)
+                self.filterable[name] = self.filterable[key] = field
+        if sortable_fields is not None:
+            self.sortable = {}
+            for name in sortable_fields:
+                key, _ = self._resolve(name)
+                self.sortable[name] = self.sortable[key] = key
+
+    def _resolve(self, name: str) -> tuple[str, Any]:
+        """Return the stored key of a field, and its annotation."""
+        head, _, rest = name.partition(".")
+        for field_name, field_info in self.model.model_fields.items():
+            key = field_info.alias or field_name
+            if head in (field_name, key):
+                key = "_id" if key == "id" else key
+                if rest:
+                    # nested paths are not converted
+                    return f"{key}.{rest}", Any
+                return key, field_info.rebuild_annotation()
+        raise ValueError(f"{name} is not a field of {self.model.__name__}")
+
+    def validate_filters(self, filters: dict | None) -> dict | None:
+        """
+        Check a filter and convert its values to the types of the fields.
+
+        :param filters: The MongoDB filter document.
+        :type filters: dict | None
+        :raises ValueError: If a field, an operator or a value is not allowed.
+        :return: The filter, by stored key, with converted values.
+        :rtype: dict | None
+        """
+        if filters is None or self.filterable is None:
+            return filters
+        return self._validate(filters)
+
+    def _validate(self, filters: Any) -> dict:
+        if not isinstance(filters, dict):
+            raise ValueError("filters must be an object")
+        validated: dict[str, Any] = {}
+        for key, condition in filters.items():
+            if key in _LOGICAL:
+                if not isinstance(condition, list) or not condition:
+                    raise ValueError(f"{key} expects a non-empty array")
+                validated[key] = [self._validate(clause) for clause in condition]
+            elif key.startswith("$"):
+                raise ValueError(f"Operator {key} is not allowed")
+            else:
+                field = self.filterable.get(key)
+                if field is None:
+                    raise ValueError(f"{key} is not filterable")
+                validated[field.key] = field.convert(condition)
+        return validated
+
+    def validate_sort(self, sort_by: str | None) -> str | None:
+        """
+        Check a sort field.
+
+        :param sort_by: The field name or alias.
+        :type sort_by: str | None
+        :raises ValueError: If the field is not sortable.
+        :return: The stored key of the field.
+        :rtype: str | None
+        """
+        if sort_by is None or self.sortable is None:
+            return sort_by
+        key = self.sortable.get(sort_by)
+        if key is None:
+            raise ValueError(f"{sort_by} is not sortable")
+        return key
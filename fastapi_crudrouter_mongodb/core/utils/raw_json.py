@@ -0,0 +1,77 @@
+import json
+from datetime import datetime
+from typing import Any
+import bson
+from pydantic import BaseModel
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+
+
+def raw_projection(model: type[BaseModel]) -> dict[str, int]:
+    """
+    Return the projection of the stored fields serialized by a model.
+
+    :param model: The output model.
+    :type model: type[BaseModel]
+    :return: The projection, by stored field name.
+    :rtype: dict[str, int]
+    """
+    projection = {"_id": 0}
+    for name, field_info in model.model_fields.items():
+        key = field_info.alias or name
+        projection["_id" if key == "id" else key] = 1
+    return projection
+
+
+def to_plain(value: Any) -> Any:
+    """
+    Convert the ObjectIds and the ``_id`` keys of a decoded document, as the models
+    serialize them.
+
+    :param value: The decoded document, or one of its values.
+    :type value: Any
+    :return: The value, with string ObjectIds and ``id`` keys.
+    :rtype: Any
+    """
+    if isinstance(value, dict):
+        return {
+            "id" if key == "_id" else key: to_plain(item) for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+def transcode(document: bytes) -> bytes:
+    """
+    Transcode a BSON document to JSON, as the models serialize it.
+
+    The document is decoded by the C extension of bson and dumped by the json
+    module: ObjectIds become strings, ``_id`` becomes ``id``, datetimes and decimals
+    become ISO and decimal strings. Keys are kept as stored, that is the camelCase
+    aliases.
+
+    :param document: The BSON document, e.g. ``RawBSONDocument.raw``.
+    :type document: bytes
+    :raises ValueError: If the document holds a value the models do not serialize
+        like JSON does, like binary data, regular expressions or NaN.
+    :return: The JSON document.
+    :rtype: bytes
+    """
+    return json.dumps(
+        to_plain(bson.decode(document)),
+        default=_json_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal128):
+        return str(value)
+    raise ValueError(f"Unsupported BSON value: {type(value).__name__}")
@@ -0,0 +1,47 @@
+from typing import Any
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
+
+_MODES = {
+    "primary": Primary,
+    "primarypreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondarypreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def resolve_read_preference(
+    value: Any, max_staleness_seconds: int | None = None
+) -> Any | None:
+    """
+    Resolve a read preference given as a pymongo object or as a mode name.
+
+    Mode names are the ones of the connection string, e.g. ``secondaryPreferred``,
+    or the pymongo constant names, e.g. ``SECONDARY_PREFERRED``. Pymongo objects
+    are returned as is, with their own ``max_staleness``.
+
+    :param value: The read preference, or None.
+    :type value: str | ServerMode | None
+    :param max_staleness_seconds: The maximum replication lag of the secondaries read
+        from, applied to mode names other than ``primary``.
+    :type max_staleness_seconds: int | None
+    :raises ValueError: If the mode name is unknown.
+    :return: The pymongo read preference, or None.
+    :rtype: ServerMode | None
+    """
+    if value is None or not isinstance(value, str):
+        return value
+    mode = _MODES.get(value.replace("_", "").lower())
+    if mode is None:
+        raise ValueError(f"Unknown read preference: {value}")
+    if mode is Primary:
+        return Primary()
+    return mode(
+        max_staleness=max_staleness_seconds if max_staleness_seconds is not None else -1
+    )
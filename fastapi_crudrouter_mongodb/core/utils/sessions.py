@@ -0,0 +1,50 @@
+from contextvars import ContextVar
+from typing import Any
+from .tokens import decode_token, encode_token
+
+current_session: ContextVar[Any] = ContextVar("current_session", default=None)
+
+
+def session_kwargs() -> dict[str, Any]:
+    """
+    Return the ``session`` argument of the current request's operations.
+
+    :return: ``{"session": session}``, or an empty dict outside of a session.
+    :rtype: dict[str, Any]
+    """
+    session = current_session.get()
+    return {} if session is None else {"session": session}
+
+
+def encode_session_token(session) -> str | None:
+    """
+    Encode the causal consistency position reached by a session.
+
+    :param session: The client session.
+    :type session: AsyncIOMotorClientSession
+    :return: The token, or None if the session did not run any operation.
+    :rtype: str | None
+    """
+    if session.operation_time is None:
+        return None
+    return encode_token(
+        {"clusterTime": session.cluster_time, "operationTime": session.operation_time}
+    )
+
+
+def advance_session(session, token: str) -> None:
+    """
+    Make a session read after the position of a token built by ``encode_session_token``.
+
+    :param session: The client session.
+    :type session: AsyncIOMotorClientSession
+    :param token: The token sent by the client.
+    :type token: str
+    :raises ValueError: If the token is not valid.
+    """
+    position = decode_token(token)
+    try:
+        session.advance_cluster_time(position["clusterTime"])
+        session.advance_operation_time(position["operationTime"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError("Invalid causal consistency token") from e
@@ -0,0 +1,76 @@
+from typing import Any
+
+# the commands whose value is the name of their collection
+COLLECTION_COMMANDS = (
+    "find",
+    "aggregate",
+    "count",
+    "distinct",
+    "insert",
+    "update",
+    "delete",
+    "findAndModify",
+)
+
+
+def query_shape(value: Any) -> Any:
+    """
+    Return the shape of a filter, a sort or a pipeline, with its literals stripped.
+
+    Keys and operators are kept, every literal becomes ``"?"``, and the items of a
+    list of literals, like the values of ``$in``, are folded into a single ``"?"``.
+    Sort and projection directions are kept, they are part of the shape.
+
+    :param value: The filter, sort, projection or pipeline.
+    :type value: Any
+    :return: Its shape.
+    :rtype: Any
+    """
+    if isinstance(value, dict):
+        return {key: _shape_value(key, item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = [query_shape(item) for item in value]
+        if all(shape == "?" for shape in shapes):
+            return "?"
+        return shapes
+    return "?"
+
+
+def _shape_value(key: str, value: Any) -> Any:
+    if key in ("$sort", "$project") and isinstance(value, dict):
+        return dict(value)
+    return query_shape(value)
+
+
+def command_shape(command_name: str, command: dict) -> dict | None:
+    """
+    Return the shape of the query of a command, ``None`` for other commands.
+
+    :param command_name: The command name, e.g. ``find``.
+    :type command_name: str
+    :param command: The command document.
+    :type command: dict
+    :return: The shapes of its ``filter``, ``sort`` and ``projection``, or of its
+        ``pipeline``.
+    :rtype: dict | None
+    """
+    if command_name == "find":
+        shape = {"filter": query_shape(command.get("filter", {}))}
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+        if command.get("projection"):
+            shape["projection"] = dict(command["projection"])
+        return shape
+    if command_name == "aggregate":
+        return {"pipeline": query_shape(command.get("pipeline", []))}
+    if command_name in ("count", "distinct"):
+        return {"filter": query_shape(command.get("query", {}))}
+    if command_name == "findAndModify":
+        shape = {"filter": query_shape(command.get("query", {}))}
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+        return shape
+    if command_name in ("update", "delete"):
+        statements = command.get(f"{command_name}s", [])
+        return {"filter": query_shape(statements[0].get("q", {}))} if statements else {}
+    return None
@@ -0,0 +1,88 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator
+
+current_max_time_ms: ContextVar[int | None] = ContextVar(
+    "current_max_time_ms", default=None
+)
+
+
+def resolve_max_time_ms(value: Any, operation: str) -> int | None:
+    """
+    Return the time budget of an operation.
+
+    :param value: A budget, in milliseconds, for every operation, or the budgets by
+        operation, e.g. ``{"find_all": 2000, "default": 500}``.
+    :type value: int | dict[str, int] | None
+    :param operation: The operation, e.g. ``find_all``.
+    :type operation: str
+    :raises ValueError: If the budget is not a positive integer.
+    :return: The budget, in milliseconds.
+    :rtype: int | None
+    """
+    if isinstance(value, dict):
+        value = value.get(operation, value.get("default"))
+    if value is None:
+        return None
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ValueError("max_time_ms must be a positive integer")
+    return value
+
+
+def validate_max_time_ms(value: Any) -> Any:
+    """
+    Check every budget of a ``max_time_ms`` option, to fail when it is declared
+    rather than when its routes are registered.
+
+    :param value: A budget, in milliseconds, for every operation, or the budgets by
+        operation.
+    :type value: int | dict[str, int] | None
+    :raises ValueError: If a budget is not a positive integer.
+    :return: The option, unchanged.
+    :rtype: int | dict[str, int] | None
+    """
+    budgets = value.values() if isinstance(value, dict) else [value]
+    for budget in budgets:
+        resolve_max_time_ms(budget, "default")
+    return value
+
+
+def max_time_kwargs() -> dict[str, Any]:
+    """
+    Return the ``maxTimeMS`` argument of the current request's commands, that is
+    ``aggregate``, ``count_documents`` and ``find_one_and_*``.
+
+    :return: ``{"maxTimeMS": budget}``, or an empty dict without a budget.
+    :rtype: dict[str, Any]
+    """
+    max_time_ms = current_max_time_ms.get()
+    return {} if max_time_ms is None else {"maxTimeMS": max_time_ms}
+
+
+def cursor_max_time_kwargs() -> dict[str, Any]:
+    """
+    Return the ``max_time_ms`` argument of the current request's ``find`` and
+    ``find_one`` calls.
+
+    :return: ``{"max_time_ms": budget}``, or an empty dict without a budget.
+    :rtype: dict[str, Any]
+    """
+    max_time_ms = current_max_time_ms.get()
+    return {} if max_time_ms is None else {"max_time_ms": max_time_ms}
+
+
+@asynccontextmanager
+async def closing_cursor(cursor) -> AsyncIterator[Any]:
+    """
+    Kill a cursor on the server if its iteration fails or is cancelled.
+
+    :param cursor: The cursor.
+    :type cursor: AsyncIOMotorCursor | AsyncIOMotorCommandCursor
+    :return: The cursor.
+    :rtype: AsyncIterator[AsyncIOMotorCursor]
+    """
+    try:
+        yield cursor
+    except BaseException:
+        await cursor.close()
+        raise
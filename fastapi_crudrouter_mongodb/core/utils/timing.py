@@ -0,0 +1,124 @@
+import inspect
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Protocol
+
+
+class RequestTimings:
+    """
+    RequestTimings accumulates the time spent in each phase of a request.
+
+    Phases are exclusive: the time of a phase entered while another one runs is
+    only counted in the inner phase. ``finish`` adds the time spent outside of any
+    phase to ``encode``, that is the request parsing and the response validation
+    and encoding done by FastAPI.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        self.total: float | None = None
+        self._started = perf_counter()
+        # phase, start, time of its inner phases
+        self._stack: list[list[Any]] = []
+
+    def enter(self, phase: str) -> None:
+        self._stack.append([phase, perf_counter(), 0.0])
+
+    def exit(self) -> None:
+        phase, started, inner = self._stack.pop()
+        elapsed = perf_counter() - started
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed - inner
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def finish(self) -> None:
+        """Stop the timings of the request."""
+        self.total = perf_counter() - self._started
+        rest = max(0.0, self.total - sum(self.phases.values()))
+        self.phases["encode"] = self.phases.get("encode", 0.0) + rest
+
+    def as_milliseconds(self) -> dict[str, float]:
+        """
+        Return the duration of each phase, and the ``total``, in milliseconds.
+
+        :rtype: dict[str, float]
+        """
+        durations = {phase: seconds * 1000 for phase, seconds in self.phases.items()}
+        if self.total is not None:
+            durations["total"] = self.total * 1000
+        return durations
+
+    def header(self) -> str:
+        """
+        Return the timings as a ``Server-Timing`` header value.
+
+        :rtype: str
+        """
+        return ", ".join(
+            f"{phase};dur={duration:.3f}"
+            for phase, duration in self.as_milliseconds().items()
+        )
+
+
+class TimingHook(Protocol):
+    """
+    Receive the timings of each request, e.g. to forward them to a tracing stack.
+
+    It can be a function or a coroutine function.
+    """
+
+    def __call__(
+        self, request: Any, timings: dict[str, float]
+    ) -> Awaitable[None] | None: ...
+
+
+current_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "current_timings", default=None
+)
+
+
+class timed:
+    """
+    Time a phase of the current request, if it is timed.
+
+    Use it as a context manager, ``with timed("db"):``, or as a decorator of
+    functions and coroutine functions.
+
+    :param phase: The name of the phase.
+    :type phase: str
+    """
+
+    __slots__ = ("phase", "_timings")
+
+    def __init__(self, phase: str) -> None:
+        self.phase = phase
+        self._timings: RequestTimings | None = None
+
+    def __enter__(self) -> None:
+        self._timings = current_timings.get()
+        if self._timings is not None:
+            self._timings.enter(self.phase)
+
+    def __exit__(self, *args: Any) -> None:
+        if self._timings is not None:
+            self._timings.exit()
+            self._timings = None
+
+    def __call__(self, function: Callable) -> Callable:
+        phase = self.phase
+        if inspect.iscoroutinefunction(function):
+
+            @wraps(function)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with timed(phase):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timed(phase):
+                return function(*args, **kwargs)
+
+        return wrapper
@@ -0,0 +1,40 @@
+import base64
+import binascii
+from typing import Any
+from bson import json_util
+
+
+def encode_token(value: dict[str, Any]) -> str:
+    """
+    Encode a value into an opaque, URL safe token.
+
+    The value is serialized with Extended JSON, so ObjectIds, dates and timestamps
+    keep their BSON type when the token is decoded.
+
+    :param value: The value to encode.
+    :type value: dict[str, Any]
+    :return: The token.
+    :rtype: str
+    """
+    raw = json_util.dumps(value).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token: str) -> dict[str, Any]:
+    """
+    Decode a token built by ``encode_token``.
+
+    :param token: The token sent by the client.
+    :type token: str
+    :raises ValueError: If the token is not valid.
+    :return: The value.
+    :rtype: dict[str, Any]
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        value = json_util.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid token") from e
+    if not isinstance(value, dict):
+        raise ValueError("Invalid token")
+    return value
@@ -173,6 +173,23 @@ async def client(app):
         yield async_client
 
 
+@pytest_asyncio.fixture
+def router_client():
+    """Build a client of an app including the given routers."""
+
+    def build(*routers):
+        application = FastAPI()
+        for router in routers:
+            application.include_router(router)
+        return AsyncClient(
+            transport=ASGITransport(app=application),
+            base_url="http://test",
+            follow_redirects=True,
+        )
+
+    return build
+
+
 @pytest_asyncio.fixture
 async def app_with_embed(db):
     application = FastAPI()
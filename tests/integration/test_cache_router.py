@@ -0,0 +1,69 @@
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from fastapi_crudrouter_mongodb import (
+    CRUDEmbed,
+    CRUDRouter,
+    DocumentCache,
+    InMemoryInvalidationTransport,
+)
+from tests.conftest import ChildRef, TestItem
+
+
+def _worker(db, cache, embeds=None):
+    app = FastAPI()
+    app.include_router(
+        CRUDRouter(
+            model=TestItem,
+            db=db,
+            collection_name="items",
+            prefix="/items",
+            cache=cache,
+            embeds=embeds,
+        )
+    )
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_cached_get_one_invalidated_across_workers(db):
+    transport = InMemoryInvalidationTransport()
+    item_id = ObjectId()
+    await db["items"].insert_one({"_id": item_id, "name": "Before"})
+
+    async with (
+        _worker(db, DocumentCache(transport)) as worker_a,
+        _worker(db, DocumentCache(transport)) as worker_b,
+    ):
+        assert (await worker_a.get(f"/items/{item_id}")).json()["name"] == "Before"
+
+        # a write outside of the routers is not seen until the entry is evicted
+        await db["items"].update_one({"_id": item_id}, {"$set": {"name": "Direct"}})
+        assert (await worker_a.get(f"/items/{item_id}")).json()["name"] == "Before"
+
+        await worker_b.patch(f"/items/{item_id}", json={"name": "After"})
+        assert (await worker_a.get(f"/items/{item_id}")).json()["name"] == "After"
+
+        await worker_b.delete(f"/items/{item_id}")
+        assert (await worker_a.get(f"/items/{item_id}")).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_embed_writes_invalidate_the_parent(db):
+    item_id = ObjectId()
+    await db["items"].insert_one({"_id": item_id, "name": "Parent"})
+    cache = DocumentCache()
+
+    async with _worker(
+        db, cache, embeds=[CRUDEmbed(model=ChildRef, embed_name="children")]
+    ) as client:
+        await client.get(f"/items/{item_id}")
+        assert cache.get("items", item_id) is not None
+
+        response = await client.post(
+            f"/items/{item_id}/children", json={"name": "Child"}
+        )
+        assert response.status_code == 200
+        assert cache.get("items", item_id) is None
@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from fastapi import Header
+
+from fastapi_crudrouter_mongodb import CRUDEmbed, CRUDRouter
+from tests.conftest import Article, Tag, TestItem
+
+
+def _router(db, **kwargs):
+    # the writes are not held back, to read them right away
+    kwargs.setdefault("changes_window", 0)
+    return CRUDRouter(
+        model=TestItem,
+        db=db,
+        collection_name="items",
+        prefix="/items",
+        enable_changes=True,
+        **kwargs,
+    )
+
+
+async def _store_milliseconds(db):
+    # MongoDB stores dates to the millisecond, mongomock keeps the microseconds
+    async for document in db["items"].find({"updatedAt": {"$exists": True}}):
+        stamp = document["updatedAt"]
+        await db["items"].update_one(
+            {"_id": document["_id"]},
+            {
+                "$set": {
+                    "updatedAt": stamp.replace(
+                        microsecond=stamp.microsecond // 1000 * 1000
+                    )
+                }
+            },
+        )
+
+
+@pytest_asyncio.fixture
+async def changes_client(db, router_client):
+    async with router_client(
+        _router(
+            db, changes_field="updatedAt", tombstone_collection_name="items_deleted"
+        )
+    ) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_changes_since_token(changes_client, db):
+    first = (await changes_client.post("/items", json={"name": "First"})).json()
+    second = (await changes_client.post("/items", json={"name": "Second"})).json()
+    assert "updatedAt" in await db["items"].find_one({"name": "First"})
+
+    await _store_milliseconds(db)
+    response = await changes_client.get("/items/changes")
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["name"] for item in body["documents"]] == ["First", "Second"]
+    assert body["deleted"] == []
+    assert body["hasMore"] is False
+
+    # stamps are stored with a millisecond precision
+    await asyncio.sleep(0.01)
+    await changes_client.patch(f"/items/{first['id']}", json={"status": "done"})
+    await changes_client.delete(f"/items/{second['id']}")
+
+    await _store_milliseconds(db)
+    response = await changes_client.get(f"/items/changes?since={body['next']}")
+    body = response.json()
+    assert [item["id"] for item in body["documents"]] == [first["id"]]
+    assert body["documents"][0]["status"] == "done"
+    assert body["deleted"] == [second["id"]]
+
+    response = await changes_client.get(f"/items/changes?since={body['next']}")
+    assert response.json()["documents"] == []
+    assert response.json()["deleted"] == []
+    assert response.json()["next"] == body["next"]
+
+
+@pytest.mark.asyncio
+async def test_changes_from_object_id(db, router_client):
+    async with router_client(_router(db)) as client:
+        for name in ("A", "B", "C"):
+            await client.post("/items", json={"name": name})
+
+        response = await client.get("/items/changes?limit=2")
+        body = response.json()
+        assert [item["name"] for item in body["documents"]] == ["A", "B"]
+        assert body["hasMore"] is True
+
+        response = await client.get(f"/items/changes?limit=2&since={body['next']}")
+        assert [item["name"] for item in response.json()["documents"]] == ["C"]
+
+
+@pytest.mark.asyncio
+async def test_changes_invalid_token(changes_client):
+    response = await changes_client.get("/items/changes?since=not-a-token")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_changes_apply_the_filter_dependency(db, router_client):
+    def tenant_filter(tenant: str = Header()) -> dict:
+        return {"status": tenant}
+
+    router = _router(
+        db,
+        changes_field="updatedAt",
+        tombstone_collection_name="items_deleted",
+        filter_dependency=tenant_filter,
+    )
+    async with router_client(router) as client:
+        mine = await client.post("/items", json={"name": "Mine", "status": "a"})
+        theirs = await client.post("/items", json={"name": "Theirs", "status": "b"})
+        await client.delete(f"/items/{mine.json()['id']}")
+        await client.delete(f"/items/{theirs.json()['id']}")
+        await client.post("/items", json={"name": "Kept", "status": "a"})
+        await client.post("/items", json={"name": "Other", "status": "b"})
+
+        response = await client.get("/items/changes", headers={"tenant": "a"})
+
+    body = response.json()
+    assert [item["name"] for item in body["documents"]] == ["Kept"]
+    assert body["deleted"] == [mine.json()["id"]]
+
+
+@pytest.mark.asyncio
+async def test_changes_hold_back_recent_writes(db, router_client):
+    router = _router(db, changes_field="updatedAt", changes_window=60)
+    async with router_client(router) as client:
+        await client.post("/items", json={"name": "Recent"})
+        response = await client.get("/items/changes")
+
+    body = response.json()
+    assert body["documents"] == []
+    assert body["hasMore"] is False
+
+
+@pytest.mark.asyncio
+async def test_embedded_writes_are_changes(db, router_client):
+    router = CRUDRouter(
+        model=Article,
+        db=db,
+        collection_name="items",
+        prefix="/articles",
+        enable_changes=True,
+        changes_field="updatedAt",
+        changes_window=0,
+        embeds=[CRUDEmbed(model=Tag, embed_name="tags")],
+    )
+    async with router_client(router) as client:
+        article = (await client.post("/articles", json={"title": "T"})).json()
+        await _store_milliseconds(db)
+        token = (await client.get("/articles/changes")).json()["next"]
+
+        await asyncio.sleep(0.01)
+        response = await client.post(
+            f"/articles/{article['id']}/tags", json={"name": "news"}
+        )
+        assert response.status_code == 200
+        await _store_milliseconds(db)
+        response = await client.get(f"/articles/changes?since={token}")
+
+    assert [item["id"] for item in response.json()["documents"]] == [article["id"]]
+    assert response.json()["documents"][0]["tags"][0]["name"] == "news"
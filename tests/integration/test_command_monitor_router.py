@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from pymongo import monitoring
+
+from fastapi_crudrouter_mongodb import CommandMonitor, CRUDLookup, CRUDRouter
+from tests.conftest import ChildRef, ParentWithLookup, ParentWithLookupOut
+
+
+@pytest.mark.asyncio
+async def test_router_watches_its_collections(db):
+    monitor = CommandMonitor(slow_ms=10)
+    router = CRUDRouter(
+        model=ParentWithLookup,
+        db=db,
+        collection_name="parents",
+        prefix="/parents",
+        command_monitor=monitor,
+        lookups=[
+            CRUDLookup(
+                model=ChildRef,
+                model_out=ParentWithLookupOut,
+                collection_name="children",
+                prefix="children",
+                local_field="childIds",
+                foreign_field="_id",
+            )
+        ],
+    )
+    assert monitor.collections == {"parents", "children"}
+
+    # mongomock does not send commands, the driver events are replayed
+    address = ("localhost", 27017)
+    command = {"aggregate": "children", "pipeline": [{"$match": {"_id": 1}}]}
+    monitor.started(monitoring.CommandStartedEvent(command, "db", 1, address, 1))
+    monitor.succeeded(
+        monitoring.CommandSucceededEvent(
+            timedelta(milliseconds=25),
+            {"cursor": {"id": 0, "firstBatch": [{}]}, "ok": 1},
+            "aggregate",
+            1,
+            address,
+            1,
+        )
+    )
+
+    app = FastAPI()
+    app.include_router(router)
+    app.include_router(monitor.router())
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/debug/slow-commands")
+
+    assert response.status_code == 200
+    [record] = response.json()["slow_commands"]
+    assert record["collection"] == "children"
+    assert record["shape"] == {"pipeline": [{"$match": {"_id": "?"}}]}
+    assert record["documents"] == 1
+    assert record["duration_ms"] == 25
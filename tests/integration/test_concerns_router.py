@@ -0,0 +1,210 @@
+import pytest
+from bson import ObjectId
+from pymongo.read_concern import ReadConcern
+from pymongo.write_concern import WriteConcern
+
+from fastapi_crudrouter_mongodb import CRUDEmbed, CRUDLookup, CRUDRouter
+from fastapi_crudrouter_mongodb.core.utils import build_codec_options
+from fastapi_crudrouter_mongodb.core.utils.concerns import (
+    resolve_read_concern,
+    resolve_write_concern,
+)
+from tests.conftest import (
+    Article,
+    ChildRef,
+    ParentWithLookup,
+    ParentWithLookupOut,
+    Tag,
+    TestItem,
+)
+
+
+class OptionsCollection:
+    """Record the concerns of the calls, which mongomock does not support."""
+
+    def __init__(self, database, collection, options=None):
+        self._database = database
+        self._collection = collection
+        self._options = options or {}
+
+    def with_options(self, **options):
+        self._database.handles += 1
+        return OptionsCollection(
+            self._database, self._collection, {**self._options, **options}
+        )
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        def call(*args, **kwargs):
+            self._database.calls.append((name, self._collection.name, self._options))
+            return method(*args, **kwargs)
+
+        return call
+
+
+class OptionsDatabase:
+    def __init__(self, db, options=None, root=None):
+        self._db = db
+        self._options = options or {}
+        self._root = root or self
+        if root is None:
+            self.calls = []
+            self.handles = 0
+
+    def __getattr__(self, name):
+        return getattr(self._root, name)
+
+    def with_options(self, **options):
+        return OptionsDatabase(self._db, {**self._options, **options}, self._root)
+
+    def __getitem__(self, name):
+        return OptionsCollection(self._root, self._db[name], self._options)
+
+
+@pytest.mark.asyncio
+async def test_router_concerns_cached_handles(db, router_client):
+    database = OptionsDatabase(db)
+    router = CRUDRouter(
+        model=TestItem,
+        db=database,
+        collection_name="items",
+        prefix="/items",
+        write_concern={"w": 1, "j": False},
+        read_concern="majority",
+    )
+    async with router_client(router) as client:
+        for name in ("A", "B"):
+            created = await client.post("/items", json={"name": name})
+            await client.get(f"/items/{created.json()['id']}")
+
+    assert all(
+        options
+        == {
+            "write_concern": WriteConcern(w=1, j=False),
+            "read_concern": ReadConcern("majority"),
+        }
+        for _, _, options in database.calls
+    )
+    # the handle is built once, on the first call
+    assert database.handles == 1
+
+
+@pytest.mark.asyncio
+async def test_embed_concerns(db, router_client):
+    database = OptionsDatabase(db)
+    billing = WriteConcern(w="majority")
+    router = CRUDRouter(
+        model=Article,
+        db=database,
+        collection_name="articles",
+        prefix="/articles",
+        write_concern=billing,
+        read_concern="majority",
+        embeds=[CRUDEmbed(model=Tag, embed_name="tags", write_concern={"w": 0})],
+    )
+    async with router_client(router) as client:
+        created = await client.post("/articles", json={"title": "A"})
+        await client.post(f"/articles/{created.json()['id']}/tags", json={"name": "t"})
+
+    calls = [(name, options) for name, _, options in database.calls]
+    assert calls[0] == (
+        "insert_one",
+        {"write_concern": billing, "read_concern": ReadConcern("majority")},
+    )
+    # embed routes override the write concern and inherit the read concern
+    assert calls[-1] == (
+        "update_one",
+        {"write_concern": WriteConcern(w=0), "read_concern": ReadConcern("majority")},
+    )
+
+
+@pytest.mark.asyncio
+async def test_lookup_concerns(db, router_client):
+    database = OptionsDatabase(db)
+    router = CRUDRouter(
+        model=ParentWithLookup,
+        db=database,
+        collection_name="parents",
+        prefix="/parents",
+        lookups=[
+            CRUDLookup(
+                model=ChildRef,
+                model_out=ParentWithLookupOut,
+                collection_name="children",
+                prefix="children",
+                local_field="childIds",
+                foreign_field="_id",
+                read_concern=ReadConcern("local"),
+            )
+        ],
+    )
+    child_id = ObjectId()
+    await db["children"].insert_one({"_id": child_id, "name": "C"})
+    async with router_client(router) as client:
+        created = await client.post(
+            "/parents", json={"name": "P", "childIds": [str(child_id)]}
+        )
+        response = await client.get(f"/parents/{created.json()['id']}/children")
+    assert response.json()["children"][0]["name"] == "C"
+
+    calls = [
+        (name, collection, options) for name, collection, options in database.calls
+    ]
+    # the parent router keeps the concerns of the database
+    assert calls[0] == ("insert_one", "parents", {})
+    assert ("find_one", "parents", {"read_concern": ReadConcern("local")}) in calls
+    assert ("find", "children", {"read_concern": ReadConcern("local")}) in calls
+
+
+def test_invalid_concerns(db):
+    with pytest.raises(ValueError):
+        CRUDRouter(
+            model=TestItem, db=db, collection_name="items", write_concern={"x": 1}
+        )
+    with pytest.raises(ValueError):
+        CRUDRouter(model=TestItem, db=db, collection_name="items", read_concern=1)
+    with pytest.raises(ValueError):
+        CRUDEmbed(model=Tag, embed_name="tags", write_concern={"x": 1})
+    with pytest.raises(ValueError):
+        CRUDLookup(
+            model=ChildRef,
+            model_out=ParentWithLookupOut,
+            collection_name="children",
+            prefix="children",
+            local_field="childIds",
+            foreign_field="_id",
+            read_concern=1,
+        )
+
+
+def test_resolve_concerns():
+    concern = WriteConcern(w="majority")
+    assert resolve_write_concern(concern) is concern
+    assert resolve_write_concern({"w": "majority", "wtimeout": 100}) == WriteConcern(
+        w="majority", wtimeout=100
+    )
+    assert resolve_write_concern(None) is None
+    assert resolve_read_concern("snapshot") == ReadConcern("snapshot")
+    assert resolve_read_concern(None) is None
+
+
+@pytest.mark.asyncio
+async def test_codec_options_shared_by_embeds(db, router_client):
+    database = OptionsDatabase(db)
+    codec_options = build_codec_options()
+    router = CRUDRouter(
+        model=Article,
+        db=database,
+        collection_name="articles",
+        prefix="/articles",
+        codec_options=codec_options,
+        embeds=[CRUDEmbed(model=Tag, embed_name="tags")],
+    )
+    async with router_client(router) as client:
+        created = await client.post("/articles", json={"title": "A"})
+        await client.post(f"/articles/{created.json()['id']}/tags", json={"name": "t"})
+
+    assert [options for _, _, options in database.calls] == [
+        {"codec_options": codec_options}
+    ] * len(database.calls)
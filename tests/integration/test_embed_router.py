@@ -1,10 +1,12 @@
 import pytest
 import pytest_asyncio
+from bson import ObjectId
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
 from mongomock_motor import AsyncMongoMockClient
 
 from fastapi_crudrouter_mongodb import CRUDEmbed, CRUDRouter, MongoModel
+from tests.conftest import Article, Tag
 
 
 @pytest.mark.asyncio
@@ -160,3 +162,203 @@ async def test_embed_custom_identifier_crud(track_client):
     after_delete = await track_client.get("/tracks/FR7O52600080/files")
     assert after_delete.status_code == 200
     assert after_delete.json() == []
+
+
+@pytest.mark.asyncio
+async def test_embed_get_all_skip_and_limit(embed_client):
+    created_article = await embed_client.post("/articles", json={"title": "Slice"})
+    article_id = created_article.json()["id"]
+    for i in range(5):
+        await embed_client.post(f"/articles/{article_id}/tags", json={"name": f"t{i}"})
+
+    response = await embed_client.get(
+        f"/articles/{article_id}/tags", params={"skip": 1, "limit": 2}
+    )
+    assert response.status_code == 200
+    assert [tag["name"] for tag in response.json()] == ["t1", "t2"]
+
+    response = await embed_client.get(
+        f"/articles/{article_id}/tags", params={"skip": 3}
+    )
+    assert [tag["name"] for tag in response.json()] == ["t3", "t4"]
+
+
+@pytest.mark.asyncio
+async def test_embed_get_all_filters_with_limit(embed_client):
+    created_article = await embed_client.post("/articles", json={"title": "Filter"})
+    article_id = created_article.json()["id"]
+    for name in ["keep", "drop", "keep", "keep"]:
+        await embed_client.post(f"/articles/{article_id}/tags", json={"name": name})
+
+    response = await embed_client.get(
+        f"/articles/{article_id}/tags",
+        params={"filters": '{"name": {"$in": ["keep"]}}', "skip": 1, "limit": 5},
+    )
+    assert response.status_code == 200
+    assert [tag["name"] for tag in response.json()] == ["keep", "keep"]
+
+
+@pytest.mark.parametrize("slice_threshold", [None, 3, 100])
+@pytest.mark.asyncio
+async def test_embed_get_all_slice_threshold(slice_threshold):
+    db = AsyncMongoMockClient()["testdb"]
+    app = FastAPI()
+    app.include_router(
+        CRUDRouter(
+            model=Article,
+            db=db,
+            collection_name="articles",
+            prefix="/articles",
+            embeds=[
+                CRUDEmbed(model=Tag, embed_name="tags", slice_threshold=slice_threshold)
+            ],
+        )
+    )
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as async_client:
+        created_article = await async_client.post("/articles", json={"title": "T"})
+        article_id = created_article.json()["id"]
+        for i in range(5):
+            await async_client.post(
+                f"/articles/{article_id}/tags", json={"name": f"t{i}"}
+            )
+
+        response = await async_client.get(
+            f"/articles/{article_id}/tags",
+            params={"filters": '{"name": {"$ne": "t0"}}', "limit": 2},
+        )
+
+    assert response.status_code == 200
+    assert [tag["name"] for tag in response.json()] == ["t1", "t2"]
+
+
+@pytest.mark.asyncio
+async def test_embed_get_one_only_matching_element(embed_client):
+    created_article = await embed_client.post("/articles", json={"title": "One"})
+    article_id = created_article.json()["id"]
+    tag_ids = []
+    for i in range(3):
+        created_tag = await embed_client.post(
+            f"/articles/{article_id}/tags", json={"name": f"t{i}"}
+        )
+        tag_ids.append(created_tag.json()["id"])
+
+    response = await embed_client.get(f"/articles/{article_id}/tags/{tag_ids[1]}")
+    assert response.status_code == 200
+    assert response.json() == {"id": tag_ids[1], "name": "t1"}
+
+    response = await embed_client.get(f"/articles/{article_id}/tags/{ObjectId()}")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_embed_delete_one_not_found(embed_client):
+    created_article = await embed_client.post("/articles", json={"title": "None"})
+    article_id = created_article.json()["id"]
+
+    response = await embed_client.delete(f"/articles/{article_id}/tags/{ObjectId()}")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_embed_create_many(embed_client):
+    created_article = await embed_client.post("/articles", json={"title": "Bulk"})
+    article_id = created_article.json()["id"]
+
+    response = await embed_client.post(
+        f"/articles/{article_id}/tags/bulk",
+        json=[{"name": "b"}, {"name": "a"}, {"name": "c"}],
+        params={"sort_by": "name", "slice": 2},
+    )
+    assert response.status_code == 200
+    assert [tag["name"] for tag in response.json()] == ["b", "a", "c"]
+    assert all(tag["id"] for tag in response.json())
+
+    all_tags = await embed_client.get(f"/articles/{article_id}/tags")
+    assert [tag["name"] for tag in all_tags.json()] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_embed_create_many_parent_not_found(embed_client):
+    response = await embed_client.post(
+        f"/articles/{ObjectId()}/tags/bulk", json=[{"name": "a"}]
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_embed_delete_many(embed_client):
+    created_article = await embed_client.post("/articles", json={"title": "Pull"})
+    article_id = created_article.json()["id"]
+    created = await embed_client.post(
+        f"/articles/{article_id}/tags/bulk",
+        json=[{"name": "a"}, {"name": "b"}, {"name": "c"}],
+    )
+    tag_ids = [tag["id"] for tag in created.json()]
+    missing_id = str(ObjectId())
+
+    response = await embed_client.delete(
+        f"/articles/{article_id}/tags",
+        params={"embed_id": [tag_ids[0], tag_ids[2], missing_id]},
+    )
+    assert response.status_code == 200
+    assert response.json() == [{"id": tag_ids[0]}, {"id": tag_ids[2]}]
+
+    remaining = await embed_client.get(f"/articles/{article_id}/tags")
+    assert [tag["id"] for tag in remaining.json()] == [tag_ids[1]]
+
+
+@pytest.mark.asyncio
+async def test_embed_update_one_only_set_fields(track_client):
+    await track_client.post("/tracks", json={"isrc": "FR0000000001", "title": "T"})
+    await track_client.post(
+        "/tracks/FR0000000001/files",
+        json={"file_type": "mp3", "url": "https://example.com/a.mp3"},
+    )
+
+    response = await track_client.patch(
+        "/tracks/FR0000000001/files/mp3", json={"url": "https://example.com/b.mp3"}
+    )
+    assert response.status_code == 200
+    assert response.json()["url"] == "https://example.com/b.mp3"
+    assert response.json()["fileType"] == "mp3"
+
+    response = await track_client.patch(
+        "/tracks/unknown/files/mp3", json={"url": "https://example.com/c.mp3"}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_embed_update_many(track_client):
+    await track_client.post("/tracks", json={"isrc": "FR0000000002", "title": "T"})
+    await track_client.post(
+        "/tracks/FR0000000002/files/bulk",
+        json=[
+            {"file_type": "mp3", "url": "https://example.com/a.mp3"},
+            {"file_type": "wav", "url": "https://example.com/a.wav"},
+            {"file_type": "flac", "url": "https://example.com/a.flac"},
+        ],
+    )
+
+    response = await track_client.patch(
+        "/tracks/FR0000000002/files",
+        params={"file_type": ["mp3", "flac"]},
+        json={"url": "https://cdn.example.com/moved"},
+    )
+    assert response.status_code == 204
+
+    files = (await track_client.get("/tracks/FR0000000002/files")).json()
+    assert {file["fileType"]: file["url"] for file in files} == {
+        "mp3": "https://cdn.example.com/moved",
+        "wav": "https://example.com/a.wav",
+        "flac": "https://cdn.example.com/moved",
+    }
+
+    response = await track_client.patch(
+        "/tracks/FR0000000002/files",
+        params={"file_type": ["ogg"]},
+        json={"url": "https://cdn.example.com/moved"},
+    )
+    assert response.status_code == 422
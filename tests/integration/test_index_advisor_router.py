@@ -0,0 +1,53 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from fastapi_crudrouter_mongodb import CRUDRouter, IndexAdvisor
+from tests.conftest import TestItem
+
+
+@pytest.mark.asyncio
+async def test_get_all_queries_are_recorded(db):
+    advisor = IndexAdvisor()
+    app = FastAPI()
+    app.include_router(
+        CRUDRouter(
+            model=TestItem,
+            db=db,
+            collection_name="items",
+            prefix="/items",
+            index_advisor=advisor,
+        )
+    )
+    app.include_router(advisor.router())
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        for status in ("active", "archived"):
+            response = await client.get(
+                "/items",
+                params={
+                    "filters": json.dumps({"status": status}),
+                    "sort_by": "value",
+                    "order_by": "DESC",
+                },
+            )
+            assert response.status_code == 200
+        await client.get("/items")
+        # mongomock can not explain, the error is reported with the shape
+        await advisor.analyze()
+        response = await client.get("/debug/index-advice")
+
+    assert response.status_code == 200
+    shapes = {
+        json.dumps(shape["shape"]): shape["count"]
+        for shape in response.json()["shapes"]
+    }
+    assert shapes == {
+        json.dumps({"filter": {"status": "?"}, "sort": {"value": -1}}): 2,
+        json.dumps({"filter": {}}): 1,
+    }
+    assert all(shape["error"] for shape in response.json()["shapes"])
+    assert response.json()["advice"] == []
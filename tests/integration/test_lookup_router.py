@@ -1,5 +1,11 @@
 import pytest
+import pytest_asyncio
 from bson import ObjectId
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from fastapi_crudrouter_mongodb import CRUDLookup, CRUDRouter, ObjectIdType
+from tests.conftest import ChildRef, ParentWithLookup, ParentWithLookupOut
 
 
 @pytest.mark.asyncio
@@ -66,3 +72,127 @@ async def test_lookup_pagination_sort(lookup_client, db):
     children = response.json()["children"]
     assert len(children) == 2
     assert [child["name"] for child in children] == ["Alpha", "Bravo"]
+
+
+class ParentWithFavorites(ParentWithLookup):
+    favorite_ids: list[ObjectIdType] = []
+
+
+@pytest_asyncio.fixture
+async def include_client(db):
+    app = FastAPI()
+    app.include_router(
+        CRUDRouter(
+            model=ParentWithFavorites,
+            db=db,
+            collection_name="parents",
+            prefix="/parents",
+            lookups=[
+                CRUDLookup(
+                    model=ChildRef,
+                    model_out=ParentWithLookupOut,
+                    collection_name="children",
+                    prefix="kids",
+                    local_field="childIds",
+                    foreign_field="_id",
+                ),
+                CRUDLookup(
+                    model=ChildRef,
+                    model_out=ParentWithLookupOut,
+                    collection_name="children",
+                    prefix="favorites",
+                    local_field="favoriteIds",
+                    foreign_field="_id",
+                    limit=1,
+                ),
+            ],
+        )
+    )
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as async_client:
+        yield async_client
+
+
+@pytest.mark.asyncio
+async def test_include_lookup_on_get_one(include_client, db):
+    child_a = ObjectId()
+    child_b = ObjectId()
+    parent_id = ObjectId()
+
+    await db["children"].insert_one({"_id": child_a, "name": "Child A"})
+    await db["children"].insert_one({"_id": child_b, "name": "Child B"})
+    await db["parents"].insert_one(
+        {
+            "_id": parent_id,
+            "name": "Parent",
+            "childIds": [child_a, child_b],
+            "favoriteIds": [child_b, child_a],
+        }
+    )
+
+    response = await include_client.get(
+        f"/parents/{parent_id}", params={"include": "kids,favorites"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "Parent"
+    assert [child["name"] for child in body["kids"]] == ["Child A", "Child B"]
+    # limited lookups are sorted on their foreign field
+    assert [child["id"] for child in body["favorites"]] == [str(child_a)]
+
+    response = await include_client.get(
+        f"/parents/{parent_id}", params={"include": "favorites"}
+    )
+    assert "kids" not in response.json()
+    assert "favorites" in response.json()
+
+    response = await include_client.get(f"/parents/{parent_id}")
+    assert "kids" not in response.json()
+    assert "favorites" not in response.json()
+
+
+@pytest.mark.asyncio
+async def test_include_lookup_openapi_schema(include_client):
+    schema = (await include_client.get("/openapi.json")).json()
+    properties = schema["components"]["schemas"]["ParentWithFavoritesWithIncludes"][
+        "properties"
+    ]
+    assert {"kids", "favorites"} <= set(properties)
+
+
+@pytest.mark.asyncio
+async def test_include_lookup_on_get_all(lookup_client, db):
+    child_a = ObjectId()
+    child_b = ObjectId()
+    await db["children"].insert_one({"_id": child_a, "name": "Child A"})
+    await db["children"].insert_one({"_id": child_b, "name": "Child B"})
+    await db["parents"].insert_one(
+        {"_id": ObjectId(), "name": "First", "childIds": [child_a]}
+    )
+    await db["parents"].insert_one(
+        {"_id": ObjectId(), "name": "Second", "childIds": [child_b]}
+    )
+
+    response = await lookup_client.get(
+        "/parents", params={"include": "children", "sort_by": "name"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [parent["name"] for parent in body] == ["First", "Second"]
+    assert [parent["children"][0]["name"] for parent in body] == [
+        "Child A",
+        "Child B",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_include_unknown_lookup(lookup_client, db):
+    parent_id = ObjectId()
+    await db["parents"].insert_one({"_id": parent_id, "name": "Parent"})
+
+    response = await lookup_client.get(
+        f"/parents/{parent_id}", params={"include": "unknown"}
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Unknown include: unknown"
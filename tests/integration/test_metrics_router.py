@@ -0,0 +1,127 @@
+import pytest
+from bson import ObjectId
+
+from fastapi_crudrouter_mongodb import (
+    CRUDEmbed,
+    CRUDLookup,
+    CRUDPopulate,
+    CRUDRouter,
+    DocumentCache,
+    MetricsRegistry,
+)
+from tests.conftest import (
+    Artist,
+    ChildRef,
+    ParentWithLookup,
+    ParentWithLookupOut,
+    Tag,
+    Article,
+    TestItem,
+    Track,
+)
+
+
+def _count(metrics, collection, operation, subrouter, code):
+    return metrics.requests.values.get((collection, operation, subrouter, code), 0)
+
+
+@pytest.mark.asyncio
+async def test_requests_and_cache_metrics(db, router_client):
+    metrics = MetricsRegistry()
+    router = CRUDRouter(
+        model=TestItem,
+        db=db,
+        collection_name="items",
+        prefix="/items",
+        cache=DocumentCache(),
+        metrics=metrics,
+    )
+    async with router_client(router, metrics.router()) as client:
+        created = await client.post("/items", json={"name": "A"})
+        item_id = created.json()["id"]
+        await client.post("/items", json={"name": "B"})
+        await client.get("/items")
+        await client.get(f"/items/{item_id}")
+        await client.get(f"/items/{item_id}")
+        await client.get(f"/items/{ObjectId()}")
+        await client.patch(f"/items/{item_id}", json={"value": "not a number"})
+        response = await client.get("/metrics")
+
+    assert _count(metrics, "items", "create_one", "none", 200) == 2
+    assert _count(metrics, "items", "find_all", "none", 200) == 1
+    assert _count(metrics, "items", "find_one", "none", 200) == 2
+    assert _count(metrics, "items", "find_one", "none", 400) == 1
+    assert _count(metrics, "items", "update_one", "none", 422) == 1
+    # the list returned two documents, each get one a single document
+    assert metrics.result_size.values[("items", "find_all", "none")][1:] == [2, 1]
+    assert metrics.result_size.values[("items", "find_one", "none")][1:] == [2, 2]
+    assert metrics.cache_requests.values == {("items", "miss"): 2, ("items", "hit"): 1}
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'crudrouter_requests_total{collection="items",operation="find_one",'
+        'subrouter="none",code="400"} 1'
+    ) in response.text
+    assert "Server-Timing" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_subrouter_labels(db, router_client):
+    metrics = MetricsRegistry()
+    parent_id, child_id, article_id = ObjectId(), ObjectId(), ObjectId()
+    await db["children"].insert_one({"_id": child_id, "name": "Child"})
+    await db["parents"].insert_one(
+        {"_id": parent_id, "name": "Parent", "childIds": [child_id]}
+    )
+    await db["articles"].insert_one(
+        {"_id": article_id, "title": "A", "tags": [{"_id": ObjectId(), "name": "t"}]}
+    )
+    await db["tracks"].insert_one({"_id": ObjectId(), "title": "T", "artistIds": []})
+    routers = [
+        CRUDRouter(
+            model=ParentWithLookup,
+            db=db,
+            collection_name="parents",
+            prefix="/parents",
+            metrics=metrics,
+            lookups=[
+                CRUDLookup(
+                    model=ChildRef,
+                    model_out=ParentWithLookupOut,
+                    collection_name="children",
+                    prefix="children",
+                    local_field="childIds",
+                    foreign_field="_id",
+                )
+            ],
+        ),
+        CRUDRouter(
+            model=Article,
+            db=db,
+            collection_name="articles",
+            prefix="/articles",
+            metrics=metrics,
+            embeds=[CRUDEmbed(model=Tag, embed_name="tags")],
+        ),
+        CRUDRouter(
+            model=Track,
+            db=db,
+            collection_name="tracks",
+            prefix="/tracks",
+            metrics=metrics,
+            populates=[
+                CRUDPopulate(field="artist_ids", collection="artists", model=Artist)
+            ],
+        ),
+    ]
+    async with router_client(*routers, metrics.router()) as client:
+        assert (await client.get(f"/parents/{parent_id}/children")).status_code == 200
+        assert (await client.get(f"/articles/{article_id}/tags")).status_code == 200
+        assert (await client.get("/tracks")).status_code == 200
+        assert (await client.post("/tracks", json={"title": "U"})).status_code == 200
+
+    assert _count(metrics, "children", "find_all", "lookup", 200) == 1
+    assert _count(metrics, "articles", "find_all", "embed", 200) == 1
+    assert _count(metrics, "tracks", "find_all", "populate", 200) == 1
+    assert _count(metrics, "tracks", "create_one", "none", 200) == 1
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from bson import ObjectId
+
+from fastapi_crudrouter_mongodb import CRUDRouter
+from tests.conftest import ParentWithLookup, TestItem
+
+
+@pytest.mark.asyncio
+async def test_allowlisted_filters_and_sort(db, router_client):
+    await db["items"].insert_many(
+        [
+            {"name": "A", "status": "active", "value": 2},
+            {"name": "B", "status": "active", "value": 1},
+            {"name": "C", "status": "archived", "value": 3},
+        ]
+    )
+    router = CRUDRouter(
+        model=TestItem,
+        db=db,
+        collection_name="items",
+        prefix="/items",
+        filterable_fields={"status": ["$eq", "$in"], "value": ["$gte"]},
+        sortable_fields=["value"],
+    )
+    async with router_client(router) as client:
+        response = await client.get(
+            "/items",
+            params={
+                "filters": json.dumps({"status": "active", "value": {"$gte": 1}}),
+                "sort_by": "value",
+            },
+        )
+        assert [item["name"] for item in response.json()] == ["B", "A"]
+
+        response = await client.get(
+            "/items", params={"filters": json.dumps({"name": {"$regex": ".*"}})}
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"] == "name is not filterable"
+
+        response = await client.get("/items", params={"sort_by": "name"})
+        assert response.status_code == 422
+
+        response = await client.get(
+            "/items", params={"filters": json.dumps({"value": "high"})}
+        )
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_object_id_strings_are_converted(db, router_client):
+    child_id = ObjectId()
+    await db["parents"].insert_many(
+        [
+            {"name": "With", "childIds": [child_id]},
+            {"name": "Without", "childIds": []},
+        ]
+    )
+    router = CRUDRouter(
+        model=ParentWithLookup,
+        db=db,
+        collection_name="parents",
+        prefix="/parents",
+        filterable_fields={"child_ids": ["$eq"]},
+    )
+    async with router_client(router) as client:
+        response = await client.get(
+            "/parents", params={"filters": json.dumps({"childIds": str(child_id)})}
+        )
+
+    assert [parent["name"] for parent in response.json()] == ["With"]
+
+
+def test_invalid_allowlist_fails_at_construction(db):
+    with pytest.raises(ValueError):
+        CRUDRouter(
+            model=TestItem,
+            db=db,
+            collection_name="items",
+            filterable_fields={"missing": ["$eq"]},
+        )
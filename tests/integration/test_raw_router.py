@@ -0,0 +1,109 @@
+import bson
+import pytest
+from bson.raw_bson import RawBSONDocument
+
+from fastapi_crudrouter_mongodb import CRUDRouter
+from tests.conftest import TestItem, TestItemOut
+
+
+class RawCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args):
+        return RawCursor(self._cursor.sort(*args))
+
+    def skip(self, skip):
+        return RawCursor(self._cursor.skip(skip))
+
+    def limit(self, limit):
+        return RawCursor(self._cursor.limit(limit))
+
+    async def __aiter__(self):
+        async for document in self._cursor:
+            yield RawBSONDocument(bson.encode(document))
+
+
+class RawCollection:
+    """Return RawBSONDocument, which mongomock does not support."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return RawCursor(self._collection.find(*args, **kwargs))
+
+    async def find_one(self, *args, **kwargs):
+        document = await self._collection.find_one(*args, **kwargs)
+        return RawBSONDocument(bson.encode(document)) if document else None
+
+
+class AsyncCollection:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    def with_options(self, codec_options=None):
+        assert codec_options.document_class is RawBSONDocument
+        return RawCollection(self._collection)
+
+
+class RawDatabase:
+    def __init__(self, db):
+        self._db = db
+
+    def __getitem__(self, name):
+        return AsyncCollection(self._db[name])
+
+
+def _router(db, **kwargs):
+    return CRUDRouter(
+        model=TestItem,
+        db=RawDatabase(db),
+        collection_name="items",
+        prefix="/items",
+        raw_reads=True,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_raw_reads(db, router_client):
+    async with router_client(_router(db)) as client:
+        created = await client.post("/items", json={"name": "A", "value": 2})
+        await client.post("/items", json={"name": "B"})
+        id = created.json()["id"]
+
+        response = await client.get(f"/items/{id}")
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"id": id, "name": "A", "value": 2}
+
+        response = await client.get("/items", params={"sort_by": "name", "limit": 1})
+        assert response.json() == [{"id": id, "name": "A", "value": 2}]
+
+        response = await client.get("/items/000000000000000000000000")
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_raw_reads_project_model_out(db, router_client):
+    await db["items"].insert_one({"name": "A", "status": "on", "value": 1})
+    async with router_client(_router(db, model_out=TestItemOut)) as client:
+        response = await client.get("/items")
+    assert response.json() == [{"name": "A", "status": "on"}]
+
+
+@pytest.mark.asyncio
+async def test_raw_reads_fall_back_on_unsupported_types(db, router_client):
+    result = await db["items"].insert_one({"name": "A", "status": b"on"})
+    async with router_client(_router(db)) as client:
+        response = await client.get(f"/items/{result.inserted_id}")
+    # binary data has no JSON transcoding, the document is serialized by the model
+    assert response.json() == {
+        "id": str(result.inserted_id),
+        "name": "A",
+        "status": "on",
+        "value": None,
+    }
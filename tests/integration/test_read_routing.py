@@ -0,0 +1,133 @@
+import pytest
+from bson import Timestamp
+from pymongo import ReadPreference
+
+from fastapi_crudrouter_mongodb import CRUDRouter
+from fastapi_crudrouter_mongodb.core.utils.sessions import encode_session_token
+from tests.conftest import TestItem
+
+
+class FakeSession:
+    def __init__(self):
+        self.cluster_time = None
+        self.operation_time = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def advance_cluster_time(self, cluster_time):
+        self.cluster_time = cluster_time
+
+    def advance_operation_time(self, operation_time):
+        self.operation_time = operation_time
+
+
+class RecordingCollection:
+    """Record the read preferences and sessions, which mongomock does not support."""
+
+    def __init__(self, database, collection, read_preference=None):
+        self._database = database
+        self._collection = collection
+        self._read_preference = read_preference
+
+    def with_options(self, read_preference=None):
+        return RecordingCollection(self._database, self._collection, read_preference)
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        def call(*args, session=None, **kwargs):
+            self._database.calls.append((name, self._read_preference, session))
+            if session is not None and session.operation_time is None:
+                # the server reports the time of the operation to the session
+                session.cluster_time = {"clusterTime": Timestamp(1, 1)}
+                session.operation_time = Timestamp(1, 1)
+            return method(*args, **kwargs)
+
+        return call
+
+
+class RecordingDatabase:
+    def __init__(self, db):
+        self._db = db
+        self.calls = []
+        self.sessions = []
+        self.client = self
+
+    def __getitem__(self, name):
+        return RecordingCollection(self, self._db[name])
+
+    async def start_session(self, causal_consistency=False):
+        assert causal_consistency is True
+        session = FakeSession()
+        self.sessions.append(session)
+        return session
+
+
+def _router(db, **kwargs):
+    return CRUDRouter(
+        model=TestItem, db=db, collection_name="items", prefix="/items", **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_read_preferences_per_route(db, router_client):
+    database = RecordingDatabase(db)
+    async with router_client(
+        _router(
+            database,
+            read_preference_get_all="secondaryPreferred",
+            read_preference_get_one=ReadPreference.NEAREST,
+            read_max_staleness_seconds=120,
+        )
+    ) as client:
+        created = await client.post("/items", json={"name": "A"})
+        await client.get("/items")
+        await client.get(f"/items/{created.json()['id']}")
+
+    preferences = {name: preference for name, preference, _ in database.calls}
+    assert preferences["insert_one"] is None
+    assert preferences["find"].mongos_mode == "secondaryPreferred"
+    assert preferences["find"].max_staleness == 120
+    assert preferences["find_one"] == ReadPreference.NEAREST
+
+
+def test_unknown_read_preference(db):
+    with pytest.raises(ValueError):
+        CRUDRouter(
+            model=TestItem,
+            db=db,
+            collection_name="items",
+            read_preference_get_all="fastest",
+        )
+
+
+@pytest.mark.asyncio
+async def test_causal_consistency_token(db, router_client):
+    database = RecordingDatabase(db)
+    async with router_client(_router(database, causal_consistency=True)) as client:
+        created = await client.post("/items", json={"name": "A"})
+        token = created.headers["X-Causal-Token"]
+
+        response = await client.get(
+            f"/items/{created.json()['id']}", headers={"X-Causal-Token": token}
+        )
+        assert response.status_code == 200
+        assert database.sessions[1].operation_time == Timestamp(1, 1)
+        assert all(session is not None for _, _, session in database.calls)
+
+        response = await client.delete(
+            f"/items/{created.json()['id']}", headers={"X-Causal-Token": token}
+        )
+        assert response.status_code == 204
+        assert "X-Causal-Token" in response.headers
+
+        response = await client.get("/items", headers={"X-Causal-Token": "invalid"})
+        assert response.status_code == 422
+
+
+def test_encode_session_token_without_operation():
+    assert encode_session_token(FakeSession()) is None
@@ -1,8 +1,9 @@
+import asyncio
 import json
 
 import pytest
 from bson import ObjectId
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, HTTPException
 from httpx import ASGITransport, AsyncClient
 
 from fastapi_crudrouter_mongodb import CRUDRouter
@@ -260,3 +261,265 @@ async def test_filter_dependency(client, db):
     assert response.status_code == 200
     assert len(response.json()) == 1
     assert response.json()[0]["status"] == "active"
+
+
+@pytest.mark.asyncio
+async def test_update_one_only_set_fields(client, db):
+    created = await client.post(
+        "/items", json={"name": "Keep", "status": "active", "value": 1}
+    )
+    item_id = created.json()["id"]
+
+    response = await client.patch(f"/items/{item_id}", json={"status": "inactive"})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Keep"
+    assert response.json()["status"] == "inactive"
+
+    stored = await db["items"].find_one({"_id": ObjectId(item_id)})
+    assert stored == {
+        "_id": ObjectId(item_id),
+        "name": "Keep",
+        "status": "inactive",
+        "value": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_update_one_empty_body(client):
+    created = await client.post("/items", json={"name": "Same"})
+    item_id = created.json()["id"]
+
+    response = await client.patch(f"/items/{item_id}", json={})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Same"
+
+
+@pytest.mark.asyncio
+async def test_update_one_prefer_minimal(client, db):
+    created = await client.post("/items", json={"name": "Lean"})
+    item_id = created.json()["id"]
+
+    response = await client.patch(
+        f"/items/{item_id}",
+        json={"status": "inactive"},
+        headers={"Prefer": "return=minimal"},
+    )
+    assert response.status_code == 204
+    assert response.content == b""
+    assert response.headers["Preference-Applied"] == "return=minimal"
+    stored = await db["items"].find_one({"_id": ObjectId(item_id)})
+    assert stored["status"] == "inactive"
+
+    response = await client.patch(
+        f"/items/{ObjectId()}",
+        json={"status": "inactive"},
+        headers={"Prefer": "return=minimal"},
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_replace_one_return_minimal_default(db):
+    app = FastAPI()
+    app.include_router(
+        CRUDRouter(
+            model=TestItem,
+            db=db,
+            collection_name="items",
+            prefix="/items",
+            return_minimal=True,
+        )
+    )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        created = await client.post("/items", json={"name": "Before"})
+        item_id = created.json()["id"]
+
+        response = await client.put(
+            f"/items/{item_id}", json={"id": item_id, "name": "After"}
+        )
+        assert response.status_code == 204
+
+        response = await client.put(
+            f"/items/{item_id}",
+            json={"id": item_id, "name": "Again"},
+            headers={"Prefer": "return=representation"},
+        )
+        assert response.status_code == 200
+        assert response.json()["name"] == "Again"
+
+
+def _upsert_router(db, **kwargs):
+    return CRUDRouter(
+        model=TestItem,
+        db=db,
+        collection_name="items",
+        prefix="/items",
+        enable_upsert=True,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_replace_one_upsert(db, router_client):
+    async with router_client(_upsert_router(db)) as client:
+        item_id = str(ObjectId())
+
+        response = await client.put(
+            f"/items/{item_id}?upsert=true", json={"name": "Created"}
+        )
+        assert response.status_code == 201
+        assert response.json()["id"] == item_id
+        assert response.json()["name"] == "Created"
+
+        response = await client.put(
+            f"/items/{item_id}?upsert=true", json={"name": "Updated"}
+        )
+        assert response.status_code == 200
+        assert response.json()["name"] == "Updated"
+        assert await db["items"].count_documents({}) == 1
+
+        response = await client.put(
+            f"/items/{ObjectId()}?upsert=true",
+            json={"name": "Lean"},
+            headers={"Prefer": "return=minimal"},
+        )
+        assert response.status_code == 201
+        assert response.content == b""
+
+
+@pytest.mark.asyncio
+async def test_replace_one_upsert_is_guarded(db, client, router_client):
+    item_id = str(ObjectId())
+
+    # opt-in
+    response = await client.put(f"/items/{item_id}?upsert=true", json={"name": "A"})
+    assert response.status_code == 422
+
+    def forbidden():
+        raise HTTPException(status_code=403)
+
+    async with router_client(
+        _upsert_router(db, dependencies_create_one=[Depends(forbidden)])
+    ) as protected_client:
+        response = await protected_client.put(
+            f"/items/{item_id}?upsert=true", json={"name": "A"}
+        )
+        assert response.status_code == 403
+
+    assert await db["items"].count_documents({}) == 0
+    with pytest.raises(ValueError, match="enable_upsert requires the create route"):
+        _upsert_router(db, disable_create_one=True)
+
+
+@pytest.mark.asyncio
+async def test_replace_one_upsert_conflict(db, router_client):
+    existing = await db["items"].insert_one({"name": "Existing"})
+    router = _upsert_router(db, identifier_field="name")
+    async with router_client(router) as client:
+        response = await client.put(
+            "/items/New?upsert=true",
+            json={"id": str(existing.inserted_id), "name": "New"},
+        )
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Document not upserted"
+
+
+def _operators_router(db, **kwargs):
+    return CRUDRouter(
+        model=TestItem,
+        db=db,
+        collection_name="items",
+        prefix="/items",
+        enable_update_operators=True,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_update_operators(db, router_client):
+    async with router_client(_operators_router(db)) as client:
+        created = await client.post("/items", json={"name": "Counter", "value": 1})
+        item_id = created.json()["id"]
+
+        response = await client.patch(
+            f"/items/{item_id}/ops", json={"$inc": {"value": 2}}
+        )
+        assert response.status_code == 200
+        assert response.json()["value"] == 3
+
+        response = await client.patch(
+            f"/items/{item_id}/ops",
+            json={"$max": {"value": 10}},
+            headers={"Prefer": "return=minimal"},
+        )
+        assert response.status_code == 204
+        stored = await db["items"].find_one({"_id": ObjectId(item_id)})
+        assert stored["value"] == 10
+
+        response = await client.patch(
+            f"/items/{item_id}/ops", json={"$inc": {"name": 1}}
+        )
+        assert response.status_code == 422
+
+        response = await client.patch(
+            f"/items/{ObjectId()}/ops", json={"$inc": {"value": 1}}
+        )
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_update_operators_follow_the_update_route(db, client, router_client):
+    item_id = (
+        await db["items"].insert_one({"name": "Counter", "value": 1})
+    ).inserted_id
+
+    # opt-in
+    response = await client.patch(f"/items/{item_id}/ops", json={"$inc": {"value": 5}})
+    assert response.status_code == 404
+
+    async with router_client(
+        _operators_router(db, disable_update_one=True)
+    ) as disabled_client:
+        response = await disabled_client.patch(
+            f"/items/{item_id}/ops", json={"$inc": {"value": 5}}
+        )
+        assert response.status_code == 404
+
+    def forbidden():
+        raise HTTPException(status_code=403)
+
+    async with router_client(
+        _operators_router(db, dependencies_update_one=[Depends(forbidden)])
+    ) as protected_client:
+        response = await protected_client.patch(
+            f"/items/{item_id}/ops", json={"$inc": {"value": 5}}
+        )
+        assert response.status_code == 403
+
+    assert (await db["items"].find_one({"_id": item_id}))["value"] == 1
+
+
+@pytest.mark.asyncio
+async def test_create_one_batched(db):
+    app = FastAPI()
+    app.include_router(
+        CRUDRouter(
+            model=TestItem,
+            db=db,
+            collection_name="items",
+            prefix="/items",
+            batch_create_max_size=5,
+            batch_create_max_latency=0.01,
+        )
+    )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(
+            *[client.post("/items", json={"name": f"Batch {i}"}) for i in range(3)]
+        )
+
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert len({response.json()["id"] for response in responses}) == 3
+    assert await db["items"].count_documents({}) == 3
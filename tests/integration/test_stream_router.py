@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from fastapi_crudrouter_mongodb import CRUDRouter, EventSource
+from tests.conftest import TestItem, TestItemOut
+
+
+def _stream_router(db):
+    return CRUDRouter(
+        model=TestItem,
+        db=db,
+        collection_name="items",
+        prefix="/items",
+        model_out=TestItemOut,
+        event_source=EventSource(),
+    )
+
+
+async def _next(iterator):
+    return await asyncio.wait_for(anext(iterator), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_stream_events_filtered_and_converted(db):
+    router = _stream_router(db)
+    app = FastAPI()
+    app.include_router(router)
+    events = router._stream_events({"status": "active"})
+    first_event = asyncio.ensure_future(_next(events))
+    await asyncio.sleep(0.01)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        await client.post("/items", json={"name": "Hidden", "status": "inactive"})
+        await client.post("/items", json={"name": "Shown", "status": "active"})
+        created = await db["items"].find_one({"name": "Shown"})
+        await client.delete(f"/items/{created['_id']}")
+
+    event = await first_event
+    assert event.startswith("event: insert\ndata: ")
+    assert '"document": {"name": "Shown", "status": "active"}' in event
+    assert (await _next(events)).startswith('event: delete\ndata: {"id": ')
+    await events.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_route(db):
+    app = FastAPI()
+    app.include_router(_stream_router(db))
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get('/items/stream?filters={"$where": "true"}')
+        assert response.status_code == 422
+
+        schema = (await client.get("/openapi.json")).json()
+        assert "/items/stream" in schema["paths"]
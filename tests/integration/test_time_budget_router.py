@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import ExecutionTimeout
+
+from fastapi_crudrouter_mongodb import CRUDEmbed, CRUDLookup, CRUDRouter
+from fastapi_crudrouter_mongodb.core.routers.lookup import CRUDLookupRouterRepository
+from fastapi_crudrouter_mongodb.core.utils.time_budget import current_max_time_ms
+from tests.conftest import (
+    Article,
+    ChildRef,
+    ParentWithLookup,
+    ParentWithLookupOut,
+    Tag,
+    TestItem,
+)
+
+
+def _spy(monkeypatch, target, name, budgets):
+    original = getattr(target, name)
+
+    async def spy(*args, **kwargs):
+        budgets.append(current_max_time_ms.get())
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(target, name, spy)
+
+
+@pytest.mark.asyncio
+async def test_budgets_by_operation(db, monkeypatch, router_client):
+    result = await db["items"].insert_one({"name": "A"})
+    router = CRUDRouter(
+        model=TestItem,
+        db=db,
+        collection_name="items",
+        prefix="/items",
+        max_time_ms={"find_all": 2000, "default": 500},
+    )
+    budgets = []
+    _spy(monkeypatch, router.service, "find_all", budgets)
+    _spy(monkeypatch, router.service, "find_one", budgets)
+    _spy(monkeypatch, router.service, "update_one", budgets)
+    async with router_client(router) as client:
+        assert (await client.get("/items")).status_code == 200
+        response = await client.get(f"/items/{result.inserted_id}")
+        assert response.status_code == 200
+        response = await client.patch(
+            f"/items/{result.inserted_id}", json={"name": "B"}
+        )
+        assert response.json()["name"] == "B"
+
+    assert budgets == [2000, 500, 500]
+    assert current_max_time_ms.get() is None
+
+
+@pytest.mark.asyncio
+async def test_lookup_and_embed_budgets(db, monkeypatch, router_client):
+    child_id = ObjectId()
+    await db["children"].insert_one({"_id": child_id, "name": "Child"})
+    parent = await db["parents"].insert_one({"name": "P", "childIds": [child_id]})
+    tag_id = ObjectId()
+    article = await db["articles"].insert_one(
+        {"title": "T", "tags": [{"_id": tag_id, "name": "news"}]}
+    )
+    lookup_router = CRUDRouter(
+        model=ParentWithLookup,
+        db=db,
+        collection_name="parents",
+        prefix="/parents",
+        max_time_ms=500,
+        lookups=[
+            CRUDLookup(
+                model=ChildRef,
+                model_out=ParentWithLookupOut,
+                collection_name="children",
+                prefix="children",
+                local_field="childIds",
+                foreign_field="_id",
+                max_time_ms={"find_all": 3000},
+            )
+        ],
+    )
+    embed_router = CRUDRouter(
+        model=Article,
+        db=db,
+        collection_name="articles",
+        prefix="/articles",
+        max_time_ms=500,
+        embeds=[CRUDEmbed(model=Tag, embed_name="tags")],
+    )
+    budgets = []
+    _spy(monkeypatch, CRUDLookupRouterRepository, "get_all", budgets)
+    async with router_client(lookup_router) as client:
+        response = await client.get(f"/parents/{parent.inserted_id}/children")
+        assert response.status_code == 200
+        assert response.json()["children"][0]["name"] == "Child"
+    async with router_client(embed_router) as client:
+        response = await client.get(f"/articles/{article.inserted_id}/tags")
+        assert [tag["name"] for tag in response.json()] == ["news"]
+        response = await client.get(f"/articles/{article.inserted_id}/tags/{tag_id}")
+        assert response.json()["name"] == "news"
+        response = await client.patch(
+            f"/articles/{article.inserted_id}/tags/{tag_id}", json={"name": "sport"}
+        )
+        assert response.json()["name"] == "sport"
+
+    assert budgets == [3000]
+
+
+@pytest.mark.asyncio
+async def test_execution_timeout_is_a_504(db, monkeypatch, router_client):
+    router = CRUDRouter(
+        model=TestItem, db=db, collection_name="items", prefix="/items", max_time_ms=1
+    )
+
+    async def find_one(*args, **kwargs):
+        raise ExecutionTimeout("operation exceeded time limit", 50)
+
+    monkeypatch.setattr(router.service, "find_one", find_one)
+    async with router_client(router) as client:
+        response = await client.get(f"/items/{ObjectId()}")
+
+    assert response.status_code == 504
+    assert response.json()["detail"] == "The query exceeded its time budget"
+
+
+@pytest.mark.asyncio
+async def test_reads_are_cancelled_on_disconnect():
+    cancelled = asyncio.Event()
+
+    async def route():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    class DisconnectedRequest:
+        async def receive(self):
+            return {"type": "http.disconnect"}
+
+    response = await CRUDRouter._cancel_on_disconnect(DisconnectedRequest(), route())
+
+    assert response.status_code == 499
+    assert cancelled.is_set()
+
+
+def test_invalid_budget_fails_at_construction(db):
+    with pytest.raises(ValueError, match="max_time_ms must be a positive integer"):
+        CRUDRouter(model=TestItem, db=db, collection_name="items", max_time_ms=0)
+    with pytest.raises(ValueError, match="max_time_ms must be a positive integer"):
+        CRUDEmbed(model=Tag, embed_name="tags", max_time_ms={"find_all": -1})
+    with pytest.raises(ValueError, match="max_time_ms must be a positive integer"):
+        CRUDLookup(
+            model=ChildRef,
+            model_out=ParentWithLookupOut,
+            collection_name="children",
+            prefix="children",
+            local_field="childIds",
+            foreign_field="_id",
+            max_time_ms=1.5,
+        )
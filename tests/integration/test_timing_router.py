@@ -0,0 +1,67 @@
+import pytest
+
+from fastapi_crudrouter_mongodb import CRUDEmbed, CRUDRouter
+from tests.conftest import Article, Tag, TestItem
+
+
+def _phases(header: str) -> dict[str, float]:
+    phases = {}
+    for entry in header.split(", "):
+        name, duration = entry.split(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header(db, router_client):
+    router = CRUDRouter(
+        model=TestItem,
+        db=db,
+        collection_name="items",
+        prefix="/items",
+        server_timing=True,
+    )
+    async with router_client(router) as client:
+        created = await client.post("/items", json={"name": "A"})
+        response = await client.get(f"/items/{created.json()['id']}")
+
+    phases = _phases(response.headers["Server-Timing"])
+    assert {"db", "validate", "app", "encode", "total"} <= set(phases)
+    assert sum(
+        duration for name, duration in phases.items() if name != "total"
+    ) == pytest.approx(phases["total"], abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_timing_hook_without_header(db, router_client):
+    received = []
+
+    async def hook(request, timings):
+        received.append((request.url.path, timings))
+
+    router = CRUDRouter(
+        model=Article,
+        db=db,
+        collection_name="articles",
+        prefix="/articles",
+        timing_hook=hook,
+        embeds=[CRUDEmbed(model=Tag, embed_name="tags")],
+    )
+    async with router_client(router) as client:
+        created = await client.post("/articles", json={"title": "A"})
+        article_id = created.json()["id"]
+        response = await client.get(f"/articles/{article_id}/tags")
+
+    assert "Server-Timing" not in response.headers
+    assert [path for path, _ in received] == [
+        "/articles",
+        f"/articles/{article_id}/tags",
+    ]
+    assert "db" in received[0][1]
+    assert "total" in received[1][1]
+
+
+@pytest.mark.asyncio
+async def test_no_timing_by_default(client):
+    response = await client.get("/items")
+    assert "Server-Timing" not in response.headers
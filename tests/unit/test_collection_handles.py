@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import bson
+from pymongo import ReadPreference
+from pymongo.write_concern import WriteConcern
+
+from fastapi_crudrouter_mongodb.core.repositories import CollectionHandles
+from fastapi_crudrouter_mongodb.core.utils import build_codec_options
+
+
+class FakeCollection:
+    def __init__(self, name, options=None):
+        self.name = name
+        self.options = options or {}
+
+    def with_options(self, **options):
+        return FakeCollection(self.name, {**self.options, **options})
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.built = []
+
+    def __getitem__(self, name):
+        self.built.append(name)
+        return FakeCollection(name)
+
+
+def test_handles_are_built_once():
+    db = FakeDatabase()
+    codec_options = build_codec_options()
+    handles = CollectionHandles(
+        db,
+        codec_options=codec_options,
+        write_concern=WriteConcern(w=1),
+        read_preferences={"get_all": ReadPreference.SECONDARY},
+    )
+
+    write = handles["items"]
+    assert handles.get("items") is write
+    # reads without a read preference share the write handle
+    assert handles.get("items", "get_one") is write
+    assert write.options == {
+        "codec_options": codec_options,
+        "write_concern": WriteConcern(w=1),
+    }
+    get_all = handles.get("items", "get_all")
+    assert handles.get("items", "get_all") is get_all
+    assert get_all.options["read_preference"] == ReadPreference.SECONDARY
+    assert db.built == ["items", "items"]
+
+
+def test_handles_without_options_use_the_database():
+    db = FakeDatabase()
+    handles = CollectionHandles(db)
+    assert handles["items"].options == {}
+
+
+def test_build_codec_options():
+    codec_options = build_codec_options(type_codecs=[])
+    document = bson.decode(
+        bson.encode(
+            {"price": Decimal("9.99"), "at": datetime(2024, 1, 1)},
+            codec_options=codec_options,
+        ),
+        codec_options=codec_options,
+    )
+    assert document["price"] == Decimal("9.99")
+    assert document["at"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
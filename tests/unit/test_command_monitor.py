@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from bson import ObjectId
+from pymongo import monitoring
+
+from fastapi_crudrouter_mongodb import CommandMonitor, MetricsRegistry
+from fastapi_crudrouter_mongodb.core.utils.shapes import command_shape, query_shape
+
+ADDRESS = ("localhost", 27017)
+
+
+def _run(monitor, request_id, command, reply=None, duration_ms=1.0, failure=None):
+    command_name = next(iter(command))
+    monitor.started(
+        monitoring.CommandStartedEvent(command, "db", request_id, ADDRESS, request_id)
+    )
+    duration = timedelta(milliseconds=duration_ms)
+    if failure is not None:
+        monitor.failed(
+            monitoring.CommandFailedEvent(
+                duration, failure, command_name, request_id, ADDRESS, request_id
+            )
+        )
+    else:
+        monitor.succeeded(
+            monitoring.CommandSucceededEvent(
+                duration, reply, command_name, request_id, ADDRESS, request_id
+            )
+        )
+
+
+def test_query_shape():
+    assert query_shape(
+        {
+            "status": "active",
+            "value": {"$gte": 3, "$in": [1, 2, 3]},
+            "$or": [{"name": "a"}, {"_id": ObjectId()}],
+        }
+    ) == {
+        "status": "?",
+        "value": {"$gte": "?", "$in": "?"},
+        "$or": [{"name": "?"}, {"_id": "?"}],
+    }
+    assert query_shape([{"$match": {"a": 1}}, {"$sort": {"b": -1}}, {"$limit": 5}]) == [
+        {"$match": {"a": "?"}},
+        {"$sort": {"b": -1}},
+        {"$limit": "?"},
+    ]
+    assert command_shape(
+        "find", {"find": "items", "filter": {"a": 1}, "sort": {"b": 1}, "limit": 3}
+    ) == {"filter": {"a": "?"}, "sort": {"b": 1}}
+    assert command_shape(
+        "update", {"update": "items", "updates": [{"q": {"_id": 1}, "u": {"a": 2}}]}
+    ) == {"filter": {"_id": "?"}}
+    assert command_shape("insert", {"insert": "items", "documents": []}) is None
+
+
+def test_records_watched_collections():
+    metrics = MetricsRegistry()
+    monitor = CommandMonitor(slow_ms=50, capacity=2, metrics=metrics)
+    monitor.watch(["items"])
+
+    _run(
+        monitor,
+        1,
+        {"find": "items", "filter": {"status": "active"}},
+        {"cursor": {"id": 42, "firstBatch": [{}, {}]}, "ok": 1},
+        duration_ms=80,
+    )
+    _run(
+        monitor,
+        2,
+        {"getMore": 42, "collection": "items"},
+        {"cursor": {"id": 0, "nextBatch": [{}]}, "ok": 1},
+        duration_ms=60,
+    )
+    _run(monitor, 3, {"insert": "items", "documents": [{}]}, {"n": 1, "ok": 1})
+    _run(monitor, 4, {"find": "other", "filter": {}}, {"cursor": {"id": 0}})
+    _run(
+        monitor,
+        5,
+        {"findAndModify": "items", "query": {"_id": 1}},
+        duration_ms=200,
+        failure={"errmsg": "timeout"},
+    )
+
+    report = monitor.report()
+    assert set(report["stats"]) == {
+        "items.find",
+        "items.getMore",
+        "items.insert",
+        "items.findAndModify",
+    }
+    assert report["stats"]["items.find"]["documents"] == 2
+    assert report["stats"]["items.findAndModify"]["failures"] == 1
+    # the ring buffer kept the last two slow commands, the slowest first
+    assert [
+        (record["command"], record["shape"], record["failed"])
+        for record in report["slow_commands"]
+    ] == [
+        ("findAndModify", {"filter": {"_id": "?"}}, True),
+        ("getMore", {"filter": {"status": "?"}}, False),
+    ]
+    # the exhausted cursor is forgotten
+    assert monitor._cursors == {}
+    assert (
+        'crudrouter_command_duration_seconds_count{collection="items",command="find"} 1'
+        in metrics.render()
+    )
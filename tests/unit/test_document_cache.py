@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from fastapi_crudrouter_mongodb import (
+    ChangeStreamInvalidationTransport,
+    DocumentCache,
+    InMemoryInvalidationTransport,
+)
+
+
+def test_document_cache_lru():
+    cache = DocumentCache(max_size=2)
+    for id in (1, 2, 3):
+        cache.set("items", id, {"_id": id}, cache.generation)
+
+    assert cache.get("items", 1) is None
+    assert cache.get("items", 3) == {"_id": 3}
+
+
+def test_document_cache_ttl():
+    cache = DocumentCache(ttl=0)
+    cache.set("items", 1, {"_id": 1}, cache.generation)
+
+    assert cache.get("items", 1) is None
+
+
+def test_document_cache_skips_documents_invalidated_while_fetched():
+    cache = DocumentCache()
+    generation = cache.generation
+    cache.evict("items", 1)
+    cache.set("items", 1, {"_id": 1, "name": "stale"}, generation)
+
+    assert cache.get("items", 1) is None
+
+
+@pytest.mark.asyncio
+async def test_document_cache_invalidates_other_workers():
+    transport = InMemoryInvalidationTransport()
+    worker_a, worker_b = DocumentCache(transport), DocumentCache(transport)
+    for cache in (worker_a, worker_b):
+        cache.set("items", 1, {"_id": 1}, cache.generation)
+        cache.set("items", 2, {"_id": 2}, cache.generation)
+
+    await worker_a.invalidate("items", 1)
+
+    assert worker_b.get("items", 1) is None
+    assert worker_b.get("items", 2) == {"_id": 2}
+
+
+class FakeChangeStream:
+    def __init__(self, changes):
+        self.changes = changes
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.changes:
+            raise RuntimeError("stream closed")
+        return self.changes.pop(0)
+
+
+class FakeDatabase:
+    def __init__(self, changes):
+        self.changes = changes
+
+    def watch(self):
+        return FakeChangeStream(list(self.changes))
+
+
+@pytest.mark.asyncio
+async def test_change_stream_transport():
+    transport = ChangeStreamInvalidationTransport(
+        FakeDatabase(
+            [
+                {"operationType": "insert", "ns": {"coll": "items"}},
+                {
+                    "operationType": "update",
+                    "ns": {"coll": "items"},
+                    "documentKey": {"_id": 1},
+                },
+                {"operationType": "drop", "ns": {"coll": "tags"}},
+            ]
+        )
+    )
+    invalidations = []
+    transport.start(lambda collection, id: invalidations.append((collection, id)))
+    await asyncio.sleep(0.01)
+
+    # the stream failure invalidates everything
+    assert invalidations == [("items", 1), ("tags", None), (None, None)]
+    assert transport._task is None
+
+
+class BlockingChangeStream(FakeChangeStream):
+    def __init__(self, closed):
+        super().__init__([])
+        self.closed = closed
+
+    async def __anext__(self):
+        await self.closed.wait()
+        raise RuntimeError("stream closed")
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_cached_until_the_change_stream_is_open():
+    closed = asyncio.Event()
+    database = FakeDatabase([])
+    database.watch = lambda: BlockingChangeStream(closed)
+    cache = DocumentCache(ChangeStreamInvalidationTransport(database))
+    cache.set("items", 1, {"_id": 1}, cache.generation)
+    assert cache.get("items", 1) is None
+
+    await cache.start()
+    cache.set("items", 1, {"_id": 1}, cache.generation)
+    assert cache.get("items", 1) == {"_id": 1}
+
+    closed.set()
+    await asyncio.sleep(0.01)
+    assert not cache.transport.ready
+    cache.set("items", 1, {"_id": 1}, cache.generation)
+    assert cache.get("items", 1) is None
+    cache.transport.stop()
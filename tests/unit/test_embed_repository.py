@@ -0,0 +1,47 @@
+from bson import ObjectId
+
+from fastapi_crudrouter_mongodb.core.factories.CRUDEmbedRouterRepository import (
+    _array_filters_update,
+    _filter_expression,
+)
+from fastapi_crudrouter_mongodb.core.utils import partial_model
+from tests.conftest import Article, Tag
+
+TAG_ID = ObjectId()
+
+
+def test_filter_expression_equality():
+    assert _filter_expression({"name": "a"}, Tag) == {
+        "$and": [{"$eq": ["$$item.name", "a"]}]
+    }
+
+
+def test_filter_expression_nin():
+    assert _filter_expression({"name": {"$nin": ["a", "b"]}}, Tag) == {
+        "$and": [{"$not": [{"$in": ["$$item.name", ["a", "b"]]}]}]
+    }
+
+
+def test_filter_expression_falls_back_on_null():
+    # {"field": null} also matches missing fields in $match
+    assert _filter_expression({"name": None}, Tag) is None
+    assert _filter_expression({"name": {"$in": ["a", None]}}, Tag) is None
+
+
+def test_filter_expression_falls_back_on_array_fields():
+    # {"tags": value} matches array elements in $match
+    assert _filter_expression({"tags": "a"}, Article) is None
+    assert _filter_expression({"unknown": "a"}, Tag) is None
+
+
+def test_filter_expression_falls_back_on_unsupported_operators():
+    assert _filter_expression({"name": {"$regex": "^a"}}, Tag) is None
+    assert _filter_expression({"$or": [{"name": "a"}]}, Tag) is None
+
+
+def test_array_filters_update():
+    update, array_filters = _array_filters_update(
+        [str(TAG_ID)], "tags", partial_model(Tag)(name="renamed")
+    )
+    assert update == {"$set": {"tags.$[item].name": "renamed"}}
+    assert array_filters == [{"item._id": {"$in": [TAG_ID]}}]
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from fastapi_crudrouter_mongodb import ChangeStreamEventSource, EventSource
+
+
+async def _next(iterator):
+    return await asyncio.wait_for(anext(iterator), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_event_source_fans_out():
+    source = EventSource()
+    first, second = source.subscribe(), source.subscribe()
+    first_event = asyncio.ensure_future(_next(first))
+    second_event = asyncio.ensure_future(_next(second))
+    await asyncio.sleep(0.01)
+    assert source.subscriber_count == 2
+
+    source.publish({"operationType": "insert"})
+
+    assert (await first_event)["operationType"] == "insert"
+    assert (await second_event)["operationType"] == "insert"
+    await first.aclose()
+    await second.aclose()
+    assert source.subscriber_count == 0
+
+
+@pytest.mark.asyncio
+async def test_event_source_disconnects_slow_subscriber():
+    source = EventSource(max_queue_size=1)
+    subscriber = source.subscribe()
+    pending = asyncio.ensure_future(_next(subscriber))
+    await asyncio.sleep(0.01)
+    source.publish({"operationType": "insert"})
+    assert (await pending)["operationType"] == "insert"
+
+    source.publish({"operationType": "update"})
+    source.publish({"operationType": "delete"})
+
+    assert source.subscriber_count == 0
+    with pytest.raises(StopAsyncIteration):
+        await _next(subscriber)
+
+
+class FakeChangeStream:
+    def __init__(self, changes):
+        self.changes = changes
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.changes:
+            # a real change stream waits for the next change
+            await asyncio.Event().wait()
+        return self.changes.pop(0)
+
+
+class FakeCollection:
+    name = "items"
+
+    def __init__(self, changes):
+        self.changes = changes
+        self.watch_calls = 0
+
+    def watch(self, **kwargs):
+        self.watch_calls += 1
+        return FakeChangeStream(list(self.changes))
+
+
+@pytest.mark.asyncio
+async def test_change_stream_event_source_shares_one_cursor():
+    collection = FakeCollection(
+        [
+            {"operationType": "insert", "documentKey": {"_id": 1}, "fullDocument": {}},
+            {"operationType": "drop"},
+            {"operationType": "delete", "documentKey": {"_id": 1}},
+        ]
+    )
+    source = ChangeStreamEventSource(collection)
+    first, second = source.subscribe(), source.subscribe()
+    first_events = asyncio.ensure_future(_collect(first, 2))
+    second_events = asyncio.ensure_future(_collect(second, 2))
+
+    for events in (await first_events, await second_events):
+        assert [event["operationType"] for event in events] == ["insert", "delete"]
+    assert collection.watch_calls == 1
+    await first.aclose()
+    await second.aclose()
+    assert source._task is None
+
+
+async def _collect(iterator, count):
+    return [await _next(iterator) for _ in range(count)]
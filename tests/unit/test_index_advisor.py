@@ -0,0 +1,88 @@
+import pytest
+
+from fastapi_crudrouter_mongodb import IndexAdvisor
+from fastapi_crudrouter_mongodb.core.metrics import suggest_index
+
+
+class ExplainDatabase:
+    def __init__(self, plans):
+        self.plans = plans
+        self.commands = []
+
+    async def command(self, command):
+        self.commands.append(command)
+        return {"queryPlanner": self.plans[command["explain"]["filter"]["status"]]}
+
+
+class ExplainCollection:
+    def __init__(self, name, database):
+        self.name = name
+        self.database = database
+
+
+def test_suggest_index_in_esr_order():
+    shape = {
+        "filter": {
+            "value": {"$gte": "?"},
+            "status": "?",
+            "$and": [{"kind": {"$in": "?"}}, {"name": {"$regex": "?"}}],
+            "$or": [{"a": "?"}, {"b": "?"}],
+        },
+        "sort": {"createdAt": -1},
+    }
+    assert suggest_index(shape) == [
+        ("status", 1),
+        ("kind", 1),
+        ("createdAt", -1),
+        ("value", 1),
+        ("name", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_record_and_explain_top_shapes():
+    database = ExplainDatabase(
+        {
+            "active": {
+                "winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}},
+            },
+            "archived": {
+                "winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}},
+                "rejectedPlans": [{"stage": "COLLSCAN"}],
+            },
+        }
+    )
+    collection = ExplainCollection("items", database)
+    advisor = IndexAdvisor(top=2, interval=3600)
+    for _ in range(3):
+        advisor.record(collection, {"status": "active"}, {"value": 1}, None, 0.01)
+    advisor.record(collection, {"status": "archived"}, None, None, 0.002)
+    advisor.record(collection, {"value": {"$gt": 1}}, None, None, 0.001)
+
+    assert len(advisor.shapes) == 3
+    await advisor.analyze()
+
+    # the cheapest shape is not explained
+    assert len(database.commands) == 2
+    assert database.commands[0]["explain"] == {
+        "find": "items",
+        "filter": {"status": "active"},
+        "sort": {"value": 1},
+    }
+    report = advisor.report()
+    assert [shape["count"] for shape in report["shapes"]] == [3, 1]
+    [advice] = report["advice"]
+    assert advice["shape"] == {"filter": {"status": "?"}, "sort": {"value": 1}}
+    assert advice["collection_scan"] and advice["in_memory_sort"]
+    assert advice["suggested_index"] == [("status", 1), ("value", 1)]
+    assert report["analyzed_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_max_shapes():
+    advisor = IndexAdvisor(max_shapes=1)
+    collection = ExplainCollection("items", ExplainDatabase({}))
+    advisor.record(collection, {"a": 1}, None, None, 0.001)
+    advisor.record(collection, {"b": 1}, None, None, 0.001)
+    advisor.record(collection, {"a": 2}, None, None, 0.001)
+    assert [query.count for query in advisor.shapes.values()] == [2]
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from pymongo.errors import BulkWriteError
+
+from fastapi_crudrouter_mongodb import CRUDRepository, CRUDRouter
+from fastapi_crudrouter_mongodb.core.repositories import InsertBatcher
+from tests.conftest import TestItem
+
+
+class CountingCollection:
+    def __init__(self, collection):
+        self.collection = collection
+        self.batches = []
+
+    async def insert_many(self, documents, ordered=True):
+        self.batches.append(len(documents))
+        return await self.collection.insert_many(documents, ordered=ordered)
+
+
+@pytest.mark.asyncio
+async def test_insert_batcher_coalesces_by_size(db):
+    collection = CountingCollection(db["items"])
+    batcher = InsertBatcher(collection, max_size=2, max_latency=60)
+
+    ids = await asyncio.gather(
+        *[batcher.insert({"name": str(index)}) for index in range(4)]
+    )
+
+    assert collection.batches == [2, 2]
+    assert len(set(ids)) == 4
+    assert await db["items"].count_documents({}) == 4
+
+
+@pytest.mark.asyncio
+async def test_insert_batcher_flushes_after_latency(db):
+    collection = CountingCollection(db["items"])
+    batcher = InsertBatcher(collection, max_size=100, max_latency=0.01)
+
+    ids = await asyncio.gather(
+        *[batcher.insert({"name": str(index)}) for index in range(3)]
+    )
+
+    assert collection.batches == [3]
+    assert len(ids) == 3
+
+
+@pytest.mark.asyncio
+async def test_insert_batcher_reports_errors_per_document(db):
+    existing_id = ObjectId()
+    await db["items"].insert_one({"_id": existing_id, "name": "existing"})
+    batcher = InsertBatcher(db["items"], max_size=3, max_latency=60)
+
+    results = await asyncio.gather(
+        batcher.insert({"name": "first"}),
+        batcher.insert({"_id": existing_id, "name": "duplicate"}),
+        batcher.insert({"name": "last"}),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], ObjectId)
+    assert isinstance(results[1], BulkWriteError)
+    assert isinstance(results[2], ObjectId)
+    assert await db["items"].count_documents({}) == 3
+
+
+@pytest.mark.asyncio
+async def test_create_one_batched(db):
+    repository = CRUDRepository(
+        model=TestItem,
+        db=db,
+        collection_name="items",
+        prefix="/items",
+        batch_create_max_size=10,
+    )
+    existing = await repository.create_one(TestItem(name="existing"))
+
+    created = await asyncio.gather(
+        repository.create_one(TestItem(name="A")),
+        repository.create_one(TestItem(id=existing.id, name="duplicate")),
+    )
+
+    assert created[0].name == "A"
+    assert created[0].id is not None
+    assert created[1] is None
+
+
+@pytest.mark.asyncio
+async def test_insert_batcher_close_writes_pending_documents(db):
+    collection = CountingCollection(db["items"])
+    batcher = InsertBatcher(collection, max_size=100, max_latency=60)
+
+    insert = asyncio.ensure_future(batcher.insert({"name": "pending"}))
+    await asyncio.sleep(0)
+    await batcher.close()
+
+    assert collection.batches == [1]
+    assert insert.done()
+    assert not batcher._tasks
+
+
+def test_batched_router_closes_on_shutdown(db):
+    router = CRUDRouter(
+        model=TestItem,
+        db=db,
+        collection_name="items",
+        prefix="/items",
+        batch_create_max_size=10,
+    )
+    app = FastAPI()
+    app.include_router(router)
+
+    assert router.close in app.router.on_shutdown
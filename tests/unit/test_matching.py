@@ -0,0 +1,58 @@
+import pytest
+
+from fastapi_crudrouter_mongodb.core.utils.matching import (
+    matches,
+    prefix_filters,
+    validate_filters,
+)
+
+DOCUMENT = {
+    "name": "Item",
+    "status": "active",
+    "value": 5,
+    "tags": ["a", "b"],
+    "owner": {"name": "Ada"},
+}
+
+
+@pytest.mark.parametrize(
+    "filters, expected",
+    [
+        (None, True),
+        ({"status": "active"}, True),
+        ({"status": "inactive"}, False),
+        ({"tags": "a"}, True),
+        ({"owner.name": "Ada"}, True),
+        ({"value": {"$gte": 5, "$lt": 10}}, True),
+        ({"value": {"$gt": "5"}}, False),
+        ({"status": {"$in": ["active", "draft"]}}, True),
+        ({"status": {"$nin": ["active"]}}, False),
+        ({"missing": {"$exists": False}}, True),
+        ({"missing": None}, True),
+        ({"$or": [{"status": "draft"}, {"value": 5}]}, True),
+        ({"$and": [{"status": "active"}, {"value": {"$ne": 5}}]}, False),
+        ({"$nor": [{"status": "draft"}]}, True),
+    ],
+)
+def test_matches(filters, expected):
+    assert matches(DOCUMENT, filters) is expected
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [[], {"$where": "true"}, {"name": {"$regex": "^I"}}, {"$or": {"status": "a"}}],
+)
+def test_validate_filters_rejects(filters):
+    with pytest.raises(ValueError):
+        validate_filters(filters)
+
+
+def test_prefix_filters():
+    assert prefix_filters(
+        {"status": "a", "$or": [{"value": {"$gt": 1}}, {"tags": "x"}]}, "document"
+    ) == {
+        "document.status": "a",
+        "$or": [{"document.value": {"$gt": 1}}, {"document.tags": "x"}],
+    }
+    with pytest.raises(ValueError):
+        prefix_filters({"$expr": {"$gt": ["$a", "$b"]}}, "document")
@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from fastapi_crudrouter_mongodb import MetricsRegistry
+from fastapi_crudrouter_mongodb.core.metrics.MetricsRegistry import Histogram
+from fastapi_crudrouter_mongodb.core.metrics.labels import label_route, route_operation
+
+
+def test_render_counter_and_histogram():
+    metrics = MetricsRegistry(duration_buckets=(0.01, 0.1), size_buckets=(1, 10))
+    metrics.observe_request("items", "find_all", "none", 200, 0.05, 3)
+    metrics.observe_request("items", "find_all", "none", 200, 0.5, 30)
+    metrics.observe_request("items", "find_one", "none", 404, 0.001)
+    metrics.observe_cache("items", hit=True)
+
+    text = metrics.render()
+
+    assert "# TYPE crudrouter_requests_total counter" in text
+    assert (
+        'crudrouter_requests_total{collection="items",operation="find_all",'
+        'subrouter="none",code="200"} 2'
+    ) in text
+    assert "# TYPE crudrouter_request_duration_seconds histogram" in text
+    labels = 'collection="items",operation="find_all",subrouter="none"'
+    assert f'crudrouter_request_duration_seconds_bucket{{{labels},le="0.01"}} 0' in text
+    assert f'crudrouter_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+    assert f'crudrouter_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"crudrouter_request_duration_seconds_sum{{{labels}}} 0.55" in text
+    assert f"crudrouter_request_duration_seconds_count{{{labels}}} 2" in text
+    assert f'crudrouter_result_size_bucket{{{labels},le="10"}} 1' in text
+    # errors carry no result size
+    assert (
+        'crudrouter_result_size_count{collection="items",operation="find_one"'
+        not in text
+    )
+    assert 'crudrouter_cache_requests_total{collection="items",result="hit"} 1' in text
+    assert text.endswith("\n")
+
+
+def test_escape_label_values():
+    metrics = MetricsRegistry()
+    metrics.observe_cache('a"b\\c\nd', hit=False)
+    assert 'collection="a\\"b\\\\c\\nd",result="miss"' in metrics.render()
+
+
+def test_custom_metrics():
+    metrics = MetricsRegistry()
+    counter = metrics.counter("app_events_total", "Events.", ("kind",))
+    assert metrics.counter("app_events_total", "Events.", ("kind",)) is counter
+    counter.inc("created", amount=2)
+    assert 'app_events_total{kind="created"} 2' in metrics.render()
+
+    with pytest.raises(ValueError):
+        metrics.histogram("app_events_total", "Events.", ("kind",))
+
+
+def test_route_labels():
+    class Router:
+        def _get_all(self):
+            async def route():
+                pass
+
+            return route
+
+        def _update_operators(self):
+            async def route():
+                pass
+
+            return route
+
+    assert route_operation(Router()._get_all()) == "find_all"
+    assert route_operation(Router()._update_operators()) == "update_one_with_operators"
+
+    endpoint = Router()._get_all()
+    label_route(endpoint, "children", "lookup")
+    label_route(endpoint, "parents")
+    assert endpoint.__route_labels__ == ("children", "find_all", "lookup")
+
+
+def test_histogram_is_thread_safe():
+    histogram = Histogram("duration_seconds", "Duration.", ["collection"])
+
+    def observe(collection):
+        for _ in range(1000):
+            histogram.observe(collection, value=0.01)
+            histogram.samples()
+
+    threads = [
+        threading.Thread(target=observe, args=(f"items{index % 4}",))
+        for index in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(count for _, _, count in histogram.values.values()) == 8000
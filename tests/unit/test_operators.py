@@ -0,0 +1,60 @@
+import pytest
+from bson import ObjectId
+
+from fastapi_crudrouter_mongodb import MongoModel, ObjectIdType
+from fastapi_crudrouter_mongodb.core.utils import operator_update
+
+
+class Counter(MongoModel):
+    id: ObjectIdType | None = None
+    view_count: int = 0
+    score: float | None = None
+    tags: list[str] = []
+    owner_ids: list[ObjectIdType] = []
+
+
+def test_operator_update_numeric():
+    update = operator_update(
+        Counter, {"$inc": {"viewCount": 2}, "$max": {"score": "1.5"}}
+    )
+
+    assert update == {"$inc": {"viewCount": 2}, "$max": {"score": 1.5}}
+
+
+def test_operator_update_arrays():
+    owner_id = ObjectId()
+    update = operator_update(
+        Counter,
+        {
+            "$push": {"tags": {"$each": ["a", "b"], "$slice": -5}},
+            "$addToSet": {"owner_ids": str(owner_id)},
+        },
+    )
+
+    assert update == {
+        "$push": {"tags": {"$each": ["a", "b"], "$slice": -5}},
+        "$addToSet": {"ownerIds": owner_id},
+    }
+
+
+@pytest.mark.parametrize(
+    "operations",
+    [
+        {},
+        {"$set": {"tags": ["a"]}},
+        {"$inc": {"unknown": 1}},
+        {"$inc": {"id": 1}},
+        {"$inc": {"tags": 1}},
+        {"$inc": {"view_count": 1.5}},
+        {"$inc": {"view_count": True}},
+        {"$push": {"score": 1}},
+        {"$push": {"tags": {"$each": "a"}}},
+        {"$push": {"tags": {"$each": ["a"], "$position": 0}}},
+        {"$pull": {"tags": {"$each": ["a"]}}},
+        {"$addToSet": {"owner_ids": "not-an-id"}},
+        {"$inc": {"view_count": 1}, "$max": {"viewCount": 3}},
+    ],
+)
+def test_operator_update_rejects(operations):
+    with pytest.raises(ValueError):
+        operator_update(Counter, operations)
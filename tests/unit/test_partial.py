@@ -0,0 +1,40 @@
+from bson import ObjectId
+
+from fastapi_crudrouter_mongodb import MongoModel, ObjectIdType
+from fastapi_crudrouter_mongodb.core.utils import partial_model, set_paths
+from tests.conftest import TestItem
+
+
+class Address(MongoModel):
+    city: str | None = None
+    zip_code: str | None = None
+
+
+class Customer(MongoModel):
+    id: ObjectIdType | None = None
+    name: str
+    address: Address
+
+
+def test_partial_model_fields_are_optional():
+    partial = partial_model(TestItem)
+
+    assert partial(status="active").model_fields_set == {"status"}
+    assert partial_model(TestItem) is partial
+
+
+def test_set_paths_only_set_fields():
+    data = partial_model(TestItem)(status="active", value=None)
+
+    assert set_paths(data) == {"status": "active"}
+
+
+def test_set_paths_nested_models_and_id():
+    customer_id = ObjectId()
+    data = partial_model(Customer)(id=customer_id, address={"zip_code": "75001"})
+
+    assert set_paths(data) == {"_id": customer_id, "address.zipCode": "75001"}
+    assert set_paths(data, "customers.$.") == {
+        "customers.$._id": customer_id,
+        "customers.$.address.zipCode": "75001",
+    }
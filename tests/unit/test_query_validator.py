@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from fastapi_crudrouter_mongodb import MongoModel
+from fastapi_crudrouter_mongodb.core.utils.query_validator import QueryValidator
+from tests.conftest import ObjectIdType
+
+
+class Event(MongoModel):
+    id: ObjectIdType | None = None
+    name: str
+    owner_id: ObjectIdType
+    tag_ids: list[ObjectIdType] = []
+    created_at: datetime | None = None
+    score: int | None = None
+
+
+@pytest.fixture
+def validator():
+    return QueryValidator(
+        Event,
+        filterable_fields={
+            "id": ["$eq", "$in"],
+            "owner_id": ["$eq"],
+            "tag_ids": ["$all"],
+            "created_at": ["$gte", "$lt"],
+            "name": ["$eq", "$regex"],
+            "score": ["$exists"],
+        },
+        sortable_fields=["created_at", "score"],
+    )
+
+
+def test_converts_values_to_field_types(validator):
+    owner, tag = ObjectId(), ObjectId()
+    assert validator.validate_filters(
+        {
+            "ownerId": str(owner),
+            "tag_ids": {"$all": [str(tag)]},
+            "createdAt": {"$gte": "2024-01-01T00:00:00", "$lt": "2024-02-01"},
+            "$or": [{"id": {"$in": [str(owner)]}}, {"name": {"$regex": "^a"}}],
+        }
+    ) == {
+        "ownerId": owner,
+        "tagIds": {"$all": [tag]},
+        "createdAt": {"$gte": datetime(2024, 1, 1), "$lt": datetime(2024, 2, 1)},
+        "$or": [{"_id": {"$in": [owner]}}, {"name": {"$regex": "^a"}}],
+    }
+
+
+@pytest.mark.parametrize(
+    "filters, message",
+    [
+        ({"$where": "sleep(1000)"}, "Operator $where is not allowed"),
+        ({"unknown": 1}, "unknown is not filterable"),
+        ({"ownerId": {"$ne": str(ObjectId())}}, "Operator $ne is not allowed"),
+        ({"createdAt": "2024-01-01"}, "Operator $eq is not allowed"),
+        ({"ownerId": "not an id"}, "Invalid value for owner_id"),
+        ({"score": {"$exists": "yes"}}, "$exists expects a boolean"),
+        ({"$or": []}, "$or expects a non-empty array"),
+        ([], "filters must be an object"),
+    ],
+)
+def test_rejects_filters(validator, filters, message):
+    with pytest.raises(ValueError, match=message.replace("$", r"\$")):
+        validator.validate_filters(filters)
+
+
+def test_sort(validator):
+    assert validator.validate_sort("created_at") == "createdAt"
+    assert validator.validate_sort("score") == "score"
+    assert validator.validate_sort(None) is None
+    with pytest.raises(ValueError, match="name is not sortable"):
+        validator.validate_sort("name")
+
+
+def test_invalid_declarations():
+    with pytest.raises(ValueError, match="missing is not a field of Event"):
+        QueryValidator(Event, sortable_fields=["missing"])
+    with pytest.raises(ValueError, match=r"Unsupported operator: \$where"):
+        QueryValidator(Event, filterable_fields={"name": ["$where"]})
+    # no allowlist allows any filter
+    assert QueryValidator(Event, sortable_fields=[]).validate_filters(
+        {"$where": "x"}
+    ) == {"$where": "x"}
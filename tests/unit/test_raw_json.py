@@ -0,0 +1,71 @@
+import json
+from datetime import datetime
+
+import bson
+import pytest
+from bson import Decimal128, ObjectId
+
+from fastapi_crudrouter_mongodb.core.utils.raw_json import (
+    raw_projection,
+    to_plain,
+    transcode,
+)
+from tests.conftest import Article, TestItem, TestItemOut
+
+
+def test_transcode_matches_the_models():
+    article = Article(title='Héllo "quoted"\n', tags=[{"name": "a"}])
+    article.id = ObjectId()
+    article.tags[0].id = ObjectId()
+    document = article.to_mongo()
+
+    transcoded = json.loads(transcode(bson.encode(document)))
+    assert transcoded == json.loads(article.model_dump_json(by_alias=True))
+
+
+def test_transcode_scalars():
+    document = {
+        "int": 1,
+        "long": 2**40,
+        "double": 1.5,
+        "bool": False,
+        "none": None,
+        "at": datetime(2024, 1, 2, 3, 4, 5, 6000),
+        "decimal": Decimal128("1.10"),
+        "empty": [],
+    }
+    assert json.loads(transcode(bson.encode(document))) == {
+        "int": 1,
+        "long": 2**40,
+        "double": 1.5,
+        "bool": False,
+        "none": None,
+        "at": "2024-01-02T03:04:05.006000",
+        "decimal": "1.10",
+        "empty": [],
+    }
+
+
+def test_transcode_unsupported_type():
+    with pytest.raises(ValueError):
+        transcode(bson.encode({"data": b"\x00"}))
+    with pytest.raises(ValueError):
+        transcode(bson.encode({"nan": float("nan")}))
+
+
+def test_raw_projection():
+    assert raw_projection(TestItem) == {
+        "_id": 1,
+        "name": 1,
+        "status": 1,
+        "value": 1,
+    }
+    assert raw_projection(TestItemOut) == {"_id": 0, "name": 1, "status": 1}
+
+
+def test_to_plain():
+    id = ObjectId()
+    assert to_plain({"_id": id, "tags": [{"_id": id}]}) == {
+        "id": str(id),
+        "tags": [{"id": str(id)}],
+    }
@@ -1,8 +1,8 @@
 import pytest
 from bson import ObjectId
 
-from fastapi_crudrouter_mongodb import CRUDPopulate
-from tests.conftest import Artist, TestItem, Track
+from fastapi_crudrouter_mongodb import CRUDLookup, CRUDPopulate, CRUDRepository
+from tests.conftest import Artist, ChildRef, TestItem, Track
 
 
 @pytest.mark.asyncio
@@ -92,6 +92,48 @@ async def test_delete_one_not_found(repository):
     assert deleted is None
 
 
+@pytest.mark.asyncio
+async def test_minimal_writes_return_counts(repository):
+    created = await repository.create_one(TestItem(id=ObjectId(), name="Lean"))
+    item_id = str(created.id)
+
+    assert (
+        await repository.replace_one(
+            item_id, TestItem(id=created.id, name="Replaced"), minimal=True
+        )
+        == 1
+    )
+    assert (
+        await repository.update_one(item_id, TestItem(name="Updated"), minimal=True)
+        == 1
+    )
+    assert (
+        await repository.update_one(str(ObjectId()), TestItem(name="X"), minimal=True)
+        == 0
+    )
+    assert await repository.delete_one(item_id, minimal=True) == 1
+    assert await repository.delete_one(item_id, minimal=True) == 0
+
+
+@pytest.mark.asyncio
+async def test_upsert_one_custom_identifier(db):
+    repository = CRUDRepository(
+        model=TestItem, db=db, collection_name="items", identifier_field="name"
+    )
+
+    created, was_created = await repository.upsert_one("Upsert", TestItem(name="X"))
+    assert was_created is True
+    assert created.name == "Upsert"
+    assert created.id is not None
+
+    updated, was_created = await repository.upsert_one(
+        "Upsert", TestItem(name="Upsert", value=2)
+    )
+    assert was_created is False
+    assert updated.value == 2
+    assert await db["items"].count_documents({"name": "Upsert"}) == 1
+
+
 @pytest.mark.asyncio
 async def test_find_all_skip(populated_repository):
     result = await populated_repository.find_all(skip=2)
@@ -167,3 +209,31 @@ async def test_resolve_populate_batch(repository, db):
     assert populated
     assert populated[0].artist_ids
     assert populated[0].artist_ids[0].name == "Artist A"
+
+
+@pytest.mark.asyncio
+async def test_find_all_with_lookups_limit(repository, db):
+    child_ids = [ObjectId() for _ in range(3)]
+    for child_id in child_ids:
+        await db["children"].insert_one({"_id": child_id, "name": "Child"})
+    await db["items"].insert_one(
+        {"_id": ObjectId(), "name": "Parent", "childIds": child_ids}
+    )
+
+    documents, joined = await repository.find_all_with_lookups(
+        [
+            CRUDLookup(
+                model=ChildRef,
+                model_out=None,
+                collection_name="children",
+                prefix="children",
+                local_field="childIds",
+                foreign_field="_id",
+                limit=2,
+            )
+        ]
+    )
+
+    assert [document.name for document in documents] == ["Parent"]
+    assert len(joined[0]["children"]) == 2
+    assert joined[0]["children"][0].id in child_ids
@@ -0,0 +1,60 @@
+import pytest
+
+from fastapi_crudrouter_mongodb.core.utils.time_budget import (
+    closing_cursor,
+    current_max_time_ms,
+    cursor_max_time_kwargs,
+    max_time_kwargs,
+    resolve_max_time_ms,
+    validate_max_time_ms,
+)
+
+
+def test_resolve_max_time_ms():
+    assert resolve_max_time_ms(None, "find_all") is None
+    assert resolve_max_time_ms(500, "find_all") == 500
+    budgets = {"find_all": 2000, "default": 500}
+    assert resolve_max_time_ms(budgets, "find_all") == 2000
+    assert resolve_max_time_ms(budgets, "delete_one") == 500
+    assert resolve_max_time_ms({"find_all": 2000}, "find_one") is None
+    for invalid in (0, -1, 1.5, True, "500"):
+        with pytest.raises(ValueError):
+            resolve_max_time_ms(invalid, "find_all")
+
+
+def test_validate_max_time_ms():
+    assert validate_max_time_ms(None) is None
+    assert validate_max_time_ms({"find_all": 2000}) == {"find_all": 2000}
+    with pytest.raises(ValueError):
+        validate_max_time_ms({"find_all": 2000, "delete_one": 0})
+
+
+def test_kwargs_follow_the_current_budget():
+    assert max_time_kwargs() == {}
+    assert cursor_max_time_kwargs() == {}
+    token = current_max_time_ms.set(250)
+    try:
+        assert max_time_kwargs() == {"maxTimeMS": 250}
+        assert cursor_max_time_kwargs() == {"max_time_ms": 250}
+    finally:
+        current_max_time_ms.reset(token)
+
+
+class FakeCursor:
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_closing_cursor():
+    cursor = FakeCursor()
+    async with closing_cursor(cursor):
+        pass
+    assert not cursor.closed
+
+    with pytest.raises(RuntimeError):
+        async with closing_cursor(cursor):
+            raise RuntimeError
+    assert cursor.closed
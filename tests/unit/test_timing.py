@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from fastapi_crudrouter_mongodb.core.utils.timing import (
+    RequestTimings,
+    current_timings,
+    timed,
+)
+
+
+@pytest.fixture
+def timings():
+    timings = RequestTimings()
+    reset_token = current_timings.set(timings)
+    yield timings
+    current_timings.reset(reset_token)
+
+
+def test_phases_are_exclusive(timings):
+    with timed("db"):
+        time.sleep(0.01)
+        with timed("validate"):
+            time.sleep(0.02)
+    with timed("validate"):
+        time.sleep(0.01)
+    timings.finish()
+
+    # the inner validate phase is not counted in db
+    assert 0.01 <= timings.phases["db"] < timings.phases["validate"] - 0.01
+    assert timings.phases["validate"] >= 0.03
+    assert sum(timings.phases.values()) == pytest.approx(timings.total)
+
+
+@pytest.mark.asyncio
+async def test_timed_decorator(timings):
+    @timed("db")
+    async def query():
+        return await sync_work()
+
+    @timed("convert")
+    async def sync_work():
+        return 1
+
+    assert await query() == 1
+    assert set(timings.phases) == {"db", "convert"}
+
+
+def test_header(timings):
+    timings.phases = {"db": 0.0015}
+    timings.finish()
+    header = timings.header()
+    assert header.startswith("db;dur=1.500, encode;dur=")
+    assert ", total;dur=" in header
+
+
+def test_timed_without_timings():
+    with timed("db"):
+        pass
+    assert current_timings.get() is None